@@ -1,6 +1,7 @@
 import boto3
 import json
 import os
+import re
 import uuid
 import logging
 
@@ -15,30 +16,49 @@ s3 = boto3.client('s3')
 UPLOAD_BUCKET = os.environ.get('UPLOAD_BUCKET')
 URL_EXPIRATION_SECONDS = 300  # 5 minutes
 
+# Must match videos/storage_keys.py: library_<id>/<hh>/<digest><.ext>
+EXTENSION_PATTERN = re.compile(r'^\.[a-z0-9]{1,10}$')
+
+
+def canonical_key(library_id, file_name):
+    digest = uuid.uuid4().hex
+    extension = os.path.splitext(file_name)[1].lower()
+    if not EXTENSION_PATTERN.match(extension):
+        extension = ''
+    return f"library_{library_id}/{digest[:2]}/{digest}{extension}"
+
 def lambda_handler(event, context):
     """
     This function generates a presigned S3 URL for file uploads.
+    The key is generated here in the canonical layout, under the library given by libraryId.
     It is triggered by an API Gateway request.
     CORS is configured and handled by API Gateway, not in this function.
     """
     logger.info(f"Received event: {json.dumps(event)}")
     
     try:
-        # Extract fileName and contentType from the query string
+        # Extract fileName, contentType and libraryId from the query string
         query_params = event.get('queryStringParameters')
         if not query_params:
             return {
                 'statusCode': 400, 
-                'body': json.dumps({'error': 'Missing query string parameters: fileName and contentType are required.'})
+                'body': json.dumps({'error': 'Missing query string parameters: fileName, contentType and libraryId are required.'})
             }
         
         file_name = query_params.get('fileName')
         content_type = query_params.get('contentType')
+        library_id = query_params.get('libraryId')
 
-        if not file_name or not content_type:
+        if not file_name or not content_type or not library_id:
             return {
                 'statusCode': 400, 
-                'body': json.dumps({'error': 'Query string must include fileName and contentType.'})
+                'body': json.dumps({'error': 'Query string must include fileName, contentType and libraryId.'})
+            }
+
+        if not library_id.isdigit():
+            return {
+                'statusCode': 400,
+                'body': json.dumps({'error': 'libraryId must be a library ID.'})
             }
         
         # Validate content type for video files
@@ -53,10 +73,8 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': f'Invalid content type: {content_type}. Only video files are allowed.'})
             }
         
-        # Create a unique S3 key to prevent file overwrites
-        unique_id = uuid.uuid4()
-        file_extension = os.path.splitext(file_name)[1]
-        s3_key = f"videos/{unique_id}{file_extension}"
+        # Canonical key under the library, unique so files are never overwritten
+        s3_key = canonical_key(library_id, file_name)
 
         # Generate the presigned URL for a PUT request
         presigned_url = s3.generate_presigned_url(
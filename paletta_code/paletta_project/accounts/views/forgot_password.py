@@ -2,7 +2,7 @@ from django.views.generic import TemplateView
 from django.shortcuts import render
 from django.contrib import messages
 from django.conf import settings
-from django.core.mail import send_mail
+from paletta_core.resilience import send_mail
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from ..models import User
@@ -0,0 +1,11 @@
+"""
+BACKEND-READY: Async API URL patterns for the orders app.
+Served under /api/async/orders/ for ASGI deployments.
+"""
+
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('request-download/', views.AsyncDownloadRequestAPIView.as_view(), name='async_api_request_download'),
+]
@@ -1,12 +1,11 @@
 import logging
-import boto3
-import uuid
 from django.conf import settings
 from django.utils import timezone
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
-from django.core.mail import send_mail
-from botocore.exceptions import ClientError
+from paletta_core.resilience import send_mail
+from paletta_core.s3_client import get_s3_client, s3_is_healthy
+from videos.download_links import download_request_link
 from .models import DownloadRequest
 
 logger = logging.getLogger(__name__)
@@ -41,18 +40,12 @@ class DownloadRequestService:
       self.aws_region = getattr(settings, 'AWS_REGION', 'us-east-1')
       self.bucket_name = getattr(settings, 'AWS_STORAGE_BUCKET_NAME', None)
       
-      # Initialize S3 client
+      # Use the process-wide pooled S3 client (health check cached per process)
       if self.aws_access_key and self.aws_secret_key and self.bucket_name:
           try:
-              self.s3_client = boto3.client(
-                's3',
-                aws_access_key_id=self.aws_access_key,
-                aws_secret_access_key=self.aws_secret_key,
-                region_name=self.aws_region
-              )
-              # Test connection
-              self.s3_client.list_buckets()
-              logger.info("Successfully connected to AWS S3 for download requests")
+              self.s3_client = get_s3_client()
+              if not s3_is_healthy(self.bucket_name):
+                self.storage_enabled = False
           except Exception as e:
               self.storage_enabled = False
               logger.error(f"Failed to connect to AWS S3: {str(e)}")
@@ -110,75 +103,33 @@ class DownloadRequestService:
     logger.info(f"Created download request {download_request.id} for video '{video.title}' by user {user.email}")
     return download_request
   
-  def generate_presigned_url(self, download_request):
+  def generate_download_link(self, download_request):
     """
-    BACKEND-READY: Generate S3 presigned URL with 48-hour expiry.
+    BACKEND-READY: Stable click-time download link for a request.
     MAPPED TO: Download link generation
-    USED BY: Manager-initiated download link generation
+    USED BY: Manager notification and bulk download emails
     
-    Creates secure S3 GET URL valid for exactly 48 hours (172800 seconds).
-    Updates DownloadRequest with URL and AWS metadata for tracking.
-    Required fields: download_request.s3_key, download_request.video
+    Returns a /d/<token>/ URL valid until the request's expiry_date (48 hours).
+    Nothing is signed against S3 and the row is not updated: DownloadRedirectView
+    validates the request and signs a short-lived URL when the link is followed.
+    Required fields: download_request.video stored in S3
     """
-    if not self.storage_enabled:
-      logger.error("AWS storage is not enabled")
+    video = download_request.video
+    if video.storage_status != 'stored' or not video.storage_reference_id:
+      logger.error(f"Download request {download_request.id} has no stored video")
       return None
     
-    if not download_request.s3_key:
-      logger.error(f"Download request {download_request.id} has no S3 key")
-      return None
+    return download_request_link(download_request)
   
-    try:
-      # Extract bucket name from video's storage URL if available
-      bucket_name = self.bucket_name  # Default to configured bucket
-      
-      if download_request.video.storage_url:
-        # Parse bucket name from storage URL (e.g., s3://paletta-videos/...)
-        storage_url = download_request.video.storage_url
-        if storage_url.startswith('s3://'):
-          bucket_name = storage_url.split('/')[2]
-          logger.info(f"Using bucket '{bucket_name}' from video storage URL")
-      
-      # Generate AWS request ID for tracking
-      aws_request_id = str(uuid.uuid4())
-      
-      # Generate presigned URL with exactly 48 hours expiry
-      expiry_seconds = 172800  # 48 * 60 * 60 = 172800 seconds
-      
-      presigned_url = self.s3_client.generate_presigned_url(
-        'get_object',
-        Params={
-          'Bucket': bucket_name,
-          'Key': download_request.s3_key,
-          'ResponseContentDisposition': f'attachment; filename="{download_request.video.title}"'
-        },
-        ExpiresIn=expiry_seconds
-      )
-      
-      # Update download request with URL and metadata
-      download_request.download_url = presigned_url
-      download_request.aws_request_id = aws_request_id
-      download_request.save(update_fields=['download_url', 'aws_request_id'])
-      
-      logger.info(f"Generated presigned URL for download request {download_request.id}")
-      return presigned_url
-      
-    except ClientError as e:
-      error_code = e.response['Error']['Code']
-      logger.error(f"AWS S3 error generating presigned URL for request {download_request.id}: {error_code}")
-      return None
-    except Exception as e:
-      logger.error(f"Failed to generate presigned URL for request {download_request.id}: {str(e)}")
-      return None
-  
-  def send_manager_notification(self, download_requests):
+  def send_manager_notification(self, download_requests, with_links=False):
     """
     BACKEND-READY: Send notification to manager for download request review.
     MAPPED TO: Manager notification system for monetization review
     USED BY: process_download_request, bulk processing
     
     Sends notification email to manager with customer details and video list.
-    No download links are generated or sent to customers.
+    No download links are generated or sent to customers; with_links adds
+    click-time download links for the manager (bulk flow).
     Required fields: download_requests (list of DownloadRequest instances)
     """
     if not download_requests:
@@ -241,7 +192,7 @@ class DownloadRequestService:
               'duration_formatted': clean_text(req.video.duration_formatted),
               'file_size': req.video.file_size, 
               'format': clean_text(req.video.format or ""),
-              'download_url': req.download_url,
+              'download_url': self.generate_download_link(req) if with_links else None,
               'content_type': None
           }
           
@@ -392,7 +343,7 @@ Please review this request in the admin panel.
     Required fields: download_requests (list of DownloadRequest instances)
     """
     try:
-      from django.core.mail import send_mail
+      from paletta_core.resilience import send_mail
       from django.template.loader import render_to_string
       from django.utils.html import strip_tags
       
@@ -410,8 +361,8 @@ Please review this request in the admin panel.
       for download_request in download_requests:
         video_info = {
           'title': download_request.video.title,
-          'download_url': download_request.download_url,
-          'expiry_date': download_request.video.download_link_expiry,  # Use video's download link expiry
+          'download_url': self.generate_download_link(download_request),
+          'expiry_date': download_request.expiry_date,
           'library_name': download_request.video.library.name if download_request.video.library else None,
           'duration': download_request.video.duration_formatted if hasattr(download_request.video, 'duration_formatted') else 'Unknown',
           'file_size': download_request.video.file_size,
@@ -490,31 +441,21 @@ Please review this request in the admin panel.
     logger.info(f"Processing bulk download request with {len(download_requests)} videos")
     
     try:
-      # Import the AWS storage service for download link generation
-      from videos.services import AWSCloudStorageService
-      storage_service = AWSCloudStorageService()
-      
-      # Generate download links for all requests
+      # Download links are click-time tokens: nothing is signed until one is followed
       successful_requests = []
       failed_requests = []
       
       for download_request in download_requests:
         try:
-          # Generate download link using the existing AWS service
-          logger.info(f"Generating download link for video {download_request.video.id} (title: {download_request.video.title})")
-          download_url = storage_service.generate_download_link(download_request.video)
-          if download_url:
-            logger.info(f"Successfully generated download URL for video {download_request.video.id}: {download_url[:50]}...")
-            # Update request with download URL
-            download_request.download_url = download_url
+          if self.generate_download_link(download_request):
             download_request.status = 'completed'
             download_request.email_sent = True
             download_request.email_sent_at = timezone.now()
-            download_request.save(update_fields=['download_url', 'status', 'email_sent', 'email_sent_at'])
+            download_request.save(update_fields=['status', 'email_sent', 'email_sent_at'])
             
             successful_requests.append(download_request)
           else:
-            logger.error(f"Failed to generate download URL for video {download_request.video.id}")
+            logger.error(f"Video {download_request.video.id} is not available for download")
             failed_requests.append(download_request)
         except Exception as e:
           logger.error(f"Failed to generate download link for request {download_request.id}: {str(e)}")
@@ -522,7 +463,7 @@ Please review this request in the admin panel.
       
       # Send manager notification with download links for all requests
       logger.info(f"Sending manager notification for {len(download_requests)} requests")
-      notification_sent = self.send_manager_notification(download_requests)
+      notification_sent = self.send_manager_notification(download_requests, with_links=True)
       if not notification_sent:
         logger.error(f"Failed to send manager notification for {len(download_requests)} requests")
         # Mark all as failed
@@ -113,7 +113,7 @@ def resend_failed_download_emails():
     failed_requests = DownloadRequest.objects.filter(
       status='failed',
       request_date__gte=cutoff_time,
-      download_url__isnull=False  # Only retry if URL was generated
+      video__storage_status='stored'  # Only retry if the video can still be downloaded
     ).select_related('user', 'video')
     
     if not failed_requests.exists():
@@ -17,7 +17,9 @@ import logging
 from .models import Order, OrderDetail, DownloadRequest
 from .services import DownloadRequestService
 from videos.models import Video
+from videos.async_storage import run_blocking
 from libraries.models import Library
+from paletta_core.async_views import AsyncAPIView
 
 logger = logging.getLogger(__name__)
 
@@ -378,6 +380,96 @@ class RemoveFromCollectionView(LoginRequiredMixin, View):
 # DOWNLOAD REQUEST API VIEWS
 # ==============================================================================
 
+def submit_download_request(request, data):
+    """
+    Validate and process a single-video download request.
+    Shared by DownloadRequestAPIView and its async counterpart.
+    
+    Returns:
+        tuple: (response payload, HTTP status code)
+    """
+    try:
+        video_id = data.get('video_id')
+        email = data.get('email', request.user.email)
+        
+        # Validate required fields
+        if not video_id:
+            return {
+                'error': 'video_id is required'
+            }, status.HTTP_400_BAD_REQUEST
+        
+        # Validate email format
+        if not email or '@' not in email:
+            return {
+                'error': 'Valid email address is required'
+            }, status.HTTP_400_BAD_REQUEST
+        
+        # Get the video
+        try:
+            video = Video.objects.get(id=video_id)
+        except Video.DoesNotExist:
+            return {
+                'error': 'Video not found'
+            }, status.HTTP_404_NOT_FOUND
+        
+        # Check user permissions for private videos
+        if video.is_private and video.library.owner != request.user:
+            return {
+                'error': 'You do not have permission to download this private video'
+            }, status.HTTP_403_FORBIDDEN
+        
+        # Check if video is stored and available
+        if video.storage_status != 'stored':
+            return {
+                'error': f'Video is not available for download (status: {video.get_storage_status_display()})',
+                'video_status': video.storage_status
+            }, status.HTTP_400_BAD_REQUEST
+        
+        # Create download request using service
+        download_service = DownloadRequestService()
+        
+        try:
+            download_request = download_service.create_download_request(
+                user=request.user,
+                video=video,
+                email=email
+            )
+            
+            # Process the request (generate URL and send email)
+            success = download_service.process_download_request(download_request)
+            
+            if success:
+                logger.info(f"Successfully processed download request {download_request.id} for user {request.user.email}")
+                return {
+                    'success': True,
+                    'message': f'Download link has been sent to {email}',
+                    'request_id': download_request.id,
+                    'expiry_date': download_request.expiry_date.isoformat(),
+                    'video_title': video.title
+                }, status.HTTP_201_CREATED
+            else:
+                return {
+                    'error': 'Failed to process download request. Please try again.',
+                    'request_id': download_request.id
+                }, status.HTTP_500_INTERNAL_SERVER_ERROR
+                
+        except ValueError as e:
+            return {
+                'error': str(e)
+            }, status.HTTP_400_BAD_REQUEST
+        except Exception as e:
+            logger.error(f"Failed to create download request for user {request.user.email}, video {video_id}: {str(e)}")
+            return {
+                'error': 'Internal server error while processing download request'
+            }, status.HTTP_500_INTERNAL_SERVER_ERROR
+            
+    except Exception as e:
+        logger.error(f"Unexpected error in download request API: {str(e)}")
+        return {
+            'error': 'Internal server error'
+        }, status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
 class DownloadRequestAPIView(APIView):
     """
     BACKEND-READY: Main download request endpoint for video downloads.
@@ -403,86 +495,8 @@ class DownloadRequestAPIView(APIView):
         Returns:
             Response: Success message with request details or error information
         """
-        try:
-            video_id = request.data.get('video_id')
-            email = request.data.get('email', request.user.email)
-            
-            # Validate required fields
-            if not video_id:
-                return Response({
-                    'error': 'video_id is required'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Validate email format
-            if not email or '@' not in email:
-                return Response({
-                    'error': 'Valid email address is required'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Get the video
-            try:
-                video = Video.objects.get(id=video_id)
-            except Video.DoesNotExist:
-                return Response({
-                    'error': 'Video not found'
-                }, status=status.HTTP_404_NOT_FOUND)
-            
-            # Check user permissions for private videos
-            if video.is_private and video.library.owner != request.user:
-                return Response({
-                    'error': 'You do not have permission to download this private video'
-                }, status=status.HTTP_403_FORBIDDEN)
-            
-            # Check if video is stored and available
-            if video.storage_status != 'stored':
-                return Response({
-                    'error': f'Video is not available for download (status: {video.get_storage_status_display()})',
-                    'video_status': video.storage_status
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Create download request using service
-            download_service = DownloadRequestService()
-            
-            try:
-                download_request = download_service.create_download_request(
-                    user=request.user,
-                    video=video,
-                    email=email
-                )
-                
-                # Process the request (generate URL and send email)
-                success = download_service.process_download_request(download_request)
-                
-                if success:
-                    logger.info(f"Successfully processed download request {download_request.id} for user {request.user.email}")
-                    return Response({
-                        'success': True,
-                        'message': f'Download link has been sent to {email}',
-                        'request_id': download_request.id,
-                        'expiry_date': download_request.expiry_date.isoformat(),
-                        'video_title': video.title
-                    }, status=status.HTTP_201_CREATED)
-                else:
-                    return Response({
-                        'error': 'Failed to process download request. Please try again.',
-                        'request_id': download_request.id
-                    }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-                    
-            except ValueError as e:
-                return Response({
-                    'error': str(e)
-                }, status=status.HTTP_400_BAD_REQUEST)
-            except Exception as e:
-                logger.error(f"Failed to create download request for user {request.user.email}, video {video_id}: {str(e)}")
-                return Response({
-                    'error': 'Internal server error while processing download request'
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-                
-        except Exception as e:
-            logger.error(f"Unexpected error in download request API: {str(e)}")
-            return Response({
-                'error': 'Internal server error'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        payload, status_code = submit_download_request(request, request.data)
+        return Response(payload, status=status_code)
 
 
 class DownloadRequestStatusAPIView(APIView):
@@ -750,4 +764,18 @@ def bulk_download_request(request):
         logger.error(f"Error in bulk download request: {str(e)}")
         return Response({
             'error': 'Internal server error'
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR) 
\ No newline at end of file
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR) 
+
+class AsyncDownloadRequestAPIView(AsyncAPIView):
+    """
+    BACKEND-READY: Async download request endpoint.
+    MAPPED TO: POST /api/async/orders/request-download/
+    USED BY: Frontend download requests when served from an ASGI deployment
+    
+    Same contract as DownloadRequestAPIView; the database work and the manager
+    notification email run on the bounded storage executor instead of a worker thread.
+    """
+    
+    async def post(self, request):
+        payload, status_code = await run_blocking(submit_download_request, request, self.data)
+        return JsonResponse(payload, status=status_code)
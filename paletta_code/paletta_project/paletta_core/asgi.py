@@ -11,6 +11,6 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'paletta_core.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'paletta_project.settings_production')
 
 application = get_asgi_application()
@@ -0,0 +1,72 @@
+"""
+Base class for async JSON API views served under ASGI.
+
+DRF (3.15, as pinned in requirements.txt) has no async view support, so the
+async endpoints are plain Django class-based views with async handlers. This base class provides what the DRF
+views get from APIView: session authentication, JSON / form body parsing and
+a uniform JSON error response. CSRF is enforced by CsrfViewMiddleware as for
+any other Django view.
+"""
+
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAPIError(Exception):
+    """Raised inside a handler to return a JSON error with a status code."""
+
+    def __init__(self, message, status=400, **extra):
+        super().__init__(message)
+        self.status = status
+        self.payload = {'error': message, **extra}
+
+
+def _load_user(request):
+    # Touching request.user loads the session and user from the database
+    user = request.user
+    return user if user.is_authenticated else None
+
+
+class AsyncAPIView(View):
+    """
+    Authenticated async JSON endpoint.
+    Subclasses implement async get/post(self, request, *args, **kwargs) and may
+    use self.data (parsed body) and self.user; raise AsyncAPIError for client errors.
+    """
+
+    login_required = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        handler = getattr(self, request.method.lower(), None)
+        if request.method.lower() not in self.http_method_names or handler is None:
+            return JsonResponse({'error': f'Method {request.method} not allowed'}, status=405)
+
+        self.user = await sync_to_async(_load_user)(request)
+        if self.login_required and self.user is None:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=403)
+
+        try:
+            self.data = self._parse_body(request)
+            return await handler(request, *args, **kwargs)
+        except AsyncAPIError as e:
+            return JsonResponse(e.payload, status=e.status)
+        except Exception as e:
+            logger.error(f"Error in {self.__class__.__name__}: {str(e)}")
+            return JsonResponse({'error': 'Internal server error'}, status=500)
+
+    @staticmethod
+    def _parse_body(request):
+        if request.method in ('GET', 'HEAD'):
+            return request.GET
+        if request.content_type == 'application/json':
+            try:
+                return json.loads(request.body or b'{}')
+            except ValueError:
+                raise AsyncAPIError('Invalid JSON body')
+        return request.POST
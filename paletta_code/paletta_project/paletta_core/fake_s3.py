@@ -0,0 +1,423 @@
+"""
+In-process stand-in for the boto3 S3 client.
+
+Implements the subset of the S3 API the storage services use (multipart
+uploads, object CRUD, copies, listings and batch deletes) with the same
+request and response shapes and botocore ClientError codes, so the real
+service code paths can be exercised and benchmarked without AWS. S3's size
+limits are enforced too: 10,000 parts of at most 5GiB, objects up to 5TiB.
+
+Enable it for the whole process with:
+    AWS_S3_CLIENT_FACTORY = 'paletta_core.fake_s3.get_fake_s3_client'
+FAKE_S3_RETAIN_DATA = False keeps only sizes and ETags, so multi-GB uploads
+can be simulated without holding the bytes in memory.
+"""
+
+import io
+import time
+import uuid
+import base64
+import hashlib
+import threading
+from datetime import datetime, timezone as dt_timezone
+
+from botocore.exceptions import ClientError
+from django.conf import settings
+
+READ_CHUNK = 8 * 1024 * 1024
+MAX_PART_SIZE = 5 * 1024 ** 3
+MAX_OBJECT_SIZE = 5 * 1024 ** 4
+
+
+def _error(code, message, operation, status=400):
+    return ClientError(
+        {'Error': {'Code': code, 'Message': message}, 'ResponseMetadata': {'HTTPStatusCode': status}},
+        operation,
+    )
+
+
+def _now():
+    return datetime.now(dt_timezone.utc)
+
+
+class _StoredObject:
+    __slots__ = ('size', 'etag', 'data', 'content_type', 'last_modified', 'checksum_sha256')
+
+    def __init__(self, size, etag, data=None, content_type='binary/octet-stream', checksum_sha256=None):
+        self.size = size
+        self.etag = etag
+        self.data = data
+        self.content_type = content_type
+        self.last_modified = _now()
+        self.checksum_sha256 = checksum_sha256
+
+
+class _MultipartUpload:
+    def __init__(self, key, content_type, checksum_algorithm=None):
+        self.key = key
+        self.content_type = content_type
+        self.checksum_algorithm = checksum_algorithm
+        self.initiated = _now()
+        self.parts = {}  # part number -> _StoredObject
+
+
+class FakeS3Client:
+    """
+    Thread-safe in-memory S3 client.
+    Buckets are created on first use; every bucket name is accepted.
+    """
+
+    def __init__(self, retain_data=True, latency=0.0):
+        self.retain_data = retain_data
+        self.latency = latency  # optional per-call delay (seconds) to mimic network round trips
+        self._lock = threading.Lock()
+        self._objects = {}  # bucket -> {key: _StoredObject}
+        self._uploads = {}  # bucket -> {upload_id: _MultipartUpload}
+        self.calls = {}  # operation name -> count
+
+    # ------------------------------------------------------------------
+    # helpers
+    # ------------------------------------------------------------------
+
+    def _record(self, operation):
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _bucket(self, bucket):
+        return self._objects.setdefault(bucket, {})
+
+    def _ingest(self, body, content_length=None):
+        """Read a request body, returning (size, md5 hex, sha256 digest, data or None)."""
+        md5 = hashlib.md5()
+        sha256 = hashlib.sha256()
+        if isinstance(body, (bytes, bytearray, memoryview)):
+            view = memoryview(body)
+            md5.update(view)
+            sha256.update(view)
+            data = bytes(view) if self.retain_data else None
+            return len(view), md5.hexdigest(), sha256.digest(), data
+
+        if isinstance(body, str):
+            return self._ingest(body.encode('utf-8'))
+
+        retained = io.BytesIO() if self.retain_data else None
+        size = 0
+        while True:
+            chunk = body.read(READ_CHUNK)
+            if not chunk:
+                break
+            md5.update(chunk)
+            sha256.update(chunk)
+            size += len(chunk)
+            if retained is not None:
+                retained.write(chunk)
+        if content_length is not None and int(content_length) != size:
+            raise _error('IncompleteBody', 'Body shorter than Content-Length', 'PutObject')
+        return size, md5.hexdigest(), sha256.digest(), retained.getvalue() if retained is not None else None
+
+    def _get(self, bucket, key, operation):
+        obj = self._bucket(bucket).get(key)
+        if obj is None:
+            raise _error('NoSuchKey', 'The specified key does not exist.', operation, status=404)
+        return obj
+
+    def _upload(self, bucket, upload_id, operation):
+        upload = self._uploads.get(bucket, {}).get(upload_id)
+        if upload is None:
+            raise _error('NoSuchUpload', 'The specified upload does not exist.', operation, status=404)
+        return upload
+
+    # ------------------------------------------------------------------
+    # buckets and objects
+    # ------------------------------------------------------------------
+
+    def head_bucket(self, Bucket):
+        self._record('HeadBucket')
+        self._bucket(Bucket)
+        return {'ResponseMetadata': {'HTTPStatusCode': 200}}
+
+    def put_object(self, Bucket, Key, Body=b'', ContentType='binary/octet-stream', ContentLength=None, **kwargs):
+        self._record('PutObject')
+        size, md5_hex, sha256, data = self._ingest(Body, ContentLength)
+        with self._lock:
+            self._bucket(Bucket)[Key] = _StoredObject(
+                size, f'"{md5_hex}"', data, ContentType, base64.b64encode(sha256).decode('ascii')
+            )
+        return {'ETag': f'"{md5_hex}"'}
+
+    def head_object(self, Bucket, Key, **kwargs):
+        self._record('HeadObject')
+        obj = self._get(Bucket, Key, 'HeadObject')
+        response = {
+            'ContentLength': obj.size,
+            'ETag': obj.etag,
+            'ContentType': obj.content_type,
+            'LastModified': obj.last_modified,
+        }
+        if kwargs.get('ChecksumMode') == 'ENABLED' and obj.checksum_sha256:
+            response['ChecksumSHA256'] = obj.checksum_sha256
+        return response
+
+    def get_object(self, Bucket, Key, Range=None, **kwargs):
+        self._record('GetObject')
+        obj = self._get(Bucket, Key, 'GetObject')
+        if obj.data is None:
+            raise _error('InvalidObjectState', 'Object data was not retained (FAKE_S3_RETAIN_DATA=False)', 'GetObject')
+        data = obj.data
+        if Range:
+            first, _, last = Range.replace('bytes=', '').partition('-')
+            if not first:  # suffix range: the last N bytes
+                start, end = max(obj.size - int(last), 0), obj.size - 1
+            else:
+                start, end = int(first), min(int(last), obj.size - 1) if last else obj.size - 1
+            data = data[start:end + 1]
+        return {
+            'Body': io.BytesIO(data),
+            'ContentLength': len(data),
+            'ETag': obj.etag,
+            'ContentType': obj.content_type,
+        }
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        self._record('DeleteObject')
+        with self._lock:
+            self._bucket(Bucket).pop(Key, None)
+        return {}
+
+    def delete_objects(self, Bucket, Delete, **kwargs):
+        self._record('DeleteObjects')
+        objects = Delete.get('Objects', [])
+        if len(objects) > 1000:
+            raise _error('MalformedXML', 'At most 1000 keys can be deleted per request', 'DeleteObjects')
+        deleted = []
+        with self._lock:
+            bucket = self._bucket(Bucket)
+            for item in objects:
+                bucket.pop(item['Key'], None)
+                deleted.append({'Key': item['Key']})
+        return {} if Delete.get('Quiet') else {'Deleted': deleted}
+
+    def copy_object(self, Bucket, Key, CopySource, **kwargs):
+        self._record('CopyObject')
+        source = self._get(CopySource['Bucket'], CopySource['Key'], 'CopyObject')
+        if source.size > 5 * 1024 ** 3:
+            raise _error('InvalidRequest', 'The specified copy source is larger than the maximum allowable size', 'CopyObject')
+        with self._lock:
+            self._bucket(Bucket)[Key] = _StoredObject(
+                source.size, source.etag, source.data,
+                kwargs.get('ContentType', source.content_type), source.checksum_sha256
+            )
+        return {'CopyObjectResult': {'ETag': source.etag, 'LastModified': _now()}}
+
+    def list_objects_v2(self, Bucket, Prefix='', ContinuationToken=None, StartAfter=None, MaxKeys=1000, **kwargs):
+        self._record('ListObjectsV2')
+        with self._lock:
+            keys = sorted(key for key in self._bucket(Bucket) if key.startswith(Prefix))
+        after = ContinuationToken or StartAfter
+        if after:
+            keys = [key for key in keys if key > after]
+        page, rest = keys[:MaxKeys], keys[MaxKeys:]
+        bucket = self._bucket(Bucket)
+        response = {
+            'KeyCount': len(page),
+            'IsTruncated': bool(rest),
+            'Contents': [
+                {'Key': key, 'Size': bucket[key].size, 'ETag': bucket[key].etag, 'LastModified': bucket[key].last_modified}
+                for key in page if key in bucket
+            ],
+        }
+        if rest:
+            response['NextContinuationToken'] = page[-1]
+        return response
+
+    def get_paginator(self, operation_name):
+        return _FakePaginator(self, operation_name)
+
+    def generate_presigned_url(self, ClientMethod, Params=None, ExpiresIn=3600, **kwargs):
+        self._record('GeneratePresignedUrl')
+        params = Params or {}
+        return f"https://{params.get('Bucket')}.fake-s3.local/{params.get('Key')}?expires={ExpiresIn}"
+
+    # ------------------------------------------------------------------
+    # multipart uploads
+    # ------------------------------------------------------------------
+
+    def create_multipart_upload(self, Bucket, Key, ContentType='binary/octet-stream', ChecksumAlgorithm=None, **kwargs):
+        self._record('CreateMultipartUpload')
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self._uploads.setdefault(Bucket, {})[upload_id] = _MultipartUpload(Key, ContentType, ChecksumAlgorithm)
+        return {'Bucket': Bucket, 'Key': Key, 'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body=b'', ContentLength=None, ChecksumSHA256=None, **kwargs):
+        self._record('UploadPart')
+        upload = self._upload(Bucket, UploadId, 'UploadPart')
+        if not 1 <= int(PartNumber) <= 10000:
+            raise _error('InvalidArgument', 'Part number must be an integer between 1 and 10000', 'UploadPart')
+        if ContentLength is not None and int(ContentLength) > MAX_PART_SIZE:
+            raise _error('EntityTooLarge', 'Your proposed upload exceeds the maximum allowed size', 'UploadPart')
+        size, md5_hex, sha256, data = self._ingest(Body, ContentLength)
+        if size > MAX_PART_SIZE:
+            raise _error('EntityTooLarge', 'Your proposed upload exceeds the maximum allowed size', 'UploadPart')
+        encoded_sha256 = base64.b64encode(sha256).decode('ascii')
+        if ChecksumSHA256 and ChecksumSHA256 != encoded_sha256:
+            raise _error('BadDigest', 'The SHA256 you specified did not match the calculated checksum.', 'UploadPart')
+        with self._lock:
+            upload.parts[int(PartNumber)] = _StoredObject(size, f'"{md5_hex}"', data, checksum_sha256=encoded_sha256)
+        response = {'ETag': f'"{md5_hex}"'}
+        if upload.checksum_algorithm == 'SHA256':
+            response['ChecksumSHA256'] = encoded_sha256
+        return response
+
+    def upload_part_copy(self, Bucket, Key, UploadId, PartNumber, CopySource, CopySourceRange=None, **kwargs):
+        self._record('UploadPartCopy')
+        upload = self._upload(Bucket, UploadId, 'UploadPartCopy')
+        source = self._get(CopySource['Bucket'], CopySource['Key'], 'UploadPartCopy')
+        start, end = 0, source.size - 1
+        if CopySourceRange:
+            start, end = (int(value) for value in CopySourceRange.replace('bytes=', '').split('-'))
+        if start < 0 or end >= source.size or start > end:
+            raise _error('InvalidArgument', 'The x-amz-copy-source-range value must be within the source object', 'UploadPartCopy')
+        if end - start + 1 > MAX_PART_SIZE:
+            raise _error('EntityTooLarge', 'Your proposed upload exceeds the maximum allowed size', 'UploadPartCopy')
+        data = source.data[start:end + 1] if source.data is not None else None
+        etag = f'"{hashlib.md5(data).hexdigest()}"' if data is not None else f'"{uuid.uuid4().hex}"'
+        # size-only mode keeps no bytes; a digest of the range identity stands in
+        digest_input = data if data is not None else f'{source.etag}:{start}-{end}'.encode('ascii')
+        encoded_sha256 = base64.b64encode(hashlib.sha256(digest_input).digest()).decode('ascii')
+        with self._lock:
+            upload.parts[int(PartNumber)] = _StoredObject(end - start + 1, etag, data, checksum_sha256=encoded_sha256)
+        result = {'ETag': etag, 'LastModified': _now()}
+        if upload.checksum_algorithm == 'SHA256':
+            result['ChecksumSHA256'] = encoded_sha256
+        return {'CopyPartResult': result}
+
+    def list_parts(self, Bucket, Key, UploadId, MaxParts=1000, PartNumberMarker=0, **kwargs):
+        self._record('ListParts')
+        upload = self._upload(Bucket, UploadId, 'ListParts')
+        with self._lock:
+            numbers = sorted(number for number in upload.parts if number > int(PartNumberMarker))
+        page, rest = numbers[:MaxParts], numbers[MaxParts:]
+        response = {
+            'Parts': [
+                {'PartNumber': number, 'Size': upload.parts[number].size, 'ETag': upload.parts[number].etag,
+                 'ChecksumSHA256': upload.parts[number].checksum_sha256, 'LastModified': upload.parts[number].last_modified}
+                for number in page
+            ],
+            'IsTruncated': bool(rest),
+        }
+        if rest:
+            response['NextPartNumberMarker'] = page[-1]
+        return response
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload, **kwargs):
+        self._record('CompleteMultipartUpload')
+        upload = self._upload(Bucket, UploadId, 'CompleteMultipartUpload')
+        requested = MultipartUpload.get('Parts', [])
+        numbers = [part['PartNumber'] for part in requested]
+        if not requested or numbers != sorted(numbers):
+            raise _error('InvalidPartOrder', 'The list of parts was not in ascending order.', 'CompleteMultipartUpload')
+
+        parts = []
+        for index, part in enumerate(requested):
+            stored = upload.parts.get(part['PartNumber'])
+            if stored is None or stored.etag != part['ETag']:
+                raise _error('InvalidPart', 'One or more of the specified parts could not be found.', 'CompleteMultipartUpload')
+            if index < len(requested) - 1 and stored.size < 5 * 1024 * 1024:
+                raise _error('EntityTooSmall', 'Your proposed upload is smaller than the minimum allowed size', 'CompleteMultipartUpload')
+            parts.append(stored)
+        if sum(stored.size for stored in parts) > MAX_OBJECT_SIZE:
+            raise _error('EntityTooLarge', 'Your proposed upload exceeds the maximum allowed size', 'CompleteMultipartUpload')
+
+        md5s = b''.join(bytes.fromhex(stored.etag.strip('"')) for stored in parts if len(stored.etag.strip('"')) == 32)
+        etag = f'"{hashlib.md5(md5s).hexdigest()}-{len(parts)}"'
+        data = b''.join(stored.data for stored in parts) if self.retain_data and all(p.data is not None for p in parts) else None
+        checksum = None
+        if upload.checksum_algorithm == 'SHA256':
+            digests = b''.join(base64.b64decode(stored.checksum_sha256) for stored in parts)
+            checksum = f"{base64.b64encode(hashlib.sha256(digests).digest()).decode('ascii')}-{len(parts)}"
+
+        with self._lock:
+            self._bucket(Bucket)[Key] = _StoredObject(sum(p.size for p in parts), etag, data, upload.content_type, checksum)
+            del self._uploads[Bucket][UploadId]
+        response = {'Location': f'https://{Bucket}.fake-s3.local/{Key}', 'Bucket': Bucket, 'Key': Key, 'ETag': etag}
+        if checksum:
+            response['ChecksumSHA256'] = checksum
+        return response
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId, **kwargs):
+        self._record('AbortMultipartUpload')
+        with self._lock:
+            if self._uploads.get(Bucket, {}).pop(UploadId, None) is None:
+                raise _error('NoSuchUpload', 'The specified upload does not exist.', 'AbortMultipartUpload', status=404)
+        return {}
+
+    def list_multipart_uploads(self, Bucket, KeyMarker='', UploadIdMarker='', MaxUploads=1000, **kwargs):
+        self._record('ListMultipartUploads')
+        with self._lock:
+            uploads = sorted(
+                (upload.key, upload_id, upload.initiated)
+                for upload_id, upload in self._uploads.get(Bucket, {}).items()
+            )
+        if KeyMarker:
+            uploads = [u for u in uploads if (u[0], u[1]) > (KeyMarker, UploadIdMarker or '')]
+        page, rest = uploads[:MaxUploads], uploads[MaxUploads:]
+        response = {
+            'Uploads': [{'Key': key, 'UploadId': upload_id, 'Initiated': initiated} for key, upload_id, initiated in page],
+            'IsTruncated': bool(rest),
+        }
+        if rest:
+            response['NextKeyMarker'] = page[-1][0]
+            response['NextUploadIdMarker'] = page[-1][1]
+        return response
+
+    # ------------------------------------------------------------------
+    # inspection helpers for tests and benchmarks
+    # ------------------------------------------------------------------
+
+    def object_count(self, bucket):
+        return len(self._bucket(bucket))
+
+    def reset(self):
+        with self._lock:
+            self._objects.clear()
+            self._uploads.clear()
+            self.calls.clear()
+
+
+class _FakePaginator:
+    """Minimal paginator over the fake client's list operations."""
+
+    def __init__(self, client, operation_name):
+        if operation_name != 'list_objects_v2':
+            raise NotImplementedError(f"FakeS3Client has no paginator for {operation_name}")
+        self.client = client
+
+    def paginate(self, **kwargs):
+        page_size = kwargs.pop('PaginationConfig', {}).get('PageSize', 1000)
+        token = None
+        while True:
+            response = self.client.list_objects_v2(MaxKeys=page_size, ContinuationToken=token, **kwargs)
+            yield response
+            if not response.get('IsTruncated'):
+                return
+            token = response['NextContinuationToken']
+
+
+_fake_client = None
+_fake_client_lock = threading.Lock()
+
+
+def get_fake_s3_client():
+    """Process-wide FakeS3Client (AWS_S3_CLIENT_FACTORY target)."""
+    global _fake_client
+    if _fake_client is None:
+        with _fake_client_lock:
+            if _fake_client is None:
+                _fake_client = FakeS3Client(
+                    retain_data=getattr(settings, 'FAKE_S3_RETAIN_DATA', True),
+                    latency=getattr(settings, 'FAKE_S3_LATENCY', 0.0),
+                )
+    return _fake_client
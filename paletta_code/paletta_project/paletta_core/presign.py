@@ -0,0 +1,250 @@
+"""
+Presigned URL engine for S3 (SigV4 query-string authentication).
+
+botocore's generate_presigned_url rebuilds the request, runs the event hooks
+and re-derives the SigV4 signing key on every call. This engine:
+- derives the signing key once per (day, region) and reuses it,
+- aligns the signing time to fixed buckets so the same object and
+  parameters produce an identical URL within a window,
+- memoizes URLs in an in-process LRU/TTL cache, optionally backed by a
+  shared Django cache so every worker reuses the same URL.
+"""
+
+import hmac
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone as dt_timezone
+from urllib.parse import quote
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM = 'AWS4-HMAC-SHA256'
+UNSIGNED_PAYLOAD = 'UNSIGNED-PAYLOAD'
+MAX_EXPIRES = 7 * 24 * 3600  # SigV4 presigned URLs are valid for at most 7 days
+
+
+def _uri_encode(value, safe='-_.~'):
+    """RFC 3986 encoding as required by SigV4 (only unreserved characters are kept)."""
+    return quote(value, safe=safe)
+
+
+class SigningKeyCache:
+    """
+    Cache of derived SigV4 signing keys.
+    A key depends only on (secret, date, region, service), so it can be reused for a whole day.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = {}
+
+    def get(self, secret_key, date_stamp, region, service='s3'):
+        cache_key = (secret_key, date_stamp, region, service)
+        signing_key = self._keys.get(cache_key)
+        if signing_key is None:
+            k_date = hmac.new(f'AWS4{secret_key}'.encode('utf-8'), date_stamp.encode('utf-8'), hashlib.sha256).digest()
+            k_region = hmac.new(k_date, region.encode('utf-8'), hashlib.sha256).digest()
+            k_service = hmac.new(k_region, service.encode('utf-8'), hashlib.sha256).digest()
+            signing_key = hmac.new(k_service, b'aws4_request', hashlib.sha256).digest()
+            with self._lock:
+                # Keys for past days are never needed again
+                self._keys = {k: v for k, v in self._keys.items() if k[1] == date_stamp}
+                self._keys[cache_key] = signing_key
+        return signing_key
+
+
+class PresignedURLCache:
+    """
+    Thread-safe LRU cache with per-entry expiry for presigned URLs.
+    Optionally mirrors entries into a shared Django cache backend.
+    """
+
+    def __init__(self, max_entries=10000, shared_alias=None):
+        self.max_entries = max_entries
+        self.shared_alias = shared_alias
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _shared(self):
+        if not self.shared_alias:
+            return None
+        try:
+            from django.core.cache import caches
+            return caches[self.shared_alias]
+        except Exception as e:
+            logger.warning(f"Shared presign cache '{self.shared_alias}' unavailable: {str(e)}")
+            return None
+
+    @staticmethod
+    def _shared_key(key):
+        return 'presign:' + hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+
+    def get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                url, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return url
+                del self._entries[key]
+
+        shared = self._shared()
+        if shared is not None:
+            cached = shared.get(self._shared_key(key))
+            if cached and cached[1] > now:
+                self._store_local(key, cached[0], cached[1])
+                self.hits += 1
+                return cached[0]
+
+        self.misses += 1
+        return None
+
+    def set(self, key, url, expires_at, now):
+        self._store_local(key, url, expires_at)
+        shared = self._shared()
+        if shared is not None:
+            timeout = max(1, int(expires_at - now))
+            shared.set(self._shared_key(key), (url, expires_at), timeout)
+
+    def _store_local(self, key, url, expires_at):
+        with self._lock:
+            self._entries[key] = (url, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class PresignEngine:
+    """
+    SigV4 query-string presigner for S3 objects.
+
+    The signing time is floored to a multiple of bucket_seconds, and the
+    requested expiry is extended by one bucket so a URL handed out at the end
+    of a window is still valid for at least the requested time.
+    """
+
+    def __init__(self, region, bucket_seconds=300, endpoint_url=None, credentials_provider=None,
+                 url_cache=None, key_cache=None):
+        self.region = region
+        self.bucket_seconds = max(1, int(bucket_seconds))
+        self.endpoint_url = endpoint_url.rstrip('/') if endpoint_url else None
+        self.credentials_provider = credentials_provider
+        self.url_cache = url_cache if url_cache is not None else PresignedURLCache()
+        self.key_cache = key_cache if key_cache is not None else SigningKeyCache()
+
+    def _host_and_path(self, bucket, key):
+        """Virtual-hosted style where possible, path style for custom endpoints and dotted buckets."""
+        encoded_key = _uri_encode(key, safe='-_.~/')
+        if self.endpoint_url:
+            scheme, host = self.endpoint_url.split('://', 1)
+            return scheme, host, f'/{bucket}/{encoded_key}'
+        if '.' in bucket:
+            return 'https', f's3.{self.region}.amazonaws.com', f'/{bucket}/{encoded_key}'
+        return 'https', f'{bucket}.s3.{self.region}.amazonaws.com', f'/{encoded_key}'
+
+    def presign(self, bucket, key, expires_in=3600, method='GET', params=None):
+        """
+        Return a presigned URL for method on s3://bucket/key.
+        params are extra signed query parameters, e.g. response-content-disposition,
+        or uploadId / partNumber for multipart part uploads.
+        """
+        now = time.time()
+        window_start = int(now // self.bucket_seconds) * self.bucket_seconds
+        params = dict(params or {})
+
+        cache_key = (method, bucket, key, int(expires_in), tuple(sorted(params.items())), window_start)
+        url = self.url_cache.get(cache_key, now)
+        if url is not None:
+            return url
+
+        credentials = self.credentials_provider()
+        expires = min(int(expires_in) + self.bucket_seconds, MAX_EXPIRES)
+
+        signed_at = datetime.fromtimestamp(window_start, tz=dt_timezone.utc)
+        amz_date = signed_at.strftime('%Y%m%dT%H%M%SZ')
+        date_stamp = signed_at.strftime('%Y%m%d')
+        scope = f'{date_stamp}/{self.region}/s3/aws4_request'
+
+        query = {
+            'X-Amz-Algorithm': ALGORITHM,
+            'X-Amz-Credential': f'{credentials.access_key}/{scope}',
+            'X-Amz-Date': amz_date,
+            'X-Amz-Expires': str(expires),
+            'X-Amz-SignedHeaders': 'host',
+        }
+        if credentials.token:
+            query['X-Amz-Security-Token'] = credentials.token
+        for name, value in params.items():
+            query[name] = str(value)
+
+        scheme, host, path = self._host_and_path(bucket, key)
+        canonical_query = '&'.join(
+            f'{_uri_encode(name)}={_uri_encode(value)}' for name, value in sorted(query.items())
+        )
+        canonical_request = '\n'.join([
+            method,
+            path,
+            canonical_query,
+            f'host:{host}\n',
+            'host',
+            UNSIGNED_PAYLOAD,
+        ])
+        string_to_sign = '\n'.join([
+            ALGORITHM,
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode('utf-8')).hexdigest(),
+        ])
+        signing_key = self.key_cache.get(credentials.secret_key, date_stamp, self.region)
+        signature = hmac.new(signing_key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+
+        url = f'{scheme}://{host}{path}?{canonical_query}&X-Amz-Signature={signature}'
+        # Keep the URL only while it still has the full requested lifetime left
+        self.url_cache.set(cache_key, url, min(window_start + self.bucket_seconds, window_start + expires - int(expires_in)), now)
+        return url
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def _registry_credentials():
+    """Frozen credentials from the shared S3 client session (handles STS refresh)."""
+    from .s3_client import registry
+    return registry.get_session().get_credentials().get_frozen_credentials()
+
+
+def get_presign_engine():
+    """
+    Return the process-wide presign engine configured from settings.
+    S3_PRESIGN_BUCKET_SECONDS controls the URL reuse window and
+    S3_PRESIGN_CACHE_ALIAS optionally names a shared Django cache.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = PresignEngine(
+                    region=getattr(settings, 'AWS_REGION', None) or 'us-east-1',
+                    bucket_seconds=getattr(settings, 'S3_PRESIGN_BUCKET_SECONDS', 300),
+                    endpoint_url=getattr(settings, 'AWS_S3_ENDPOINT_URL', None),
+                    credentials_provider=_registry_credentials,
+                    url_cache=PresignedURLCache(
+                        max_entries=getattr(settings, 'S3_PRESIGN_CACHE_MAX_ENTRIES', 10000),
+                        shared_alias=getattr(settings, 'S3_PRESIGN_CACHE_ALIAS', None),
+                    ),
+                )
+    return _engine
@@ -0,0 +1,305 @@
+"""
+Fail-fast wrappers for external dependencies (S3, email).
+
+When S3 or SES degrades, every call would otherwise wait out botocore's
+timeouts and retries, and request threads pile up behind it. Three layers
+keep workers free:
+- explicit connect/read timeouts and botocore's adaptive retry mode
+  (exponential backoff with jitter plus client-side rate limiting), see
+  S3ClientRegistry._client_config
+- a CircuitBreaker per dependency: after failure_threshold consecutive
+  failures it opens and calls fail immediately with CircuitOpenError; after
+  recovery_timeout one trial call is let through (half-open) and its outcome
+  closes or re-opens the breaker
+- breaker state exported as metrics (metrics_view, Prometheus text format)
+
+Only failures of the dependency itself count (connection errors, timeouts,
+5xx and throttling), not client errors such as NoSuchKey or AccessDenied.
+
+Breakers are per process. Settings: CIRCUIT_BREAKERS = {name: {'failure_threshold': ..., 'recovery_timeout': ...}}.
+"""
+
+import os
+import time
+import logging
+import threading
+
+from django.conf import settings
+from django.core import mail
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RECOVERY_TIMEOUT = 30  # seconds
+
+# S3 error codes that mean the service, not the request, is in trouble
+DEPENDENCY_ERROR_CODES = {
+    'SlowDown', 'Throttling', 'ThrottlingException', 'RequestTimeout',
+    'ServiceUnavailable', 'InternalError', 'RequestTimeTooSkewed',
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+    def __init__(self, name, retry_after):
+        super().__init__(f"Circuit '{name}' is open; retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def is_dependency_failure(exc):
+    """
+    True if exc means the dependency is unhealthy rather than the request being wrong.
+    Only 5xx/throttling responses and botocore/urllib3 connection and timeout
+    errors count; local errors (e.g. reading an upload off disk) never do.
+    """
+    from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, HTTPClientError
+    from urllib3.exceptions import ProtocolError, TimeoutError as Urllib3TimeoutError, NewConnectionError
+
+    if isinstance(exc, ClientError):
+        error = exc.response.get('Error', {})
+        status = exc.response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+        return status >= 500 or error.get('Code') in DEPENDENCY_ERROR_CODES
+    return isinstance(exc, (BotoConnectionError, HTTPClientError, ProtocolError, Urllib3TimeoutError, NewConnectionError))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker, safe to share between threads.
+    States: closed (calls pass), open (calls fail fast), half-open (one trial call).
+    """
+
+    def __init__(self, name, failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                 recovery_timeout=DEFAULT_RECOVERY_TIMEOUT, is_failure=is_dependency_failure, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.is_failure = is_failure
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.counters = {'calls': 0, 'successes': 0, 'failures': 0, 'rejections': 0, 'opened': 0}
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    @property
+    def is_open(self):
+        """True while calls would be rejected (open and not yet due for a trial)."""
+        return self.state == OPEN
+
+    def _current_state(self):
+        if self._state == OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._trial_in_flight = False
+        self.counters['opened'] += 1
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError."""
+        with self._lock:
+            state = self._current_state()
+            if state == OPEN or (state == HALF_OPEN and self._trial_in_flight):
+                self.counters['rejections'] += 1
+                retry_after = max(self.recovery_timeout - (self._clock() - self._opened_at), 0)
+                raise CircuitOpenError(self.name, retry_after)
+            if state == HALF_OPEN:
+                self._trial_in_flight = True
+            self.counters['calls'] += 1
+
+    def record_success(self):
+        with self._lock:
+            self.counters['successes'] += 1
+            self._consecutive_failures = 0
+            if self._state != CLOSED:
+                logger.info(f"Circuit '{self.name}' closed after a successful trial call")
+            self._state = CLOSED
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.counters['failures'] += 1
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning(
+                        f"Circuit '{self.name}' opened after {self._consecutive_failures} consecutive failures; "
+                        f"failing fast for {self.recovery_timeout}s"
+                    )
+                self._open()
+
+    def call(self, func, *args, **kwargs):
+        """Run func through the breaker."""
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                # The dependency answered; a rejected request says nothing about its health
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'name': self.name,
+                'state': self._current_state(),
+                'consecutive_failures': self._consecutive_failures,
+                **self.counters,
+            }
+
+
+class BreakerClient:
+    """
+    Proxy that routes a boto3-style client's API calls through a breaker.
+    Attributes that are not API operations (meta, exceptions, paginators and
+    waiters, whose requests go through the wrapped client) pass straight through.
+    """
+
+    PASSTHROUGH = {'get_paginator', 'get_waiter', 'can_paginate', 'generate_presigned_url', 'generate_presigned_post'}
+
+    def __init__(self, client, breaker):
+        self._client = client
+        self.breaker = breaker
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if name.startswith('_') or name in self.PASSTHROUGH or not callable(attribute):
+            return attribute
+
+        def guarded(*args, **kwargs):
+            return self.breaker.call(attribute, *args, **kwargs)
+
+        guarded.__name__ = name
+        return guarded
+
+
+# ----------------------------------------------------------------------
+# Registry
+# ----------------------------------------------------------------------
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+_breakers_pid = os.getpid()
+
+
+def get_breaker(name):
+    """The process-wide breaker for a dependency, configured from CIRCUIT_BREAKERS."""
+    global _breakers_pid
+    if _breakers_pid != os.getpid():
+        # A forked worker starts with fresh state rather than its parent's
+        with _breakers_lock:
+            _breakers.clear()
+            _breakers_pid = os.getpid()
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                options = getattr(settings, 'CIRCUIT_BREAKERS', {}).get(name, {})
+                breaker = _breakers[name] = CircuitBreaker(
+                    name,
+                    failure_threshold=options.get('failure_threshold', DEFAULT_FAILURE_THRESHOLD),
+                    recovery_timeout=options.get('recovery_timeout', DEFAULT_RECOVERY_TIMEOUT),
+                )
+    return breaker
+
+
+def all_breakers():
+    return list(_breakers.values())
+
+
+def s3_available():
+    """False while the S3 breaker is open: callers should skip optional S3 work (e.g. streaming URLs)."""
+    return not get_breaker('s3').is_open
+
+
+# ----------------------------------------------------------------------
+# Email
+# ----------------------------------------------------------------------
+
+def send_mail(*args, **kwargs):
+    """
+    django.core.mail.send_mail through the 'email' breaker.
+    Raises CircuitOpenError while email delivery is failing; callers already
+    treat send failures as retryable (e.g. resend_failed_download_emails).
+    """
+    breaker = get_breaker('email')
+    breaker.before_call()
+    try:
+        result = mail.send_mail(*args, **kwargs)
+    except Exception:
+        # SMTP and SES errors alike mean delivery is failing
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    return result
+
+
+# ----------------------------------------------------------------------
+# Metrics
+# ----------------------------------------------------------------------
+
+def render_metrics():
+    """Breaker state and counters in Prometheus text exposition format."""
+    lines = [
+        '# HELP paletta_circuit_breaker_state Circuit breaker state (0=closed, 1=half-open, 2=open)',
+        '# TYPE paletta_circuit_breaker_state gauge',
+    ]
+    stats = [breaker.stats() for breaker in all_breakers()]
+    for item in stats:
+        lines.append(f'paletta_circuit_breaker_state{{name="{item["name"]}"}} {STATE_VALUES[item["state"]]}')
+    lines += [
+        '# HELP paletta_circuit_breaker_consecutive_failures Failures since the last success',
+        '# TYPE paletta_circuit_breaker_consecutive_failures gauge',
+    ]
+    for item in stats:
+        lines.append(f'paletta_circuit_breaker_consecutive_failures{{name="{item["name"]}"}} {item["consecutive_failures"]}')
+    for counter in ('calls', 'successes', 'failures', 'rejections', 'opened'):
+        metric = f'paletta_circuit_breaker_{counter}_total'
+        lines += [f'# HELP {metric} Circuit breaker {counter} since process start', f'# TYPE {metric} counter']
+        for item in stats:
+            lines.append(f'{metric}{{name="{item["name"]}",pid="{os.getpid()}"}} {item[counter]}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint for breaker state.
+    Requires 'Authorization: Bearer <METRICS_TOKEN>' when METRICS_TOKEN is set.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token and not constant_time_compare(request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'):
+        return HttpResponse(status=401)
+    # Make sure the usual breakers are reported even before their first call
+    get_breaker('s3')
+    get_breaker('email')
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4')
@@ -0,0 +1,195 @@
+"""
+Process-wide pooled S3 client registry.
+
+boto3 clients are thread-safe and expensive to build (endpoint resolution,
+service model loading, a fresh connection pool), so every service shares one
+client per configuration per process instead of constructing its own.
+The registry is fork-aware: gunicorn and Celery prefork children drop the
+parent's clients (and their sockets) and lazily build their own.
+"""
+
+import os
+import time
+import logging
+import threading
+
+import boto3
+from botocore.config import Config
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .resilience import BreakerClient, get_breaker
+
+logger = logging.getLogger(__name__)
+
+
+class S3ClientRegistry:
+    """
+    Thread-safe, fork-aware cache of boto3 S3 clients.
+    Clients are keyed by (region, access key, endpoint) so that services with
+    identical configuration share a single client and connection pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        """Drop every cached client; used at start-up and after fork."""
+        self._pid = os.getpid()
+        self._clients = {}
+        self._sessions = {}
+        self._health = {}
+        self._clients_created = 0
+
+    def _check_pid(self):
+        """Reset the registry if we are running in a forked child."""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    logger.info(f"Process fork detected (pid {os.getpid()}), resetting S3 client registry")
+                    self._reset()
+
+    def _after_fork(self):
+        """Fork hook: a lock held by another parent thread must not leak into the child."""
+        self._lock = threading.RLock()
+        self._reset()
+
+    @staticmethod
+    def _client_config():
+        """
+        Build the botocore configuration for pooled clients.
+        Pool size should be at least the number of threads that talk to S3
+        concurrently (multipart workers, request threads). Explicit timeouts and
+        adaptive retries bound how long a degraded S3 can hold a thread.
+        """
+        return Config(
+            max_pool_connections=getattr(settings, 'S3_MAX_POOL_CONNECTIONS', 50),
+            connect_timeout=getattr(settings, 'S3_CONNECT_TIMEOUT', 3),
+            read_timeout=getattr(settings, 'S3_READ_TIMEOUT', 30),
+            retries={'mode': 'adaptive', 'max_attempts': getattr(settings, 'S3_MAX_ATTEMPTS', 4)},
+            tcp_keepalive=True,
+            signature_version='s3v4',
+        )
+
+    @staticmethod
+    def _settings_key():
+        """Resolve the client configuration from Django settings."""
+        return (
+            getattr(settings, 'AWS_REGION', None) or 'us-east-1',
+            getattr(settings, 'AWS_ACCESS_KEY_ID', None),
+            getattr(settings, 'AWS_SECRET_ACCESS_KEY', None),
+            getattr(settings, 'AWS_S3_ENDPOINT_URL', None),
+        )
+
+    def get_session(self):
+        """
+        Return the boto3 session backing the default client.
+        Used by callers that need the resolved (possibly refreshed) credentials.
+        """
+        self.get_client()
+        key = self._settings_key()
+        return self._sessions.get(key)
+
+    def get_client(self):
+        """
+        Return the shared S3 client for the configured credentials.
+        Builds it on first use in this process. API calls go through the 's3'
+        circuit breaker (paletta_core.resilience).
+        """
+        self._check_pid()
+        key = self._settings_key()
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                region, access_key, secret_key, endpoint_url = key
+                # boto3's default session is not thread-safe; build a dedicated one
+                session = boto3.session.Session(
+                    aws_access_key_id=access_key,
+                    aws_secret_access_key=secret_key,
+                    region_name=region,
+                )
+                factory = getattr(settings, 'AWS_S3_CLIENT_FACTORY', None)
+                if factory:
+                    # Stand-in client (e.g. paletta_core.fake_s3) for local runs and benchmarks
+                    client = import_string(factory)()
+                else:
+                    client = session.client(
+                        's3',
+                        endpoint_url=endpoint_url,
+                        config=self._client_config(),
+                    )
+                client = BreakerClient(client, get_breaker('s3'))
+                self._sessions[key] = session
+                self._clients[key] = client
+                self._clients_created += 1
+                logger.info(f"Created S3 client for region {region} (pid {os.getpid()}, clients created: {self._clients_created})")
+        return client
+
+    def is_healthy(self, bucket_name):
+        """
+        Lazily check that the bucket is reachable.
+        The result is cached for S3_HEALTH_CHECK_TTL seconds so services can
+        call this on every instantiation without a network round trip.
+        """
+        self._check_pid()
+        if get_breaker('s3').is_open:
+            return False
+        ttl = getattr(settings, 'S3_HEALTH_CHECK_TTL', 300)
+        now = time.monotonic()
+
+        cached = self._health.get(bucket_name)
+        if cached is not None and now - cached[1] < ttl:
+            return cached[0]
+
+        with self._lock:
+            cached = self._health.get(bucket_name)
+            if cached is not None and now - cached[1] < ttl:
+                return cached[0]
+            try:
+                self.get_client().head_bucket(Bucket=bucket_name)
+                healthy = True
+                logger.info(f"Successfully connected to AWS S3 bucket {bucket_name}")
+            except Exception as e:
+                healthy = False
+                logger.error(f"Failed to connect to AWS S3 bucket {bucket_name}: {str(e)}")
+            # failures are re-checked sooner so a transient outage does not stick
+            self._health[bucket_name] = (healthy, now if healthy else now - ttl + min(ttl, 30))
+        return healthy
+
+    @property
+    def clients_created(self):
+        """Number of S3 clients built in the current process."""
+        self._check_pid()
+        return self._clients_created
+
+    def stats(self):
+        """Snapshot of registry state for logging and diagnostics."""
+        self._check_pid()
+        return {
+            'pid': self._pid,
+            'clients_created': self._clients_created,
+            'cached_clients': len(self._clients),
+            'health': {bucket: healthy for bucket, (healthy, _) in self._health.items()},
+        }
+
+
+registry = S3ClientRegistry()
+
+# Children of gunicorn / Celery prefork must not reuse the parent's sockets
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=registry._after_fork)
+
+
+def get_s3_client():
+    """Return the shared process-wide S3 client."""
+    return registry.get_client()
+
+
+def s3_is_healthy(bucket_name):
+    """Return the cached reachability of bucket_name."""
+    return registry.is_healthy(bucket_name)
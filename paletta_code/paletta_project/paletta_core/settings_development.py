@@ -68,6 +68,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'libraries.middleware.LibraryContextMiddleware',  # Add library context middleware
+    'videos.middleware.SignedCookieDeliveryMiddleware',  # Delivery cookies for the current library (signed-cookie mode)
 ]
 
 ROOT_URLCONF = 'paletta_core.urls'
@@ -175,6 +176,17 @@ MEDIA_ROOT = BASE_DIR.parent / 'media'
 # AWS Storage Configuration - Disabled in development
 AWS_STORAGE_ENABLED = False
 
+# Video objects are kept on local disk and streamed by /storage/local/ in development
+VIDEO_STORAGE_BACKEND = 'local'
+LOCAL_STORAGE_ROOT = MEDIA_ROOT / 'storage'
+
+# Video delivery: 'presigned' URLs per video, or 'signed_cookie' (one grant per library and session)
+VIDEO_DELIVERY_MODE = 'presigned'
+
+# Download links in emails are stable /d/<token>/ URLs signed to storage only when followed
+SITE_URL = 'http://localhost:8000'
+DOWNLOAD_REDIRECT_EXPIRY_SECONDS = 300
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
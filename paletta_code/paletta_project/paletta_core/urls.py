@@ -12,6 +12,7 @@ from django.views.generic import TemplateView
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponse
 from libraries.views import CreateLibraryView, ManageLibrariesView, EditLibraryView
+from paletta_core.resilience import metrics_view
 
 # health check view
 def health_check(request):
@@ -27,6 +28,8 @@ from accounts.views.admin_view import ManageAdministratorsView
 from videos.views.clip_store_view import CategoryClipView
 from videos.views.video_detail_view import VideoDetailView
 from videos.views.video_management_views import VideoEditView, VideoDeleteView
+from videos.views.local_storage_views import LocalStorageObjectView, LocalDeliveryView
+from videos.views.download_view import DownloadRedirectView
 
 from videos.views.page_views import UploadPageView
 from videos.views.upload_view import MyVideosView
@@ -48,6 +51,17 @@ urlpatterns = [
     # Include orders app API URLs with API prefix for download requests
     path('api/orders/', include('orders.api_urls')),
     
+    # Async versions of the S3-bound APIs (effective under an ASGI server)
+    path('api/async/orders/', include('orders.async_api_urls')),
+    path('api/async/', include('videos.async_api_urls')),
+    
+    # Signed-token object access for the local storage backend (stands in for S3 presigned URLs)
+    path('storage/local/<str:token>/', LocalStorageObjectView.as_view(), name='local_storage_object'),
+    # Cookie-authorised delivery URLs (CloudFront stand-in for VIDEO_DELIVERY_MODE='signed_cookie')
+    path('delivery/<path:key>', LocalDeliveryView.as_view(), name='local_delivery'),
+    # Click-time download links: validate the grant, then 302 to a freshly presigned URL
+    path('d/<str:token>/', DownloadRedirectView.as_view(), name='download_redirect'),
+    
     # HTML page routes
     path('', CustomLoginView.as_view(), name='login'),
     path('signup/', SignupView.as_view(), name='signup'),
@@ -106,6 +120,8 @@ urlpatterns = [
     path('contributor/apply/', TemplateView.as_view(template_name='contributor_form.html'), name='contributor_apply'),
     # health check endpoint
     path('healthcheck/', health_check, name='health_check'),
+    # circuit breaker state for S3 and email (Prometheus text format)
+    path('metrics/resilience/', metrics_view, name='resilience_metrics'),
 ]
 
 # serve static files during development
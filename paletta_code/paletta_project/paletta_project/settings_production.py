@@ -84,6 +84,16 @@ INSTALLED_APPS = [
 
 # AWS S3 Storage Configuration
 AWS_STORAGE_ENABLED = True
+VIDEO_STORAGE_BACKEND = os.environ.get('VIDEO_STORAGE_BACKEND', 's3')
+
+# Signed-cookie delivery through CloudFront (VIDEO_DELIVERY_MODE='signed_cookie')
+VIDEO_DELIVERY_MODE = os.environ.get('VIDEO_DELIVERY_MODE', 'presigned')
+VIDEO_DELIVERY_URL = os.environ.get('VIDEO_DELIVERY_URL')  # e.g. https://videos.paletta.io (CloudFront in front of the video bucket)
+VIDEO_DELIVERY_COOKIE_DOMAIN = os.environ.get('VIDEO_DELIVERY_COOKIE_DOMAIN')  # e.g. .paletta.io so the CDN host receives the cookies
+VIDEO_DELIVERY_COOKIE_TTL = int(os.environ.get('VIDEO_DELIVERY_COOKIE_TTL', str(6 * 3600)))
+CLOUDFRONT_KEY_PAIR_ID = os.environ.get('CLOUDFRONT_KEY_PAIR_ID')
+CLOUDFRONT_PRIVATE_KEY = os.environ.get('CLOUDFRONT_PRIVATE_KEY')  # PEM; literal \n sequences are accepted
+CLOUDFRONT_PRIVATE_KEY_PATH = os.environ.get('CLOUDFRONT_PRIVATE_KEY_PATH')
 AWS_ACCESS_KEY_ID = os.environ.get('AWS_ACCESS_KEY_ID')
 AWS_SECRET_ACCESS_KEY = os.environ.get('AWS_SECRET_ACCESS_KEY')
 AWS_REGION = os.environ.get('AWS_REGION')
@@ -119,13 +129,108 @@ STATIC_VERSION = '0.0.0'
 # Download link configuration - 48 hours for download requests
 DOWNLOAD_LINK_EXPIRY_HOURS = int(os.environ.get('DOWNLOAD_LINK_EXPIRY_HOURS', '48'))  # 48 hours for download requests
 DOWNLOAD_REQUEST_EXPIRY_HOURS = 48  # Fixed 48-hour expiry for download requests
+DOWNLOAD_REDIRECT_EXPIRY_SECONDS = int(os.environ.get('DOWNLOAD_REDIRECT_EXPIRY_SECONDS', '300'))  # presigned URL signed when a /d/ link is followed
+SITE_URL = os.environ.get('SITE_URL', 'https://paletta.io')  # absolute links in emails
 DELETE_LOCAL_FILE_AFTER_UPLOAD = os.environ.get('DELETE_LOCAL_FILE_AFTER_UPLOAD', 'True') == 'True'
 SEND_UPLOAD_CONFIRMATION_EMAIL = os.environ.get('SEND_UPLOAD_CONFIRMATION_EMAIL', 'True') == 'True'
 
 # S3 Multipart Upload Configuration - Performance optimization for large files
 S3_MULTIPART_THRESHOLD = int(os.environ.get('S3_MULTIPART_THRESHOLD', '5242880'))  # 5MB default
 S3_MULTIPART_CHUNK_SIZE = int(os.environ.get('S3_MULTIPART_CHUNK_SIZE', '104857600'))  # 100MB chunks for large files
+# Largest accepted video; S3 caps objects at 5TB and parts grow so any size fits in 10,000 parts
+MAX_UPLOAD_SIZE = int(os.environ.get('MAX_UPLOAD_SIZE', str(5 * 1024 ** 4)))
 S3_MAX_CONCURRENT_PARTS = int(os.environ.get('S3_MAX_CONCURRENT_PARTS', '100'))  # 100 concurrent parts for large files
+# Browser multipart uploads: bounds for the server-recommended plan (see videos/multipart.py)
+S3_CLIENT_MAX_CONCURRENCY = int(os.environ.get('S3_CLIENT_MAX_CONCURRENCY', '10'))
+S3_CLIENT_MIN_CONCURRENCY = int(os.environ.get('S3_CLIENT_MIN_CONCURRENCY', '2'))
+S3_CLIENT_INFLIGHT_BYTES = int(os.environ.get('S3_CLIENT_INFLIGHT_BYTES', str(1024 * 1024 * 1024)))  # 1GB of parts in flight per browser
+S3_CLIENT_MAX_PART_SIZE = int(os.environ.get('S3_CLIENT_MAX_PART_SIZE', str(512 * 1024 * 1024)))  # browsers hash each part in one buffer
+# Incomplete multipart uploads with no live session are aborted after this many hours
+S3_MULTIPART_REAP_AFTER_HOURS = int(os.environ.get('S3_MULTIPART_REAP_AFTER_HOURS', '24'))
+S3_MULTIPART_REAP_WORKERS = int(os.environ.get('S3_MULTIPART_REAP_WORKERS', '8'))
+S3_RECONCILE_GRACE_HOURS = int(os.environ.get('S3_RECONCILE_GRACE_HOURS', '24'))  # unreferenced objects younger than this may still be registering
+# Server-side copies (moving/copying videos between libraries): CopyObject up to 5GB, parallel UploadPartCopy above
+S3_COPY_MULTIPART_THRESHOLD = int(os.environ.get('S3_COPY_MULTIPART_THRESHOLD', str(5 * 1024 ** 3)))
+S3_COPY_PART_SIZE = int(os.environ.get('S3_COPY_PART_SIZE', str(512 * 1024 * 1024)))
+S3_COPY_MAX_CONCURRENT_PARTS = int(os.environ.get('S3_COPY_MAX_CONCURRENT_PARTS', '16'))
+# Videos copied at a time by migrate_storage_keys (canonical library_<id>/<hh>/<digest> layout)
+STORAGE_KEY_MIGRATION_WORKERS = int(os.environ.get('STORAGE_KEY_MIGRATION_WORKERS', '8'))
+# Server-side multipart memory bounds - parts are throttled by in-flight bytes, not part count
+S3_UPLOAD_MEMORY_BUDGET = int(os.environ.get('S3_UPLOAD_MEMORY_BUDGET', str(512 * 1024 * 1024)))  # 512MB of part data in flight per process
+S3_UPLOAD_RSS_CAP = int(os.environ['S3_UPLOAD_RSS_CAP']) if os.environ.get('S3_UPLOAD_RSS_CAP') else None  # optional RSS ceiling in bytes
+# Form uploads of video files are streamed into a multipart upload (videos/upload_handlers.py)
+S3_STREAMING_UPLOAD_PART_SIZE = int(os.environ.get('S3_STREAMING_UPLOAD_PART_SIZE', str(16 * 1024 * 1024)))  # grown for very large requests
+S3_STREAMING_UPLOAD_CONCURRENCY = int(os.environ.get('S3_STREAMING_UPLOAD_CONCURRENCY', '2'))  # parts in flight per upload
+STREAMING_UPLOAD_FIELDS = ('video_file',)
+
+# Post-upload media pipeline (videos/media.py) - needs ffmpeg/ffprobe on the media workers.
+# Opt-in: while enabled, new uploads stay 'processing' (unplayable) until a '-Q media' worker picks them up
+MEDIA_PROCESSING_ENABLED = os.environ.get('MEDIA_PROCESSING_ENABLED', 'False') == 'True'
+FFPROBE_BINARY = os.environ.get('FFPROBE_BINARY', 'ffprobe')
+MEDIA_PROBE_SIZE = int(os.environ.get('MEDIA_PROBE_SIZE', str(32 * 1024 * 1024)))  # bytes ffprobe may read to find the streams
+MEDIA_READ_TIMEOUT = int(os.environ.get('MEDIA_READ_TIMEOUT', '30'))  # seconds without data before a ranged read fails
+MEDIA_SOURCE_URL_EXPIRY = int(os.environ.get('MEDIA_SOURCE_URL_EXPIRY', str(6 * 3600)))  # presigned source URLs for ffmpeg
+FFMPEG_BINARY = os.environ.get('FFMPEG_BINARY', 'ffmpeg')
+# Generated thumbnails (videos/thumbnails.py): bounding boxes per size, each stored as WebP and JPEG
+THUMBNAIL_SIZES = {
+    'card': (320, 180),
+    'detail': (640, 360),
+    'retina': (1280, 720),
+}
+THUMBNAIL_POSITION = float(os.environ.get('THUMBNAIL_POSITION', '0.1'))  # fraction of the duration
+# Hover-scrub sprite sheets for clip store cards (videos/sprites.py)
+SCRUB_SPRITE_FRAMES = int(os.environ.get('SCRUB_SPRITE_FRAMES', '30'))
+SCRUB_SPRITE_COLUMNS = 10
+SCRUB_SPRITE_TILE_WIDTH = 160  # px; cards are ~300px wide, tiles are shown scaled up slightly
+SCRUB_SPRITE_WORKERS = int(os.environ.get('SCRUB_SPRITE_WORKERS', '8'))  # parallel frame seeks per video
+# HLS previews for in-page playback (videos/previews.py); the original stays the download master
+HLS_PREVIEW_ENABLED = os.environ.get('HLS_PREVIEW_ENABLED', 'True') == 'True'
+HLS_PREVIEW_LADDER = [
+    {'name': '360p', 'height': 360, 'video_bitrate': '800k', 'audio_bitrate': '96k'},
+    {'name': '720p', 'height': 720, 'video_bitrate': '2800k', 'audio_bitrate': '128k'},
+]
+HLS_SEGMENT_SECONDS = int(os.environ.get('HLS_SEGMENT_SECONDS', '2'))
+HLS_PREVIEW_PRESET = os.environ.get('HLS_PREVIEW_PRESET', 'veryfast')  # x264 speed/size trade-off
+PREVIEW_SEGMENT_URL_EXPIRY = int(os.environ.get('PREVIEW_SEGMENT_URL_EXPIRY', str(4 * 3600)))
+MEDIA_WORK_DIR = os.environ.get('MEDIA_WORK_DIR') or None  # scratch space for renditions before upload
+# Parallel segmented transcoding (videos/transcoding.py) for sources of at least TRANSCODE_PARALLEL_MIN_SECONDS
+TRANSCODE_WORKERS = int(os.environ.get('TRANSCODE_WORKERS', '0')) or None  # ffmpeg processes per video; None = CPU count
+TRANSCODE_SEGMENT_SECONDS = int(os.environ.get('TRANSCODE_SEGMENT_SECONDS', '20'))
+TRANSCODE_PARALLEL_MIN_SECONDS = int(os.environ.get('TRANSCODE_PARALLEL_MIN_SECONDS', '60'))
+
+# Shared S3 client pool - one client per process, sized for the multipart workers above
+S3_MAX_POOL_CONNECTIONS = int(os.environ.get('S3_MAX_POOL_CONNECTIONS', str(S3_MAX_CONCURRENT_PARTS)))
+S3_HEALTH_CHECK_TTL = int(os.environ.get('S3_HEALTH_CHECK_TTL', '300'))  # seconds between bucket reachability checks
+
+# Resilience: bounded S3 waits, adaptive retries, and circuit breakers that fail fast while S3/email are down
+S3_CONNECT_TIMEOUT = int(os.environ.get('S3_CONNECT_TIMEOUT', '3'))
+S3_READ_TIMEOUT = int(os.environ.get('S3_READ_TIMEOUT', '30'))
+S3_MAX_ATTEMPTS = int(os.environ.get('S3_MAX_ATTEMPTS', '4'))  # adaptive retry mode, including the first attempt
+CIRCUIT_BREAKERS = {
+    's3': {
+        'failure_threshold': int(os.environ.get('S3_BREAKER_FAILURE_THRESHOLD', '5')),
+        'recovery_timeout': int(os.environ.get('S3_BREAKER_RECOVERY_TIMEOUT', '30')),
+    },
+    'email': {
+        'failure_threshold': int(os.environ.get('EMAIL_BREAKER_FAILURE_THRESHOLD', '3')),
+        'recovery_timeout': int(os.environ.get('EMAIL_BREAKER_RECOVERY_TIMEOUT', '60')),
+    },
+}
+EMAIL_TIMEOUT = int(os.environ.get('EMAIL_TIMEOUT', '10'))  # SMTP socket timeout
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # bearer token for /metrics/resilience/
+
+# Optional stand-in S3 client for local runs and benchmarks, e.g. 'paletta_core.fake_s3.get_fake_s3_client'
+AWS_S3_CLIENT_FACTORY = os.environ.get('AWS_S3_CLIENT_FACTORY') or None
+FAKE_S3_RETAIN_DATA = os.environ.get('FAKE_S3_RETAIN_DATA', 'True').lower() == 'true'  # False keeps sizes and ETags only
+
+# Async API views (/api/async/) - blocking S3 calls run on a bounded per-process executor
+S3_ASYNC_MAX_WORKERS = int(os.environ.get('S3_ASYNC_MAX_WORKERS', '64'))
+S3_ASYNC_MAX_INFLIGHT = int(os.environ.get('S3_ASYNC_MAX_INFLIGHT', '256'))
+
+# Presigned URL engine - URLs are signed on 5 minute boundaries and reused within the window
+S3_PRESIGN_BUCKET_SECONDS = int(os.environ.get('S3_PRESIGN_BUCKET_SECONDS', '300'))
+S3_PRESIGN_CACHE_MAX_ENTRIES = int(os.environ.get('S3_PRESIGN_CACHE_MAX_ENTRIES', '10000'))
+S3_PRESIGN_CACHE_ALIAS = os.environ.get('S3_PRESIGN_CACHE_ALIAS')  # optional shared Django cache alias
 
 # AWS SES Configuration for email automation
 AWS_SES_ENABLED = os.environ.get('AWS_SES_ENABLED', 'False') == 'True'
@@ -142,6 +247,14 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+# Media work (ffprobe/ffmpeg) runs on its own queue so a separate, small worker
+# bounds its concurrency: celery -A paletta_project worker -Q media -c 2 --prefetch-multiplier 1
+CELERY_TASK_ROUTES = {
+    'videos.tasks.probe_video': {'queue': 'media'},
+    'videos.tasks.generate_thumbnails': {'queue': 'media'},
+    'videos.tasks.generate_scrub_sprite': {'queue': 'media'},
+    'videos.tasks.transcode_preview': {'queue': 'media'},
+}
 
 # Celery Beat schedule for periodic tasks
 from celery.schedules import crontab
@@ -158,6 +271,14 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'videos.tasks.retry_failed_uploads',
         'schedule': crontab(minute='*/30'),  # Run every 30 minutes
     },
+    'reap-stale-multipart-uploads': {
+        'task': 'videos.tasks.reap_stale_multipart_uploads',
+        'schedule': crontab(minute=15, hour='*/6'),  # Run every 6 hours
+    },
+    'reconcile-storage': {
+        'task': 'videos.tasks.reconcile_storage',
+        'schedule': crontab(minute=45, hour=3),  # Run daily
+    },
 }
 
 # Email Configuration
@@ -230,10 +351,17 @@ if not os.path.exists(logs_dir):
     os.makedirs(logs_dir)
 
 # File upload settings
-# NOTE: Increasing this to a large value without implementing direct-to-S3 uploads
-# can cause server instability, as the entire file will be temporarily stored on the server's disk.
-FILE_UPLOAD_MAX_MEMORY_SIZE = 274877906944  # 256GB
-DATA_UPLOAD_MAX_MEMORY_SIZE = 274877906944  # 256GB
+# Video files are streamed straight into S3 by the first handler; everything else
+# (thumbnails, logos) is small and goes to memory or a temporary file as usual.
+# NOTE: Keep the memory limits small - raising them makes Django buffer whole
+# request bodies in RAM again.
+FILE_UPLOAD_HANDLERS = [
+    'videos.upload_handlers.S3StreamingUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB, larger files spill to a temporary file
+DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB of non-file form data
 
 CSRF_TRUSTED_ORIGINS = [
     'http://paletta-alb-62461270.eu-west-2.elb.amazonaws.com',
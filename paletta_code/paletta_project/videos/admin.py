@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Video, Tag, VideoLog, VideoTag, ContentType, PalettaContentType
+from .models import Video, Tag, VideoLog, VideoTag, ContentType, PalettaContentType, UploadSession
 from django.urls import reverse
 
 class VideoLogInline(admin.TabularInline):
@@ -252,6 +252,13 @@ class VideoLogAdmin(admin.ModelAdmin):
         return '-'
     file_size_display.short_description = 'File Size'
 
+class UploadSessionAdmin(admin.ModelAdmin):
+    """Admin interface for browser multipart upload sessions."""
+    list_display = ('key', 'user', 'status', 'file_size', 'part_size', 'created_at', 'completed_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('key', 'upload_id', 'file_name', 'user__email')
+    readonly_fields = ('upload_id', 'bucket', 'key', 'parts', 'created_at', 'updated_at', 'completed_at')
+
 # Register the models with admin
 admin.site.register(Video, VideoAdmin)
 admin.site.register(ContentType, ContentTypeAdmin)
@@ -259,4 +266,5 @@ admin.site.register(PalettaContentType, PalettaContentTypeAdmin)
 admin.site.register(Tag, TagAdmin)
 admin.site.register(VideoTag, VideoTagAdmin)
 
-admin.site.register(VideoLog, VideoLogAdmin)
\ No newline at end of file
+admin.site.register(VideoLog, VideoLogAdmin)
+admin.site.register(UploadSession, UploadSessionAdmin)
@@ -7,17 +7,23 @@ from django.urls import path
 from .views.viewsets import ContentTypeViewSet
 from .views.api_views import (
     UnifiedVideoListAPIView, VideoDetailAPIView, PopularTagsAPIView, VideoAPIUploadView,
-    S3MultipartUploadView, S3UploadPartView, S3CompleteMultipartUploadView, S3AbortMultipartUploadView
+    S3MultipartUploadView, S3UploadPartView, S3CompleteMultipartUploadView, S3AbortMultipartUploadView,
+    S3UploadSessionView, S3UploadPartURLsView, S3UploadTelemetryView, VideoBulkDeleteAPIView,
+    VideoRelocateAPIView
 )
 from .views.tag_views import TagsAPIView
 from .views.video_management_views import TagSuggestionsAPIView
 from .views.thumbnail_view import VideoThumbnailAPIView
+from .views.preview_views import VideoPreviewPlaylistView
 
 # API URL patterns (no api/ prefix - will be added by main urls.py)
 urlpatterns = [
     # Core API - Video CRUD operations
     path('videos/', UnifiedVideoListAPIView.as_view(), name='api_videos_list'),
     path('videos/<int:video_id>/', VideoDetailAPIView.as_view(), name='api_video_detail'),
+    path('videos/bulk-delete/', VideoBulkDeleteAPIView.as_view(), name='api_videos_bulk_delete'),
+    path('videos/<int:video_id>/relocate/', VideoRelocateAPIView.as_view(), name='api_video_relocate'),
+    path('videos/<int:video_id>/preview/<path:playlist>', VideoPreviewPlaylistView.as_view(), name='api_video_preview_playlist'),
     path('uploads/', VideoAPIUploadView.as_view(), name='api_upload'),  # Standardized to plural
     
     # Content Type APIs - Library-specific content type system  
@@ -27,8 +33,11 @@ urlpatterns = [
     # S3 Multipart Upload APIs - For large file uploads
     path('s3/create-multipart-upload/', S3MultipartUploadView.as_view(), name='api_s3_create_multipart'),
     path('s3/get-upload-part-url/', S3UploadPartView.as_view(), name='api_s3_upload_part'),
+    path('s3/get-upload-part-urls/', S3UploadPartURLsView.as_view(), name='api_s3_upload_part_urls'),
     path('s3/complete-multipart-upload/', S3CompleteMultipartUploadView.as_view(), name='api_s3_complete_multipart'),
     path('s3/abort-multipart-upload/', S3AbortMultipartUploadView.as_view(), name='api_s3_abort_multipart'),
+    path('s3/upload-sessions/<str:upload_id>/', S3UploadSessionView.as_view(), name='api_s3_upload_session'),
+    path('s3/upload-sessions/<str:upload_id>/telemetry/', S3UploadTelemetryView.as_view(), name='api_s3_upload_telemetry'),
     
     # Media & Metadata APIs - File and thumbnail handling
     path('clip/<int:clip_id>/thumbnail/', VideoThumbnailAPIView.as_view(), name='api_clip_thumbnail'),
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class VideosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'videos'
+
+    def ready(self):
+        # Register storage cleanup for deleted videos
+        from . import signals  # noqa: F401
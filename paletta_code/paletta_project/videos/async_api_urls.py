@@ -0,0 +1,22 @@
+"""
+Async API URL patterns for the videos app.
+Served under /api/async/ for ASGI deployments; same contracts as the /api/ endpoints.
+"""
+
+from django.urls import path
+from .views.async_views import (
+    AsyncS3MultipartUploadView, AsyncS3UploadPartURLsView, AsyncS3UploadSessionView,
+    AsyncS3CompleteMultipartUploadView, AsyncS3AbortMultipartUploadView, AsyncVideoUploadView
+)
+
+# Async API URL patterns (no api/async/ prefix - will be added by main urls.py)
+urlpatterns = [
+    path('uploads/', AsyncVideoUploadView.as_view(), name='async_api_upload'),
+    
+    # S3 Multipart Upload APIs
+    path('s3/create-multipart-upload/', AsyncS3MultipartUploadView.as_view(), name='async_api_s3_create_multipart'),
+    path('s3/get-upload-part-urls/', AsyncS3UploadPartURLsView.as_view(), name='async_api_s3_upload_part_urls'),
+    path('s3/upload-sessions/<str:upload_id>/', AsyncS3UploadSessionView.as_view(), name='async_api_s3_upload_session'),
+    path('s3/complete-multipart-upload/', AsyncS3CompleteMultipartUploadView.as_view(), name='async_api_s3_complete_multipart'),
+    path('s3/abort-multipart-upload/', AsyncS3AbortMultipartUploadView.as_view(), name='async_api_s3_abort_multipart'),
+]
@@ -0,0 +1,122 @@
+"""
+Async facade over AWSCloudStorageService for ASGI views.
+
+boto3 is blocking, so S3-bound work runs on a dedicated, bounded thread pool
+(S3_ASYNC_MAX_WORKERS threads) while the event loop keeps serving requests.
+A per-loop semaphore (S3_ASYNC_MAX_INFLIGHT) caps queued work so a burst
+cannot grow the backlog without limit. Executor threads close stale database
+connections after each call, as Django does at the end of a request.
+"""
+
+import os
+import asyncio
+import logging
+import weakref
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_semaphores = weakref.WeakKeyDictionary()  # event loop -> asyncio.Semaphore
+
+
+def get_storage_executor():
+    """Process-wide thread pool for blocking storage calls."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'S3_ASYNC_MAX_WORKERS', 64),
+                    thread_name_prefix='storage-io',
+                )
+    return _executor
+
+
+def _reset_after_fork():
+    """Executor threads do not survive fork; children build their own pool."""
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+    _semaphores.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _inflight_semaphore():
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(getattr(settings, 'S3_ASYNC_MAX_INFLIGHT', 256))
+    return semaphore
+
+
+def _call_and_release_connections(func, args, kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking storage/database call on the storage executor and await its result."""
+    async with _inflight_semaphore():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_storage_executor(),
+            functools.partial(_call_and_release_connections, func, args, kwargs),
+        )
+
+
+class AsyncStorageService:
+    """
+    Awaitable counterpart of AWSCloudStorageService.
+    Each method runs the synchronous implementation on the storage executor,
+    so behaviour (validation, UploadSession bookkeeping, logging) is identical.
+    """
+
+    def __init__(self, storage_service):
+        self._service = storage_service
+
+    @classmethod
+    async def create(cls):
+        """Build the service off the event loop (the first call may probe the bucket)."""
+        from .services import AWSCloudStorageService
+        return cls(await run_blocking(AWSCloudStorageService))
+
+    @property
+    def storage_enabled(self):
+        return self._service.storage_enabled
+
+    def presign_upload_part(self, session, part_number, expiry=3600, checksum=None):
+        # Signing is local CPU work with a cached key; no need to leave the loop
+        return self._service.presign_upload_part(session, part_number, expiry, checksum)
+
+    def presign_upload_parts(self, session, part_numbers, expiry=3600, checksums=None):
+        return self._service.presign_upload_parts(session, part_numbers, expiry, checksums)
+
+    async def create_multipart_upload(self, *args, **kwargs):
+        return await run_blocking(self._service.create_multipart_upload, *args, **kwargs)
+
+    async def list_uploaded_parts(self, session):
+        return await run_blocking(self._service.list_uploaded_parts, session)
+
+    async def complete_multipart_upload(self, session):
+        return await run_blocking(self._service.complete_multipart_upload, session)
+
+    async def abort_multipart_upload(self, session):
+        return await run_blocking(self._service.abort_multipart_upload, session)
+
+    async def generate_streaming_url(self, video, granted_library_id=None):
+        return await run_blocking(self._service.generate_streaming_url, video, granted_library_id)
+
+    async def delete_objects(self, keys, bucket=None):
+        return await run_blocking(self._service.delete_objects, keys, bucket)
@@ -0,0 +1,230 @@
+"""
+Video delivery modes.
+
+VIDEO_DELIVERY_MODE = 'presigned' (default)
+    Every streaming URL is an individually presigned storage URL.
+
+VIDEO_DELIVERY_MODE = 'signed_cookie'
+    Videos are served from VIDEO_DELIVERY_URL (a CloudFront distribution in
+    front of the bucket). Once per session, and again when the grant nears
+    expiry, SignedCookieDeliveryMiddleware sets CloudFront signed cookies whose
+    custom policy allows '<VIDEO_DELIVERY_URL>/library_<id>/*' for the current
+    library. Listings then emit plain object URLs with no per-video signing.
+    Objects outside the library prefix still get presigned URLs.
+
+Without a CloudFront key pair (CLOUDFRONT_KEY_PAIR_ID / CLOUDFRONT_PRIVATE_KEY)
+the cookies are signed with an HMAC of SECRET_KEY instead, and
+LocalDeliveryView verifies them the way CloudFront would, which keeps the
+mode usable in development and tests.
+"""
+
+import json
+import time
+import base64
+import fnmatch
+import logging
+import urllib.parse
+
+from django.conf import settings
+from django.utils.crypto import salted_hmac, constant_time_compare
+
+logger = logging.getLogger(__name__)
+
+COOKIE_POLICY = 'CloudFront-Policy'
+COOKIE_SIGNATURE = 'CloudFront-Signature'
+COOKIE_KEY_PAIR_ID = 'CloudFront-Key-Pair-Id'
+
+LOCAL_KEY_PAIR_ID = 'local'
+LOCAL_DELIVERY_PATH = '/delivery'  # served by LocalDeliveryView when VIDEO_DELIVERY_URL is unset
+
+
+def _cf_b64encode(data):
+    """CloudFront's URL-safe base64 variant."""
+    return base64.b64encode(data).decode('ascii').replace('+', '-').replace('=', '_').replace('/', '~')
+
+
+def _cf_b64decode(value):
+    return base64.b64decode(value.replace('-', '+').replace('_', '=').replace('~', '/'))
+
+
+class CloudFrontCookieSigner:
+    """
+    RSA-SHA1 signatures with a CloudFront key pair.
+    Requires the cryptography package; CloudFront itself verifies the cookies.
+    """
+
+    def __init__(self, key_pair_id, private_key_pem):
+        from cryptography.hazmat.primitives import serialization
+        self.key_pair_id = key_pair_id
+        if isinstance(private_key_pem, str):
+            private_key_pem = private_key_pem.replace('\\n', '\n').encode('ascii')
+        self._private_key = serialization.load_pem_private_key(private_key_pem, password=None)
+
+    def sign(self, message):
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding
+        return self._private_key.sign(message, padding.PKCS1v15(), hashes.SHA1())
+
+
+class LocalCookieSigner:
+    """Stand-in for a CloudFront key pair: HMAC-SHA256 keyed by SECRET_KEY, verifiable locally."""
+
+    key_pair_id = LOCAL_KEY_PAIR_ID
+    salt = 'paletta.videos.delivery-cookie'
+
+    def sign(self, message):
+        return salted_hmac(self.salt, message, algorithm='sha256').digest()
+
+    def verify(self, message, signature):
+        return constant_time_compare(self.sign(message), signature)
+
+
+_signer = None
+
+
+def get_cookie_signer():
+    """CloudFront signer when a key pair is configured, otherwise the local stand-in."""
+    global _signer
+    if _signer is None:
+        key_pair_id = getattr(settings, 'CLOUDFRONT_KEY_PAIR_ID', None)
+        private_key = getattr(settings, 'CLOUDFRONT_PRIVATE_KEY', None)
+        private_key_path = getattr(settings, 'CLOUDFRONT_PRIVATE_KEY_PATH', None)
+        if key_pair_id and (private_key or private_key_path):
+            if not private_key:
+                with open(private_key_path, 'rb') as handle:
+                    private_key = handle.read()
+            _signer = CloudFrontCookieSigner(key_pair_id, private_key)
+        else:
+            _signer = LocalCookieSigner()
+    return _signer
+
+
+# ----------------------------------------------------------------------
+# Configuration
+# ----------------------------------------------------------------------
+
+def cookie_delivery_enabled():
+    return getattr(settings, 'VIDEO_DELIVERY_MODE', 'presigned') == 'signed_cookie'
+
+
+def delivery_base_url():
+    """Origin (and path) that plain object URLs are built on."""
+    return (getattr(settings, 'VIDEO_DELIVERY_URL', None) or LOCAL_DELIVERY_PATH).rstrip('/')
+
+
+def cookie_ttl():
+    return int(getattr(settings, 'VIDEO_DELIVERY_COOKIE_TTL', 6 * 3600))
+
+
+def library_prefix(library_id):
+    """Key prefix whose objects a library grant covers."""
+    return f'library_{library_id}/'
+
+
+def granted_library(request):
+    """
+    The library whose delivery cookies accompany request's response
+    (SignedCookieDeliveryMiddleware), or None. Only objects of this library
+    may be handed out as plain delivery URLs.
+    """
+    if not cookie_delivery_enabled():
+        return None
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    return getattr(request, 'current_library', None)
+
+
+def delivery_url(key):
+    """Unsigned URL of an object on the delivery origin."""
+    return f"{delivery_base_url()}/{urllib.parse.quote(key)}"
+
+
+def library_resource(library_id):
+    """Policy resource pattern for everything under a library's prefix."""
+    return f"{delivery_base_url()}/{library_prefix(library_id)}*"
+
+
+# ----------------------------------------------------------------------
+# Policies and cookies
+# ----------------------------------------------------------------------
+
+def build_policy(resource, expires_at):
+    """CloudFront custom policy JSON (no whitespace, as CloudFront expects)."""
+    return json.dumps(
+        {'Statement': [{'Resource': resource, 'Condition': {'DateLessThan': {'AWS:EpochTime': int(expires_at)}}}]},
+        separators=(',', ':'),
+    )
+
+
+def signed_cookies(resource, expires_at, signer=None):
+    """Cookie values granting access to resource until expires_at."""
+    signer = signer or get_cookie_signer()
+    policy = build_policy(resource, expires_at).encode('utf-8')
+    return {
+        COOKIE_POLICY: _cf_b64encode(policy),
+        COOKIE_SIGNATURE: _cf_b64encode(signer.sign(policy)),
+        COOKIE_KEY_PAIR_ID: signer.key_pair_id,
+    }
+
+
+def read_policy(cookies):
+    """(resource, expires_at) from a request's policy cookie, or None if absent or malformed."""
+    value = cookies.get(COOKIE_POLICY)
+    if not value:
+        return None
+    try:
+        statement = json.loads(_cf_b64decode(value))['Statement'][0]
+        return statement['Resource'], int(statement['Condition']['DateLessThan']['AWS:EpochTime'])
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None
+
+
+def verify_signed_cookies(cookies, url, signer=None, now=None):
+    """
+    Check signed cookies the way CloudFront does: known key pair, valid
+    signature, policy resource matching url, and not expired.
+    Only possible with a signer that can verify (LocalCookieSigner).
+    """
+    signer = signer or get_cookie_signer()
+    if not hasattr(signer, 'verify') or cookies.get(COOKIE_KEY_PAIR_ID) != signer.key_pair_id:
+        return False
+    try:
+        policy = _cf_b64decode(cookies.get(COOKIE_POLICY, ''))
+        signature = _cf_b64decode(cookies.get(COOKIE_SIGNATURE, ''))
+    except ValueError:
+        return False
+    if not signer.verify(policy, signature):
+        return False
+    grant = read_policy(cookies)
+    if grant is None:
+        return False
+    resource, expires_at = grant
+    return expires_at > (now or time.time()) and fnmatch.fnmatchcase(url, resource)
+
+
+def grant_covers(cookies, library_id, now=None):
+    """True if the request already holds a grant for library_id that is not close to expiry."""
+    grant = read_policy(cookies)
+    if grant is None:
+        return False
+    resource, expires_at = grant
+    return resource == library_resource(library_id) and expires_at - (now or time.time()) > cookie_ttl() / 4
+
+
+def set_library_cookies(response, library_id, now=None):
+    """Attach signed cookies for library_id to response."""
+    expires_at = int(now or time.time()) + cookie_ttl()
+    cookie_path = urllib.parse.urlparse(delivery_base_url()).path + '/'
+    for name, value in signed_cookies(library_resource(library_id), expires_at).items():
+        response.set_cookie(
+            name,
+            value,
+            max_age=cookie_ttl(),
+            domain=getattr(settings, 'VIDEO_DELIVERY_COOKIE_DOMAIN', None),
+            path=cookie_path,
+            secure=not settings.DEBUG,
+            httponly=True,
+            samesite='Lax',
+        )
+    logger.debug(f"Issued delivery cookies for library {library_id} until {expires_at}")
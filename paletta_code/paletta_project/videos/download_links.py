@@ -0,0 +1,87 @@
+"""
+Click-time download links.
+
+Emails and API responses carry a stable /d/<token>/ URL instead of a
+presigned storage URL. The token only names what may be downloaded; nothing
+is signed against storage and no row is written when the link is issued.
+When the link is followed, DownloadRedirectView checks that the grant is
+still valid and 302-redirects to a freshly presigned URL that lives for
+DOWNLOAD_REDIRECT_EXPIRY_SECONDS (5 minutes by default).
+
+Tokens are deterministic (django.core.signing.Signer, no timestamp):
+- ['r', <download request id>] is valid as long as the DownloadRequest is
+  (its expiry_date and status are checked at click time)
+- ['v', <video id>, <expires at>] carries its own expiry, since no row
+  records the grant
+"""
+
+import os
+import time
+import logging
+
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+
+logger = logging.getLogger(__name__)
+
+SALT = 'paletta.videos.download-link'
+
+KIND_REQUEST = 'r'
+KIND_VIDEO = 'v'
+
+
+def _signer():
+    return signing.Signer(salt=SALT)
+
+
+def make_download_token(kind, object_id, expires_at=None):
+    """Signed, URL-safe token for a download grant."""
+    payload = [kind, object_id] if expires_at is None else [kind, object_id, int(expires_at)]
+    return _signer().sign_object(payload, compress=True)
+
+
+def read_download_token(token):
+    """
+    (kind, object_id, expires_at) from a token; expires_at is None for
+    request grants. Raises signing.BadSignature if the token was tampered with.
+    """
+    try:
+        payload = _signer().unsign_object(token)
+        kind, object_id = payload[0], int(payload[1])
+        expires_at = int(payload[2]) if len(payload) > 2 else None
+    except (ValueError, TypeError, IndexError) as e:
+        raise signing.BadSignature(f"Malformed download token: {e}")
+    if kind not in (KIND_REQUEST, KIND_VIDEO):
+        raise signing.BadSignature(f"Unknown download token kind: {kind}")
+    return kind, object_id, expires_at
+
+
+def absolute_url(path):
+    """Prefix path with SITE_URL so links work outside a request (emails)."""
+    site_url = getattr(settings, 'SITE_URL', '') or ''
+    return f"{site_url.rstrip('/')}{path}"
+
+
+def download_redirect_url(token):
+    return absolute_url(reverse('download_redirect', args=[token]))
+
+
+def download_request_link(download_request):
+    """Stable link for a DownloadRequest; valid until the request expires."""
+    return download_redirect_url(make_download_token(KIND_REQUEST, download_request.pk))
+
+
+def video_download_link(video, expiry_hours, now=None):
+    """Link to a video valid for expiry_hours from now."""
+    expires_at = int(now or time.time()) + int(expiry_hours * 3600)
+    return download_redirect_url(make_download_token(KIND_VIDEO, video.pk, expires_at))
+
+
+def redirect_expiry():
+    """Lifetime in seconds of the presigned URL a download link redirects to."""
+    return int(getattr(settings, 'DOWNLOAD_REDIRECT_EXPIRY_SECONDS', 300))
+
+
+def attachment_filename(video):
+    return os.path.basename(video.storage_reference_id)
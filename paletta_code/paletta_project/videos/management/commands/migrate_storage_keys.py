@@ -0,0 +1,104 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from videos.services import AWSCloudStorageService, StorageKeyMigrationService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    BACKEND-READY: Management command for moving videos onto canonical storage keys.
+    MAPPED TO: python manage.py migrate_storage_keys
+    USED BY: Admin maintenance operations (storage layout migration)
+
+    Copies every stored video whose key is not library_<id>/<hh>/<digest>
+    (see videos/storage_keys.py) to a new canonical key with a server-side
+    copy, repoints the row and deletes the old object once the row is saved.
+    Copies run in parallel; the command can be interrupted and run again.
+    """
+
+    help = 'Move stored videos onto the canonical library_<id>/<hh>/<digest> key layout'
+
+    def add_arguments(self, parser):
+        """Add command line arguments."""
+        parser.add_argument(
+            '--library',
+            type=int,
+            help='Only migrate videos of this library ID',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Migrate at most this many videos',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Parallel copies (default: STORAGE_KEY_MIGRATION_WORKERS)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List what would be moved without copying anything',
+        )
+        parser.add_argument(
+            '--background',
+            action='store_true',
+            help='Queue the migration as a Celery task instead of running it here',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the result as JSON',
+        )
+
+    def handle(self, *args, **options):
+        """Execute the migration."""
+        if options['background']:
+            from videos.tasks import migrate_storage_keys
+            result = migrate_storage_keys.delay(library_id=options['library'], limit=options['limit'])
+            self.stdout.write(self.style.SUCCESS(f"Queued storage key migration (task {result.id})"))
+            return
+
+        storage_service = AWSCloudStorageService()
+        if not storage_service.storage_enabled:
+            raise CommandError('S3 storage is not enabled')
+
+        service = StorageKeyMigrationService(storage_service)
+        pending = service.pending_videos(options['library']).count()
+        if options['limit']:
+            pending = min(pending, options['limit'])
+        if not options['json']:
+            prefix = '[DRY RUN] ' if options['dry_run'] else ''
+            self.stdout.write(f"{prefix}{pending} videos to move onto canonical keys")
+
+        def on_progress(stats):
+            done = stats['migrated'] + stats['skipped'] + stats['changed'] + stats['errors']
+            if not options['json'] and done % 100 == 0:
+                self.stdout.write(f"  {done}/{pending} processed, {stats['bytes'] / (1024 ** 3):.2f}GB moved")
+
+        try:
+            stats = service.run(
+                library_id=options['library'],
+                limit=options['limit'],
+                max_workers=options['workers'],
+                dry_run=options['dry_run'],
+                on_progress=on_progress,
+            )
+        except Exception as e:
+            error_message = f"Error migrating storage keys: {str(e)}"
+            logger.error(error_message)
+            raise CommandError(error_message)
+
+        if options['json']:
+            self.stdout.write(json.dumps(stats, indent=2))
+            return
+
+        style = self.style.WARNING if stats['errors'] else self.style.SUCCESS
+        self.stdout.write(style(
+            f"{'Would move' if options['dry_run'] else 'Moved'} {stats['migrated']} videos "
+            f"({stats['bytes'] / (1024 ** 3):.2f}GB); {stats['skipped']} already canonical, "
+            f"{stats['changed']} changed during the run, {stats['errors']} errors"
+        ))
@@ -0,0 +1,91 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from videos.models import Video
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    BACKEND-READY: Management command for (re)reading video media metadata.
+    MAPPED TO: python manage.py probe_videos
+    USED BY: Admin maintenance operations (backfill, retrying failed processing)
+
+    Queues videos.tasks.probe_video on the 'media' queue for stored videos
+    without resolution/frame rate (uploaded before the media pipeline existed)
+    and, with --failed, for videos whose processing failed. With --thumbnails,
+    queues videos.tasks.generate_thumbnails for stored videos without
+    generated thumbnails instead, with --sprites videos.tasks.generate_scrub_sprite
+    for probed videos without a scrub sprite, and with --previews
+    videos.tasks.transcode_preview for stored videos without an HLS preview.
+    """
+
+    help = 'Queue ffprobe metadata extraction for videos that are missing it'
+
+    def add_arguments(self, parser):
+        """Add command line arguments."""
+        parser.add_argument(
+            '--failed',
+            action='store_true',
+            help='Also retry videos in processing_failed',
+        )
+        parser.add_argument(
+            '--thumbnails',
+            action='store_true',
+            help='Generate thumbnails for stored videos that have none instead of probing',
+        )
+        parser.add_argument(
+            '--sprites',
+            action='store_true',
+            help='Generate hover-scrub sprite sheets for stored videos that have none instead of probing',
+        )
+        parser.add_argument(
+            '--previews',
+            action='store_true',
+            help='Transcode HLS previews for stored videos that have none instead of probing',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Queue at most this many videos',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the videos that would be queued',
+        )
+
+    def handle(self, *args, **options):
+        """Queue the probes."""
+        from videos.tasks import probe_video, generate_thumbnails, generate_scrub_sprite, transcode_preview
+
+        if options['sprites']:
+            task, work = generate_scrub_sprite, 'scrub sprite generation'
+            selection = Q(storage_status='stored') & Q(scrub_sprite={}) & Q(duration__isnull=False) \
+                & Q(resolution__isnull=False)
+        elif options['previews']:
+            task, work = transcode_preview, 'preview transcoding'
+            selection = Q(storage_status='stored') & (Q(preview_manifest_key__isnull=True) | Q(preview_manifest_key=''))
+        elif options['thumbnails']:
+            task, work = generate_thumbnails, 'thumbnail generation'
+            selection = Q(storage_status='stored') & Q(thumbnail_variants={})
+        else:
+            task, work = probe_video, 'probing'
+            selection = Q(storage_status='stored') & (Q(resolution__isnull=True) | Q(frame_rate__isnull=True))
+            if options['failed']:
+                selection |= Q(storage_status='processing_failed')
+        video_ids = Video.objects.filter(selection).exclude(storage_reference_id__isnull=True) \
+            .exclude(storage_reference_id='').order_by('id').values_list('id', flat=True)
+        if options['limit']:
+            video_ids = video_ids[:options['limit']]
+
+        if options['dry_run']:
+            self.stdout.write(f"[DRY RUN] {video_ids.count()} videos would be queued for {work}")
+            return
+
+        queued = 0
+        for video_id in video_ids.iterator():
+            task.delay(video_id)
+            queued += 1
+        self.stdout.write(self.style.SUCCESS(f"Queued {queued} videos for {work} on the media queue"))
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+from videos.services import AWSCloudStorageService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    BACKEND-READY: Management command for aborting abandoned S3 multipart uploads.
+    MAPPED TO: python manage.py reap_multipart_uploads
+    USED BY: Admin maintenance operations (the same work runs on Celery beat)
+    
+    Pages through ListMultipartUploads and aborts uploads older than the
+    threshold that have no live UploadSession or in-flight Video.
+    Supports dry-run mode to report what would be reclaimed.
+    """
+    
+    help = 'Abort stale incomplete multipart uploads and report reclaimed bytes'
+    
+    def add_arguments(self, parser):
+        """Add command line arguments."""
+        parser.add_argument(
+            '--older-than-hours',
+            type=int,
+            default=None,
+            help='Only abort uploads initiated more than this many hours ago (default: S3_MULTIPART_REAP_AFTER_HOURS)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Number of concurrent abort workers (default: S3_MULTIPART_REAP_WORKERS)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Measure stale uploads without aborting them',
+        )
+    
+    def handle(self, *args, **options):
+        """Execute the reaper."""
+        storage_service = AWSCloudStorageService()
+        if not storage_service.storage_enabled:
+            raise CommandError('S3 storage is not enabled')
+        
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('DRY RUN MODE - No uploads will be aborted'))
+        
+        try:
+            stats = storage_service.reap_stale_multipart_uploads(
+                older_than_hours=options['older_than_hours'],
+                dry_run=options['dry_run'],
+                max_workers=options['workers'],
+            )
+        except Exception as e:
+            error_message = f"Error reaping multipart uploads: {str(e)}"
+            logger.error(error_message)
+            raise CommandError(error_message)
+        
+        verb = 'Would abort' if options['dry_run'] else 'Aborted'
+        self.stdout.write(f"Scanned {stats['scanned']} incomplete uploads ({stats['skipped']} still live or recent)")
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {stats['aborted']} uploads, reclaiming {stats['bytes_reclaimed'] / (1024 ** 3):.2f}GB"
+        ))
+        if stats['errors']:
+            self.stdout.write(self.style.ERROR(f"{stats['errors']} uploads could not be aborted (see logs)"))
@@ -0,0 +1,102 @@
+import csv
+import json
+from django.core.management.base import BaseCommand, CommandError
+from videos.services import AWSCloudStorageService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    BACKEND-READY: Management command for reconciling the bucket against Video rows.
+    MAPPED TO: python manage.py reconcile_storage
+    USED BY: Admin maintenance operations (the same work runs on Celery beat)
+
+    Streams ListObjectsV2 alongside a server-side cursor over Videos ordered by
+    storage_reference_id and merges them in constant memory. Reports objects no
+    Video references and stored Videos whose object no longer exists.
+    Report only: nothing is deleted.
+    """
+
+    help = 'Report orphaned bucket objects and videos whose storage object is missing'
+
+    def add_arguments(self, parser):
+        """Add command line arguments."""
+        parser.add_argument(
+            '--prefix',
+            default='',
+            help='Only reconcile keys under this prefix (e.g. videos/)',
+        )
+        parser.add_argument(
+            '--grace-hours',
+            type=int,
+            default=None,
+            help='Ignore unreferenced objects modified within this many hours (default: S3_RECONCILE_GRACE_HOURS)',
+        )
+        parser.add_argument(
+            '--output',
+            help='Write every finding to this CSV file (kind, key, size, video_id, last_modified)',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the report as JSON',
+        )
+
+    def handle(self, *args, **options):
+        """Execute the reconciliation."""
+        storage_service = AWSCloudStorageService()
+        if not storage_service.storage_enabled:
+            raise CommandError('S3 storage is not enabled')
+
+        output = open(options['output'], 'w', newline='') if options['output'] else None
+        writer = csv.writer(output) if output else None
+        if writer:
+            writer.writerow(['kind', 'key', 'size', 'video_id', 'last_modified'])
+
+        def on_orphan(key, size, last_modified):
+            writer.writerow(['orphan', key, size, '', last_modified.isoformat() if last_modified else ''])
+
+        def on_missing(key, video_id):
+            writer.writerow(['missing', key, '', video_id, ''])
+
+        try:
+            report = storage_service.reconcile_storage(
+                prefix=options['prefix'],
+                grace_hours=options['grace_hours'],
+                on_orphan=on_orphan if writer else None,
+                on_missing=on_missing if writer else None,
+            )
+        except Exception as e:
+            error_message = f"Error reconciling storage: {str(e)}"
+            logger.error(error_message)
+            raise CommandError(error_message)
+        finally:
+            if output:
+                output.close()
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2, default=str))
+            return
+
+        self.stdout.write(
+            f"Scanned {report['objects']} objects ({report['object_bytes'] / (1024 ** 3):.2f}GB) "
+            f"and {report['videos']} videos in {report['duration_seconds']}s; "
+            f"{report['preview_objects']} objects ({report['preview_bytes'] / (1024 ** 3):.2f}GB) belong to HLS previews"
+        )
+        style = self.style.WARNING if report['orphans'] else self.style.SUCCESS
+        self.stdout.write(style(
+            f"{report['orphans']} orphaned objects, {report['orphan_bytes'] / (1024 ** 3):.2f}GB"
+            f" ({report['recent_unreferenced']} recent unreferenced objects skipped)"
+        ))
+        for key in report['orphan_sample']:
+            self.stdout.write(f"  orphan: {key}")
+        style = self.style.ERROR if report['missing'] else self.style.SUCCESS
+        self.stdout.write(style(
+            f"{report['missing']} stored videos with missing objects, {report['missing_bytes'] / (1024 ** 3):.2f}GB"
+        ))
+        for item in report['missing_sample']:
+            self.stdout.write(f"  missing: {item['key']} (video {item['video_id']})")
+        if options['output']:
+            self.stdout.write(f"Full findings written to {options['output']}")
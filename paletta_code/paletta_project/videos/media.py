@@ -0,0 +1,306 @@
+"""
+ffprobe / ffmpeg helpers for the post-upload media pipeline.
+
+Sources are read where they are stored, never downloaded first: S3 objects
+through a presigned GET URL, local-backend objects by path (see
+AWSCloudStorageService.media_source). Over HTTP ffmpeg reads with Range
+requests, so probing fetches the container header and index (a few MB,
+bounded by MEDIA_PROBE_SIZE) even when the file is many GB, including MP4s
+whose moov atom sits at the end.
+
+Frames for thumbnails are grabbed the same way: an input-side seek jumps
+straight to the nearest keyframe and only keyframes are decoded.
+
+MediaError carries ffmpeg's own error text for VideoLog entries.
+"""
+
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, ROUND_HALF_UP
+from fractions import Fraction
+
+import ffmpeg
+from django.conf import settings
+
+from .storage_keys import key_extension
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROBE_SIZE = 32 * 1024 * 1024  # bytes ffprobe may read to find the streams
+DEFAULT_ANALYZE_SECONDS = 10
+DEFAULT_READ_TIMEOUT = 30  # seconds without data before a network read fails
+DEFAULT_THUMBNAIL_POSITION = 0.1  # fraction of the duration to seek to; skips fades and slates
+DEFAULT_THUMBNAIL_CANDIDATES = 3  # keyframes the thumbnail filter picks the most typical one from
+
+
+class MediaError(Exception):
+    """ffprobe/ffmpeg could not read or process a source."""
+
+
+def is_remote(source):
+    return source.startswith(('http://', 'https://'))
+
+
+def input_options(source):
+    """Demuxer options for reading source: bounded probing, and a read timeout for URLs."""
+    options = {
+        'probesize': getattr(settings, 'MEDIA_PROBE_SIZE', DEFAULT_PROBE_SIZE),
+        'analyzeduration': getattr(settings, 'MEDIA_ANALYZE_SECONDS', DEFAULT_ANALYZE_SECONDS) * 1000000,
+    }
+    if is_remote(source):
+        options['rw_timeout'] = getattr(settings, 'MEDIA_READ_TIMEOUT', DEFAULT_READ_TIMEOUT) * 1000000
+    return options
+
+
+def error_text(error):
+    """Last meaningful line of an ffmpeg.Error's stderr."""
+    stderr = (getattr(error, 'stderr', None) or b'').decode('utf-8', 'replace').strip()
+    return stderr.splitlines()[-1] if stderr else str(error)
+
+
+def probe(source):
+    """ffprobe's format and stream description of source (a URL or path) as a dict."""
+    try:
+        return ffmpeg.probe(source, cmd=getattr(settings, 'FFPROBE_BINARY', 'ffprobe'), **input_options(source))
+    except ffmpeg.Error as e:
+        raise MediaError(f"ffprobe failed: {error_text(e)}")
+    except FileNotFoundError:
+        raise MediaError('ffprobe is not installed (FFPROBE_BINARY)')
+
+
+def video_stream(info):
+    """The first real video stream in probe output (cover art is skipped), or None."""
+    for stream in info.get('streams', []):
+        if stream.get('codec_type') == 'video' and not stream.get('disposition', {}).get('attached_pic'):
+            return stream
+    return None
+
+
+def _rate(value):
+    """A frame rate such as '30000/1001' as a Fraction, or None for '0/0' and missing values."""
+    try:
+        rate = Fraction(value)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    return rate if rate > 0 else None
+
+
+def _rotation(stream):
+    """Display rotation in degrees from the rotate tag or the display matrix side data."""
+    rotation = stream.get('tags', {}).get('rotate')
+    if rotation is None:
+        for side_data in stream.get('side_data_list', []):
+            if 'rotation' in side_data:
+                rotation = side_data['rotation']
+                break
+    try:
+        return int(float(rotation or 0)) % 360
+    except (TypeError, ValueError):
+        return 0
+
+
+def read_metadata(info, name=''):
+    """
+    Video fields from probe output: duration (whole seconds), resolution
+    ('WxH' as displayed, i.e. after rotation), frame_rate (Decimal, 2 places)
+    and format (the container, named after the file extension when ffprobe
+    agrees with it). Raises MediaError if there is no video stream.
+    """
+    stream = video_stream(info)
+    if stream is None:
+        raise MediaError('No video stream found')
+
+    container = info.get('format', {})
+    metadata = {}
+
+    duration = container.get('duration') or stream.get('duration')
+    if duration:
+        metadata['duration'] = int(Decimal(str(duration)).to_integral_value(rounding=ROUND_HALF_UP))
+
+    width, height = stream.get('width'), stream.get('height')
+    if width and height:
+        if _rotation(stream) in (90, 270):
+            width, height = height, width
+        metadata['resolution'] = f"{width}x{height}"
+
+    rate = _rate(stream.get('avg_frame_rate')) or _rate(stream.get('r_frame_rate'))
+    if rate and rate < 1000:
+        metadata['frame_rate'] = Decimal(rate.numerator) / Decimal(rate.denominator)
+        metadata['frame_rate'] = metadata['frame_rate'].quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+    formats = [value for value in container.get('format_name', '').split(',') if value]
+    extension = key_extension(name).lstrip('.')
+    if extension and extension in formats:
+        metadata['format'] = extension
+    elif formats:
+        metadata['format'] = formats[0][:10]
+
+    return metadata
+
+
+def thumbnail_time(duration):
+    """Where to look for a representative frame: THUMBNAIL_POSITION into the video, before its last second."""
+    if not duration:
+        return 0
+    position = getattr(settings, 'THUMBNAIL_POSITION', DEFAULT_THUMBNAIL_POSITION)
+    return max(0, min(duration * position, duration - 1))
+
+
+def extract_frame(source, at, box):
+    """
+    One representative frame of source as PNG bytes, scaled down to fit box (width, height).
+
+    Seeks on the input to the keyframe at or before `at` (ranged reads over
+    HTTP, no decoding of skipped data) and decodes keyframes only; ffmpeg's
+    thumbnail filter picks the most typical of THUMBNAIL_CANDIDATES of them,
+    which avoids black or blurred frames. Rotation is applied by ffmpeg.
+    Falls back to the first keyframe when nothing is found after `at`.
+    """
+    width, height = box
+    candidates = getattr(settings, 'THUMBNAIL_CANDIDATES', DEFAULT_THUMBNAIL_CANDIDATES)
+    for position in ([at, 0] if at else [0]):
+        stream = (
+            ffmpeg
+            .input(source, ss=position, skip_frame='nokey', **input_options(source))
+            .video
+            .filter('thumbnail', candidates)
+            .filter('scale', f'min(iw,{width})', f'min(ih,{height})', force_original_aspect_ratio='decrease')
+            .output('pipe:', vframes=1, format='image2', vcodec='png')
+        )
+        try:
+            frame, _ = stream.run(
+                cmd=getattr(settings, 'FFMPEG_BINARY', 'ffmpeg'), capture_stdout=True, capture_stderr=True,
+            )
+        except ffmpeg.Error as e:
+            raise MediaError(f"ffmpeg failed: {error_text(e)}")
+        except FileNotFoundError:
+            raise MediaError('ffmpeg is not installed (FFMPEG_BINARY)')
+        if frame:
+            return frame
+        logger.info(f"No keyframe found at {position:.1f}s; trying the start of the video")
+    raise MediaError('No frame could be extracted')
+
+
+def extract_frames(source, times, size, max_workers=None):
+    """
+    JPEG bytes of the frame at each of times (seconds), scaled to size (width, height).
+    Each frame is one short ffmpeg run that seeks on the input, so only the
+    data around each position is read; runs go in parallel
+    (SCRUB_SPRITE_WORKERS). Frames that cannot be read are None.
+    """
+    width, height = size
+
+    def grab(position):
+        stream = (
+            ffmpeg
+            .input(source, ss=position, **input_options(source))
+            .video
+            .filter('scale', width, height)
+            .output('pipe:', vframes=1, format='image2', vcodec='mjpeg', **{'q:v': 3})
+        )
+        try:
+            frame, _ = run(stream)
+        except MediaError as e:
+            logger.info(f"No frame at {position:.1f}s: {str(e)}")
+            return None
+        return frame or None
+
+    max_workers = max_workers or getattr(settings, 'SCRUB_SPRITE_WORKERS', 8)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        frames = list(executor.map(grab, times))
+    if not any(frames):
+        raise MediaError('No frames could be extracted')
+    return frames
+
+
+def has_audio(info):
+    return any(stream.get('codec_type') == 'audio' for stream in info.get('streams', []))
+
+
+def run(stream_spec):
+    """Run an ffmpeg-python graph quietly, raising MediaError with ffmpeg's message on failure."""
+    try:
+        return stream_spec.global_args('-hide_banner', '-nostats', '-loglevel', 'error').run(
+            cmd=getattr(settings, 'FFMPEG_BINARY', 'ffmpeg'), capture_stdout=True, capture_stderr=True,
+            overwrite_output=True,
+        )
+    except ffmpeg.Error as e:
+        raise MediaError(f"ffmpeg failed: {error_text(e)}")
+    except FileNotFoundError:
+        raise MediaError('ffmpeg is not installed (FFMPEG_BINARY)')
+
+
+def video_options(rendition, keyframe_seconds, threads=None):
+    """
+    H.264 encoder options for a rendition ({'video_bitrate', ...}).
+    Main profile yuv420p plays everywhere hls.js or native HLS does. Keyframes
+    are forced every keyframe_seconds (counted from the start of the input),
+    so renditions switch cleanly and HLS can cut segments there.
+    """
+    options = {
+        'vcodec': 'libx264',
+        'preset': getattr(settings, 'HLS_PREVIEW_PRESET', 'veryfast'),
+        'profile:v': 'main',
+        'pix_fmt': 'yuv420p',
+        'b:v': rendition['video_bitrate'],
+        'maxrate': rendition['video_bitrate'],
+        'bufsize': rendition['video_bitrate'],
+        'force_key_frames': f'expr:gte(t,n_forced*{keyframe_seconds})',
+        'sc_threshold': 0,
+    }
+    if threads:
+        options['threads'] = threads
+    return options
+
+
+def audio_options(rendition):
+    """Stereo AAC at the rendition's audio bitrate."""
+    return {'acodec': 'aac', 'b:a': rendition['audio_bitrate'], 'ac': 2}
+
+
+def hls_options(directory, segment_seconds):
+    return {
+        'f': 'hls',
+        'hls_time': segment_seconds,
+        'hls_playlist_type': 'vod',
+        'hls_flags': 'independent_segments',
+        'hls_segment_filename': os.path.join(directory, 'seg_%05d.ts'),
+    }
+
+
+def transcode_hls(source, output_dir, renditions, segment_seconds, audio=True):
+    """
+    Transcode source into one HLS rendition per entry of renditions
+    ({'name', 'width', 'height', 'video_bitrate', 'audio_bitrate'}), written to
+    output_dir/<name>/index.m3u8 with seg_NNNNN.ts segments of segment_seconds.
+
+    The source is read and decoded once by one ffmpeg process; the decoded
+    video is split and scaled per rendition. Long sources go through
+    transcoding.SegmentedTranscoder and package_hls instead.
+    """
+    stream = ffmpeg.input(source, **input_options(source))
+    split = stream.video.filter_multi_output('split', len(renditions))
+    outputs = []
+    for index, rendition in enumerate(renditions):
+        directory = os.path.join(output_dir, rendition['name'])
+        os.makedirs(directory, exist_ok=True)
+        video = split[index].filter('scale', rendition['width'], rendition['height'])
+        streams = [video, stream.audio] if audio else [video]
+        options = dict(video_options(rendition, segment_seconds), **hls_options(directory, segment_seconds))
+        if audio:
+            options.update(audio_options(rendition))
+        outputs.append(ffmpeg.output(*streams, os.path.join(directory, 'index.m3u8'), **options))
+    run(ffmpeg.merge_outputs(*outputs))
+
+
+def package_hls(path, directory, segment_seconds):
+    """
+    Cut an already encoded MP4 into HLS (directory/index.m3u8 and segments)
+    without re-encoding; segments start at its keyframes.
+    """
+    os.makedirs(directory, exist_ok=True)
+    stream = ffmpeg.input(path)
+    run(ffmpeg.output(
+        stream, os.path.join(directory, 'index.m3u8'), c='copy', **hls_options(directory, segment_seconds)
+    ))
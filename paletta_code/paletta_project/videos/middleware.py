@@ -0,0 +1,28 @@
+from django.utils.deprecation import MiddlewareMixin
+import logging
+
+from .delivery import granted_library, grant_covers, set_library_cookies
+
+logger = logging.getLogger(__name__)
+
+
+class SignedCookieDeliveryMiddleware(MiddlewareMixin):
+    """
+    Issues delivery cookies for the current library in signed-cookie mode.
+    Runs after LibraryContextMiddleware; cookies are only (re)signed when the
+    request does not already carry a grant for this library that is still
+    comfortably valid, so signing happens about once per session and library.
+    """
+
+    def process_response(self, request, response):
+        library = granted_library(request)
+        if library is None:
+            return response
+
+        if not grant_covers(request.COOKIES, library.id):
+            try:
+                set_library_cookies(response, library.id)
+            except Exception as e:
+                # Playback falls back to presigned URLs for objects the grant does not cover
+                logger.error(f"Could not issue delivery cookies for library {library.id}: {e}")
+        return response
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.10 on 2026-10-17 09:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('libraries', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('videos', '0004_alter_category_options_category_content_type_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('upload_id', models.CharField(help_text='S3 multipart UploadId', max_length=512, unique=True)),
+                ('bucket', models.CharField(max_length=255)),
+                ('key', models.CharField(help_text='S3 object key being uploaded', max_length=1024)),
+                ('file_name', models.CharField(blank=True, max_length=255)),
+                ('content_type', models.CharField(blank=True, max_length=255)),
+                ('file_size', models.BigIntegerField(help_text='Total size in bytes')),
+                ('part_size', models.BigIntegerField(help_text='Size of every part except the last, in bytes')),
+                ('status', models.CharField(choices=[('active', 'Active'), ('completed', 'Completed'), ('aborted', 'Aborted')], default='active', max_length=20)),
+                ('parts', models.JSONField(blank=True, default=dict, help_text='Confirmed parts: part number -> {etag, size}')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('library', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_sessions', to='libraries.library')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Upload Session',
+                'verbose_name_plural': 'Upload Sessions',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'status'], name='videos_uplo_user_id_16e2f6_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.10 on 2026-10-17 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0005_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadsession',
+            name='concurrency',
+            field=models.PositiveSmallIntegerField(default=4, help_text='Parallel part uploads recommended to the client'),
+        ),
+        migrations.AddField(
+            model_name='uploadsession',
+            name='bytes_transferred',
+            field=models.BigIntegerField(default=0, help_text='Bytes of parts the client reported as sent'),
+        ),
+        migrations.AddField(
+            model_name='uploadsession',
+            name='transfer_seconds',
+            field=models.FloatField(default=0, help_text='Sum of per-part transfer times reported by the client'),
+        ),
+    ]
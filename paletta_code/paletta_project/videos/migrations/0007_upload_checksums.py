@@ -0,0 +1,33 @@
+# Generated by Django 4.2.10 on 2026-10-17 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0006_uploadsession_telemetry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='checksum_sha256',
+            field=models.CharField(blank=True, default='', help_text="S3 composite SHA-256 of the stored object (base64 of the digest of part digests, '-<parts>')", max_length=64),
+        ),
+        migrations.AddField(
+            model_name='uploadsession',
+            name='checksum_algorithm',
+            field=models.CharField(blank=True, default='', help_text="S3 ChecksumAlgorithm requested for every part ('' for none)", max_length=16),
+        ),
+        migrations.AddField(
+            model_name='uploadsession',
+            name='checksum_sha256',
+            field=models.CharField(blank=True, default='', help_text='Composite checksum reported by S3 on completion', max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='uploadsession',
+            name='parts',
+            field=models.JSONField(blank=True, default=dict, help_text='Confirmed parts: part number -> {etag, size, checksum}'),
+        ),
+    ]
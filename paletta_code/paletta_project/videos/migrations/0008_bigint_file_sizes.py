@@ -0,0 +1,23 @@
+# Generated by Django 4.2.10 on 2026-10-17 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0007_upload_checksums'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='video',
+            name='file_size',
+            field=models.PositiveBigIntegerField(blank=True, help_text='Size in bytes', null=True),
+        ),
+        migrations.AlterField(
+            model_name='videolog',
+            name='file_size',
+            field=models.PositiveBigIntegerField(blank=True, help_text='Size in bytes', null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.10 on 2026-10-17 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0008_bigint_file_sizes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='thumbnail_variants',
+            field=models.JSONField(blank=True, default=dict, help_text='Generated thumbnail files per size: {size: {width, height, webp, jpeg}} (see videos/thumbnails.py)'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.10 on 2026-10-17 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0009_video_thumbnail_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='preview_manifest_key',
+            field=models.CharField(blank=True, help_text='Key of the HLS preview master playlist stored alongside the original (see videos/previews.py)', max_length=1024, null=True),
+        ),
+    ]
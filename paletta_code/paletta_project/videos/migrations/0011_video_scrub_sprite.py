@@ -0,0 +1,18 @@
+# Generated by Django 4.2.10 on 2026-10-17 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0010_video_preview_manifest_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='scrub_sprite',
+            field=models.JSONField(blank=True, default=dict, help_text='Hover-scrub sprite sheet: layout plus image/index/vtt file names (see videos/sprites.py)'),
+        ),
+    ]
@@ -231,13 +231,35 @@ class Video(models.Model):
     blank=True, 
     help_text="Reference ID in the AWS S3 storage system"
   )
+  preview_manifest_key = models.CharField(
+    max_length=1024,
+    null=True,
+    blank=True,
+    help_text="Key of the HLS preview master playlist stored alongside the original (see videos/previews.py)"
+  )
   
   # Thumbnail image
   thumbnail = models.ImageField(upload_to=thumbnail_upload_path, null=True, blank=True, storage=get_media_storage)
+  thumbnail_variants = models.JSONField(
+    default=dict,
+    blank=True,
+    help_text="Generated thumbnail files per size: {size: {width, height, webp, jpeg}} (see videos/thumbnails.py)"
+  )
+  scrub_sprite = models.JSONField(
+    default=dict,
+    blank=True,
+    help_text="Hover-scrub sprite sheet: layout plus image/index/vtt file names (see videos/sprites.py)"
+  )
   
   # Additional metadata
   duration = models.PositiveIntegerField(null=True, blank=True, help_text="Duration in seconds")
-  file_size = models.PositiveIntegerField(null=True, blank=True, help_text="Size in bytes")
+  file_size = models.PositiveBigIntegerField(null=True, blank=True, help_text="Size in bytes")
+  checksum_sha256 = models.CharField(
+    max_length=64,
+    blank=True,
+    default='',
+    help_text="S3 composite SHA-256 of the stored object (base64 of the digest of part digests, '-<parts>')"
+  )
   resolution = models.CharField(max_length=20, null=True, blank=True, help_text="Video resolution, e.g., 1920x1080")
   frame_rate = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, help_text="Frame rate, e.g., 29.97")
   views_count = models.PositiveIntegerField(default=0)
@@ -263,19 +285,35 @@ class Video(models.Model):
         return extension[1:].lower()
     return None
     
-  def get_streaming_url(self):
+  def get_streaming_url(self, granted_library_id=None):
       """
       BACKEND/FRONTEND-READY: Generates temporary streaming URL for S3-stored videos.
       MAPPED TO: Internal method called by templates
       USED BY: Video detail templates and API responses
       
       Creates temporary S3 presigned URL for video streaming (1 hour expiry).
+      granted_library_id: library covered by the request's delivery cookies, if any.
       Required fields: storage_status='stored', storage_reference_id
       """
       if self.storage_status == 'stored' and self.storage_reference_id:
           from .services import AWSCloudStorageService
           storage_service = AWSCloudStorageService()
-          return storage_service.generate_streaming_url(self)
+          return storage_service.generate_streaming_url(self, granted_library_id)
+      return None
+      
+  def get_preview_url(self, granted_library_id=None):
+      """
+      BACKEND/FRONTEND-READY: URL of the low-bitrate HLS preview for in-page playback.
+      MAPPED TO: Internal method called by templates
+      USED BY: Video detail template and API responses (falls back to get_streaming_url)
+      
+      Returns the master playlist URL, or None until the preview has been transcoded.
+      granted_library_id: library covered by the request's delivery cookies, if any.
+      Required fields: storage_status='stored', preview_manifest_key
+      """
+      if self.storage_status == 'stored' and self.preview_manifest_key:
+          from .services import AWSCloudStorageService
+          return AWSCloudStorageService().generate_preview_url(self, granted_library_id)
       return None
       
   @property
@@ -294,55 +332,21 @@ class Video(models.Model):
           return f"{minutes}:{seconds:02d}"
       return "Unknown"
   
+  @property
+  def has_generated_thumbnail(self):
+      """True if the thumbnail shown is the server-generated one (no thumbnail was uploaded)"""
+      from .thumbnails import is_generated
+      return bool(self.thumbnail_variants) and (not self.thumbnail or is_generated(self.thumbnail.name))
+  
   @property
   def is_private(self):
       """Check if this video is in a private content type"""
       if self.content_type and self.content_type.subject_area == 'private':
           return True
       return False
-    
-  def delete(self, *args, **kwargs):
-    """
-    BACKEND-READY: Enhanced delete method with file cleanup.
-    MAPPED TO: Model deletion cascade
-    USED BY: Admin interface and programmatic deletions
-    
-    Removes video files from filesystem and S3 storage when model is deleted.
-    Handles missing files gracefully with proper logging.
-    """
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    # Delete S3 files first if they exist
-    if self.storage_status == 'stored' and self.storage_reference_id:
-        try:
-            from .services import AWSCloudStorageService
-            storage_service = AWSCloudStorageService()
-            storage_service.s3_client.delete_object(
-                Bucket=storage_service.bucket_name,
-                Key=self.storage_reference_id
-            )
-            logger.info(f"Deleted video from S3: {self.storage_reference_id}")
-        except Exception as e:
-            logger.error(f"Error deleting video from S3 {self.storage_reference_id}: {e}")
-    
-    # Delete the model instance first
-    super().delete(*args, **kwargs)
-    
-    # Delete files using Django's storage backend (works with both local and S3)
-    if self.video_file:
-        try:
-            self.video_file.delete(save=False)
-            logger.info(f"Deleted video file: {self.video_file.name}")
-        except Exception as e:
-            logger.error(f"Error deleting video file {self.video_file.name}: {e}")
-    
-    if self.thumbnail:
-        try:
-            self.thumbnail.delete(save=False)
-            logger.info(f"Deleted thumbnail file: {self.thumbnail.name}")
-        except Exception as e:
-            logger.error(f"Error deleting thumbnail file {self.thumbnail.name}: {e}")
+
+  # Storage cleanup on delete (S3 object, uploaded file, thumbnail) lives in videos/signals.py
+  # so queryset and cascaded deletes are covered as well.
 
 class VideoTag(models.Model):
     """Model representing the many-to-many relationship between videos and tags."""
@@ -379,7 +383,7 @@ class VideoLog(models.Model):
     # Additional metadata
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(null=True, blank=True)
-    file_size = models.PositiveIntegerField(null=True, blank=True, help_text="Size in bytes")
+    file_size = models.PositiveBigIntegerField(null=True, blank=True, help_text="Size in bytes")
     storage_status = models.CharField(max_length=20, null=True, blank=True)
     duration = models.PositiveIntegerField(null=True, blank=True, help_text="Duration in seconds")
 
@@ -390,3 +394,80 @@ class VideoLog(models.Model):
 
     def __str__(self):
         return f"{self.video.title} - {self.get_log_type_display()} ({self.timestamp})"
+
+
+class UploadSession(models.Model):
+    """
+    Server-side record of a browser multipart upload to S3.
+    Lets an interrupted upload resume by re-sending only the parts S3 has not
+    confirmed, and lets completion build the part list from S3 itself.
+    """
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('completed', 'Completed'),
+        ('aborted', 'Aborted'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    library = models.ForeignKey('libraries.Library', on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_sessions')
+    upload_id = models.CharField(max_length=512, unique=True, help_text="S3 multipart UploadId")
+    bucket = models.CharField(max_length=255)
+    key = models.CharField(max_length=1024, help_text="S3 object key being uploaded")
+    file_name = models.CharField(max_length=255, blank=True)
+    content_type = models.CharField(max_length=255, blank=True)
+    file_size = models.BigIntegerField(help_text="Total size in bytes")
+    part_size = models.BigIntegerField(help_text="Size of every part except the last, in bytes")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    parts = models.JSONField(default=dict, blank=True, help_text="Confirmed parts: part number -> {etag, size, checksum}")
+    checksum_algorithm = models.CharField(max_length=16, blank=True, default='', help_text="S3 ChecksumAlgorithm requested for every part ('' for none)")
+    checksum_sha256 = models.CharField(max_length=64, blank=True, default='', help_text="Composite checksum reported by S3 on completion")
+    concurrency = models.PositiveSmallIntegerField(default=4, help_text="Parallel part uploads recommended to the client")
+    
+    # Client-reported telemetry used to size future uploads
+    bytes_transferred = models.BigIntegerField(default=0, help_text="Bytes of parts the client reported as sent")
+    transfer_seconds = models.FloatField(default=0, help_text="Sum of per-part transfer times reported by the client")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Upload Session"
+        verbose_name_plural = "Upload Sessions"
+        indexes = [
+            models.Index(fields=['user', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.get_status_display()})"
+
+    @property
+    def total_parts(self):
+        """Number of parts the file is split into."""
+        if not self.part_size:
+            return 0
+        return max(1, -(-self.file_size // self.part_size))
+
+    @property
+    def part_throughput(self):
+        """Measured per-connection throughput in bytes/second, if reported."""
+        if not self.transfer_seconds:
+            return None
+        return self.bytes_transferred / self.transfer_seconds
+
+    def expected_part_size(self, part_number):
+        """Size in bytes that part_number must have."""
+        if part_number < self.total_parts:
+            return self.part_size
+        return self.file_size - self.part_size * (self.total_parts - 1)
+
+    def missing_parts(self):
+        """Part numbers S3 has not confirmed with the expected size (and checksum, when required)."""
+        missing = []
+        for number in range(1, self.total_parts + 1):
+            part = self.parts.get(str(number)) or {}
+            if part.get('size') != self.expected_part_size(number):
+                missing.append(number)
+            elif self.checksum_algorithm and not part.get('checksum'):
+                missing.append(number)
+        return missing
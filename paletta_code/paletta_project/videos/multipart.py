@@ -0,0 +1,152 @@
+"""
+Multipart upload planning shared by server-side and browser uploads.
+
+S3 limits a multipart upload to 10,000 parts of 5MB-5GiB (the last part may
+be smaller) and an object to 5TiB, so the part size has to grow with the
+file: a 5TiB upload needs parts of at least 525MiB. Within those limits
+the browser plan is tuned from per-part throughput that clients report back
+(UploadSession.bytes_transferred / transfer_seconds): slow links get smaller
+parts so each one finishes (and can be retried) quickly, fast links get
+fewer, larger parts with less concurrency.
+
+Every part carries a SHA-256 checksum that S3 verifies on arrival; S3 then
+reports a composite checksum for the object (the digest of the concatenated
+part digests, suffixed with the part count), which is stored on the Video.
+"""
+
+import re
+import math
+import base64
+import hashlib
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MiB = 1024 * 1024
+S3_MIN_PART_SIZE = 5 * MiB
+S3_MAX_PART_SIZE = 5 * 1024 * MiB
+S3_MAX_PARTS = 10000
+S3_MAX_OBJECT_SIZE = 5 * 1024 ** 4
+
+# Aim for parts that take this long on the measured link
+TARGET_PART_SECONDS = 30
+# How many recent sessions of a user feed the throughput estimate
+TELEMETRY_HISTORY = 10
+
+CHECKSUM_ALGORITHM = 'SHA256'
+_SHA256_BASE64 = re.compile(r'^[A-Za-z0-9+/]{43}=$')
+
+
+def max_upload_size():
+    """Largest video accepted, in bytes: MAX_UPLOAD_SIZE, capped at S3's 5TiB object limit."""
+    return min(getattr(settings, 'MAX_UPLOAD_SIZE', S3_MAX_OBJECT_SIZE), S3_MAX_OBJECT_SIZE)
+
+
+def check_upload_size(file_size):
+    """Raise ValueError unless file_size is a size a video upload may have."""
+    limit = max_upload_size()
+    if file_size < 0:
+        raise ValueError('File size cannot be negative.')
+    if file_size > limit:
+        raise ValueError(f'File size cannot exceed {format_size(limit)}.')
+
+
+def format_size(size):
+    """Human-readable binary size for messages, e.g. 5TB or 10GB."""
+    for unit, factor in (('TB', 1024 ** 4), ('GB', 1024 ** 3), ('MB', MiB)):
+        if size >= factor:
+            return f'{size / factor:g}{unit}' if size % factor == 0 else f'{size / factor:.1f}{unit}'
+    return f'{size} bytes'
+
+
+def minimum_part_size(file_size):
+    """Smallest part size that fits file_size into S3's 10,000-part limit."""
+    return max(S3_MIN_PART_SIZE, math.ceil(file_size / S3_MAX_PARTS))
+
+
+def clamp_part_size(part_size, file_size):
+    """Round part_size up to a whole MiB and keep it within S3's limits for file_size."""
+    part_size = max(int(part_size), minimum_part_size(file_size))
+    part_size = math.ceil(part_size / MiB) * MiB
+    return min(part_size, S3_MAX_PART_SIZE)
+
+
+def default_part_size(file_size):
+    """Part size from S3_MULTIPART_CHUNK_SIZE, grown if the file would need too many parts."""
+    return clamp_part_size(getattr(settings, 'S3_MULTIPART_CHUNK_SIZE', 100 * MiB), file_size)
+
+
+def measured_throughput(user):
+    """
+    Per-connection upload throughput (bytes/second) from the user's recent
+    sessions, or None when there is no telemetry yet.
+    """
+    from .models import UploadSession
+
+    samples = list(
+        UploadSession.objects.filter(user=user, transfer_seconds__gt=0)
+        .order_by('-created_at')
+        .values_list('bytes_transferred', 'transfer_seconds')[:TELEMETRY_HISTORY]
+    )
+    total_bytes = sum(sample[0] for sample in samples)
+    total_seconds = sum(sample[1] for sample in samples)
+    if not total_bytes or not total_seconds:
+        return None
+    return total_bytes / total_seconds
+
+
+def recommend_upload_plan(file_size, throughput=None, part_size=None):
+    """
+    Recommend {'part_size', 'concurrency', 'total_parts'} for a browser upload.
+
+    A part_size asked for by the client is used if it fits; otherwise the part
+    size comes from the configured defaults, or, with a measured per-connection
+    throughput, targets TARGET_PART_SECONDS per part. Browsers read each part
+    into one buffer to hash it, so parts are capped at S3_CLIENT_MAX_PART_SIZE
+    (unless the file needs larger ones to fit in 10,000 parts). Concurrency is
+    the number of parts that fit in the client's in-flight byte budget
+    (S3_CLIENT_INFLIGHT_BYTES); when the budget cannot hold
+    S3_CLIENT_MIN_CONCURRENCY parts, the parts are made smaller instead (down
+    to the minimum the file needs, which may leave one part in flight).
+    """
+    max_concurrency = getattr(settings, 'S3_CLIENT_MAX_CONCURRENCY', 10)
+    min_concurrency = getattr(settings, 'S3_CLIENT_MIN_CONCURRENCY', 2)
+    inflight_budget = getattr(settings, 'S3_CLIENT_INFLIGHT_BYTES', 1024 * MiB)
+    max_part_size = getattr(settings, 'S3_CLIENT_MAX_PART_SIZE', 512 * MiB)
+
+    if part_size:
+        part_size = clamp_part_size(part_size, file_size)
+    elif throughput:
+        part_size = clamp_part_size(throughput * TARGET_PART_SECONDS, file_size)
+    else:
+        part_size = default_part_size(file_size)
+    if part_size > max_part_size:
+        part_size = clamp_part_size(max_part_size, file_size)
+    if part_size * min_concurrency > inflight_budget:
+        part_size = clamp_part_size(inflight_budget // min_concurrency // MiB * MiB, file_size)
+    concurrency = max(1, min(max_concurrency, inflight_budget // part_size))
+
+    total_parts = max(1, math.ceil(file_size / part_size))
+    return {
+        'part_size': part_size,
+        'concurrency': int(min(concurrency, total_parts)),
+        'total_parts': total_parts,
+    }
+
+
+def part_checksum(data):
+    """Base64 SHA-256 of one part, as sent in x-amz-checksum-sha256; hashes buffers/memoryviews without copying."""
+    return base64.b64encode(hashlib.sha256(data).digest()).decode('ascii')
+
+
+def composite_checksum(part_checksums):
+    """S3's composite checksum for a multipart object from its ordered base64 part checksums."""
+    digests = b''.join(base64.b64decode(checksum) for checksum in part_checksums)
+    return f"{base64.b64encode(hashlib.sha256(digests).digest()).decode('ascii')}-{len(part_checksums)}"
+
+
+def is_valid_part_checksum(value):
+    """True if value looks like a base64-encoded SHA-256 digest."""
+    return isinstance(value, str) and bool(_SHA256_BASE64.match(value))
@@ -0,0 +1,102 @@
+"""
+Low-bitrate HLS previews for in-page playback.
+
+The original upload (often a multi-GB ProRes or MOV file) stays the download
+master; browsers play a short-segment H.264 ladder stored alongside it
+(storage_keys.preview_prefix):
+
+    <key without extension>/hls/master.m3u8
+    <key without extension>/hls/<rendition>/index.m3u8, seg_00000.ts, ...
+
+Video.preview_manifest_key points at master.m3u8 once every file is stored.
+
+Segment URLs in the stored playlists are relative. In signed-cookie delivery
+mode they resolve under the library prefix the cookies already grant; in
+presigned mode VideoPreviewPlaylistView serves the playlists with every
+segment URL presigned (rewrite_playlist).
+"""
+
+import re
+
+from django.conf import settings
+
+DEFAULT_LADDER = [
+    {'name': '360p', 'height': 360, 'video_bitrate': '800k', 'audio_bitrate': '96k'},
+    {'name': '720p', 'height': 720, 'video_bitrate': '2800k', 'audio_bitrate': '128k'},
+]
+DEFAULT_SEGMENT_SECONDS = 2
+
+MASTER_PLAYLIST = 'master.m3u8'
+PLAYLIST_CONTENT_TYPE = 'application/vnd.apple.mpegurl'
+SEGMENT_CONTENT_TYPE = 'video/mp2t'
+
+# Playlists a client may request: the master or one rendition's index
+PLAYLIST_PATH = re.compile(r'^(?:master|[a-z0-9_-]{1,20}/index)\.m3u8$')
+
+
+def preview_enabled():
+    return getattr(settings, 'HLS_PREVIEW_ENABLED', False)
+
+
+def segment_seconds():
+    return getattr(settings, 'HLS_SEGMENT_SECONDS', DEFAULT_SEGMENT_SECONDS)
+
+
+def _even(value):
+    return max(2, int(round(value / 2)) * 2)
+
+
+def _bits(rate):
+    """'800k' / '2.8M' / 800000 as bits per second."""
+    rate = str(rate).strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(rate[-1:], 1)
+    return int(float(rate.rstrip('km')) * multiplier)
+
+
+def manifest_prefix(manifest_key):
+    """The preview prefix a master playlist key belongs to."""
+    return manifest_key[:-len(MASTER_PLAYLIST)] if manifest_key.endswith(MASTER_PLAYLIST) else ''
+
+
+def plan_renditions(width, height):
+    """
+    The HLS_PREVIEW_LADDER rungs for a width x height (as displayed) source.
+    Rung heights apply to the short side, so portrait videos get the same
+    quality; rungs above the source are dropped (the lowest is always kept,
+    never upscaled).
+    """
+    ladder = sorted(getattr(settings, 'HLS_PREVIEW_LADDER', DEFAULT_LADDER), key=lambda rung: rung['height'])
+    short_side = min(width, height)
+    renditions = []
+    for rung in ladder:
+        if renditions and rung['height'] > short_side:
+            break
+        scale = min(1, rung['height'] / short_side)
+        renditions.append(dict(rung, width=_even(width * scale), height=_even(height * scale)))
+    return renditions
+
+
+def master_playlist(renditions, audio=True):
+    """The master playlist text listing each rendition's index playlist, lowest first."""
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3', '#EXT-X-INDEPENDENT-SEGMENTS']
+    for rendition in renditions:
+        bandwidth = _bits(rendition['video_bitrate']) + (_bits(rendition['audio_bitrate']) if audio else 0)
+        lines.append(
+            f"#EXT-X-STREAM-INF:BANDWIDTH={int(bandwidth * 1.1)},"
+            f"RESOLUTION={rendition['width']}x{rendition['height']}"
+        )
+        lines.append(f"{rendition['name']}/index.m3u8")
+    return '\n'.join(lines) + '\n'
+
+
+def rewrite_playlist(text, resolve):
+    """
+    Replace every URI line of a playlist with resolve(relative_uri).
+    Tags and comments are kept; URIs inside tags (EXT-X-MAP, EXT-X-KEY)
+    are not used by these previews.
+    """
+    lines = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        lines.append(resolve(stripped) if stripped and not stripped.startswith('#') else line)
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,216 @@
+"""
+Bucket / database reconciliation.
+
+Finds objects in the video bucket that no Video references (failed or
+never-registered uploads, e.g. Lambda-issued videos/<uuid> keys) and stored
+Videos whose object no longer exists. Objects under a Video's HLS preview
+prefix (previews.manifest_prefix of preview_manifest_key) count as referenced.
+
+Both sides are consumed as key-ordered streams and merged like the merge step
+of a merge sort, so memory stays constant however many keys there are:
+- ListObjectsV2 pages, which S3 returns in ascending UTF-8 byte order
+- a server-side cursor over Video rows ordered by storage_reference_id with
+  the "C" collation on PostgreSQL, i.e. the same byte order. Python compares
+  str by code point, which agrees with UTF-8 byte order.
+- a second cursor over preview prefixes in the same order; the objects under
+  one prefix are a contiguous run of the listing.
+
+If either stream turns out not to be sorted (a different collation, say), the
+merge would report false orphans, so it raises OrderingError instead.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models.functions import Collate
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+LIST_PAGE_SIZE = 1000
+CURSOR_CHUNK_SIZE = 2000
+
+# Objects newer than this may belong to an upload that is still being registered
+DEFAULT_GRACE_HOURS = 24
+
+# django-storages media and static files share the bucket but are not videos
+DEFAULT_EXCLUDE_PREFIXES = ('media/', 'static/')
+
+
+class OrderingError(RuntimeError):
+    """A reconciliation input stream was not in ascending key order."""
+
+
+def _ensure_sorted(items, key, source):
+    """Pass items through, raising OrderingError if key(item) ever decreases."""
+    previous = None
+    for item in items:
+        current = key(item)
+        if previous is not None and current < previous:
+            raise OrderingError(f"{source} is not sorted: {current!r} after {previous!r}")
+        previous = current
+        yield item
+
+
+def iter_bucket_objects(client, bucket, prefix='', exclude_prefixes=(), page_size=LIST_PAGE_SIZE):
+    """Stream (key, size, last_modified) for every object under prefix, in key order."""
+    paginator = client.get_paginator('list_objects_v2')
+    pages = paginator.paginate(Bucket=bucket, Prefix=prefix, PaginationConfig={'PageSize': page_size})
+    for page in pages:
+        for obj in page.get('Contents', []):
+            key = obj['Key']
+            if exclude_prefixes and key.startswith(tuple(exclude_prefixes)):
+                continue
+            yield key, obj.get('Size', 0), obj.get('LastModified')
+
+
+def iter_video_keys(prefix='', chunk_size=CURSOR_CHUNK_SIZE):
+    """
+    Stream (key, video_id, storage_status, file_size) for every Video with a
+    storage key under prefix, in the byte order ListObjectsV2 uses.
+    QuerySet.iterator() uses a server-side cursor on PostgreSQL.
+    """
+    from .models import Video
+
+    queryset = Video.objects.exclude(storage_reference_id__isnull=True).exclude(storage_reference_id='')
+    if prefix:
+        queryset = queryset.filter(storage_reference_id__startswith=prefix)
+    if connection.vendor == 'postgresql':
+        queryset = queryset.order_by(Collate('storage_reference_id', 'C'), 'id')
+    else:
+        # SQLite compares with BINARY (byte order) by default
+        queryset = queryset.order_by('storage_reference_id', 'id')
+    rows = queryset.values_list('storage_reference_id', 'id', 'storage_status', 'file_size')
+    yield from rows.iterator(chunk_size=chunk_size)
+
+
+def iter_preview_prefixes(prefix='', chunk_size=CURSOR_CHUNK_SIZE):
+    """
+    Stream the distinct HLS preview prefixes of Videos whose preview_manifest_key
+    is under prefix, in the byte order ListObjectsV2 uses.
+    """
+    from .models import Video
+    from .previews import manifest_prefix
+
+    queryset = Video.objects.exclude(preview_manifest_key__isnull=True).exclude(preview_manifest_key='')
+    if prefix:
+        queryset = queryset.filter(preview_manifest_key__startswith=prefix)
+    if connection.vendor == 'postgresql':
+        queryset = queryset.order_by(Collate('preview_manifest_key', 'C'))
+    else:
+        queryset = queryset.order_by('preview_manifest_key')
+    previous = None
+    for manifest_key in queryset.values_list('preview_manifest_key', flat=True).iterator(chunk_size=chunk_size):
+        current = manifest_prefix(manifest_key)
+        if current and current != previous:
+            yield current
+            previous = current
+
+
+class PrefixMatcher:
+    """
+    Tells whether keys, asked about in ascending order, fall under one of a
+    stream of ascending, non-nested prefixes. Consumes the stream as it goes.
+    """
+
+    def __init__(self, prefixes):
+        self._prefixes = _ensure_sorted(prefixes, lambda prefix: prefix, 'Preview prefixes')
+        self._current = next(self._prefixes, None)
+
+    def covers(self, key):
+        while self._current is not None and self._current < key and not key.startswith(self._current):
+            self._current = next(self._prefixes, None)
+        return self._current is not None and key.startswith(self._current)
+
+
+def sorted_merge(objects, videos):
+    """
+    Merge two key-ordered streams.
+    Yields (key, object_or_None, [video rows]) for every distinct key on either side;
+    several Videos may share one key.
+    """
+    objects = _ensure_sorted(objects, lambda obj: obj[0], 'Bucket listing')
+    videos = _ensure_sorted(videos, lambda row: row[0], 'Video query')
+    obj = next(objects, None)
+    row = next(videos, None)
+    while obj is not None or row is not None:
+        if row is None or (obj is not None and obj[0] < row[0]):
+            yield obj[0], obj, []
+            obj = next(objects, None)
+            continue
+        key = row[0]
+        rows = []
+        while row is not None and row[0] == key:
+            rows.append(row)
+            row = next(videos, None)
+        if obj is not None and obj[0] == key:
+            yield key, obj, rows
+            obj = next(objects, None)
+        else:
+            yield key, None, rows
+
+
+def reconcile(objects, videos, grace_hours=DEFAULT_GRACE_HOURS, on_orphan=None, on_missing=None,
+              sample_size=20, now=None, preview_prefixes=()):
+    """
+    Diff a bucket listing against Video rows.
+
+    Orphans are objects no Video references, either by key or through one of
+    preview_prefixes (counted as preview_objects); those modified within grace_hours
+    are counted separately as 'recent' since their upload may still register.
+    Missing objects are Videos with storage_status='stored' whose key is absent.
+    on_orphan(key, size, last_modified) and on_missing(key, video_id) receive
+    every finding; the returned report keeps only the first sample_size of each.
+    """
+    cutoff = (now or timezone.now()) - timedelta(hours=grace_hours)
+    report = {
+        'objects': 0,
+        'object_bytes': 0,
+        'videos': 0,
+        'matched': 0,
+        'preview_objects': 0,
+        'preview_bytes': 0,
+        'orphans': 0,
+        'orphan_bytes': 0,
+        'recent_unreferenced': 0,
+        'missing': 0,
+        'missing_bytes': 0,
+        'orphan_sample': [],
+        'missing_sample': [],
+    }
+
+    previews = PrefixMatcher(preview_prefixes)
+    for key, obj, rows in sorted_merge(objects, videos):
+        report['videos'] += len(rows)
+        if obj is not None:
+            _, size, last_modified = obj
+            report['objects'] += 1
+            report['object_bytes'] += size or 0
+            if rows:
+                report['matched'] += 1
+            elif previews.covers(key):
+                report['preview_objects'] += 1
+                report['preview_bytes'] += size or 0
+            elif last_modified is not None and last_modified > cutoff:
+                report['recent_unreferenced'] += 1
+            else:
+                report['orphans'] += 1
+                report['orphan_bytes'] += size or 0
+                if len(report['orphan_sample']) < sample_size:
+                    report['orphan_sample'].append(key)
+                if on_orphan:
+                    on_orphan(key, size, last_modified)
+            continue
+
+        for _, video_id, storage_status, file_size in rows:
+            if storage_status != 'stored':
+                continue
+            report['missing'] += 1
+            report['missing_bytes'] += file_size or 0
+            if len(report['missing_sample']) < sample_size:
+                report['missing_sample'].append({'key': key, 'video_id': video_id})
+            if on_missing:
+                on_missing(key, video_id)
+
+    return report
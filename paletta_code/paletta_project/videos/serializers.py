@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from .models import Video, ContentType, Tag, VideoTag, PalettaContentType
 from .services import AWSCloudStorageService
+from .delivery import granted_library
+from .sprites import sprite_urls
+from .thumbnails import variant_urls
 
 class ContentTypeSerializer(serializers.ModelSerializer):
     """
@@ -64,7 +67,11 @@ class VideoSerializer(serializers.ModelSerializer):
     library_name = serializers.ReadOnlyField(source='library.name')
     tags = serializers.SerializerMethodField()
     video_file_url = serializers.SerializerMethodField()
+    preview_url = serializers.SerializerMethodField()
+    playback_url = serializers.SerializerMethodField()
     thumbnail_url = serializers.SerializerMethodField()
+    thumbnail_variants = serializers.SerializerMethodField()
+    scrub_sprite = serializers.SerializerMethodField()
     storage_status_display = serializers.SerializerMethodField()
     display_content_types = serializers.ReadOnlyField()
     
@@ -72,8 +79,8 @@ class VideoSerializer(serializers.ModelSerializer):
         model = Video
         fields = ('id', 'title', 'description', 'content_type', 'content_type_name',
                   'library', 'library_name', 'uploader', 'uploaded_by_username', 'upload_date', 
-                  'updated_at', 'tags', 'video_file', 'video_file_url', 'thumbnail', 'thumbnail_url',
-                  'duration', 'file_size', 'views_count', 'storage_status', 'storage_status_display', 
+                  'updated_at', 'tags', 'video_file', 'video_file_url', 'preview_url', 'playback_url', 'thumbnail', 'thumbnail_url',
+                  'thumbnail_variants', 'scrub_sprite', 'duration', 'file_size', 'views_count', 'storage_status', 'storage_status_display', 
                   'storage_url', 'display_content_types')
         read_only_fields = ('uploader', 'upload_date', 'updated_at', 'views_count', 
                            'storage_status', 'storage_url', 'download_link', 'download_link_expiry',
@@ -90,6 +97,11 @@ class VideoSerializer(serializers.ModelSerializer):
             context=self.context
         ).data
     
+    def _granted_library_id(self):
+        """Library covered by the requesting session's delivery cookies, if any."""
+        library = granted_library(self.context.get('request'))
+        return library.id if library else None
+    
     def get_video_file_url(self, obj):
         """
         BACKEND/FRONTEND-READY: Generate video streaming URL for playback.
@@ -102,7 +114,7 @@ class VideoSerializer(serializers.ModelSerializer):
         """
         if obj.storage_status == 'stored' and obj.storage_reference_id:
             storage_service = AWSCloudStorageService()
-            return storage_service.generate_streaming_url(obj)
+            return storage_service.generate_streaming_url(obj, self._granted_library_id())
             
         if obj.video_file:
             request = self.context.get('request')
@@ -111,6 +123,24 @@ class VideoSerializer(serializers.ModelSerializer):
             return obj.video_file.url
         return None
     
+    def get_preview_url(self, obj):
+        """
+        BACKEND/FRONTEND-READY: HLS preview master playlist for in-page playback.
+        MAPPED TO: hls.js / native HLS players
+        USED BY: Video detail pages, embedded players
+        
+        Returns the absolute playlist URL, or None until the preview has been transcoded.
+        """
+        url = obj.get_preview_url(self._granted_library_id())
+        request = self.context.get('request')
+        if url and request:
+            return request.build_absolute_uri(url)
+        return url
+    
+    def get_playback_url(self, obj):
+        """What players should load: the HLS preview when there is one, otherwise the original file."""
+        return self.get_preview_url(obj) or self.get_video_file_url(obj)
+    
     def get_thumbnail_url(self, obj):
         """Get the absolute URL for the thumbnail."""
         if obj.thumbnail:
@@ -120,6 +150,38 @@ class VideoSerializer(serializers.ModelSerializer):
             return obj.thumbnail.url
         return None
     
+    def get_thumbnail_variants(self, obj):
+        """
+        BACKEND/FRONTEND-READY: Server-generated thumbnail URLs per size and format.
+        MAPPED TO: <picture>/srcset markup in listings and detail pages
+        USED BY: Video cards, detail views
+        
+        Returns {size: {width, height, webp, jpeg}} for the THUMBNAIL_SIZES
+        variants (e.g. card, detail, retina), or {} before they are generated.
+        """
+        if not obj.thumbnail_variants:
+            return {}
+        request = self.context.get('request')
+        return variant_urls(
+            obj.thumbnail_variants,
+            obj.thumbnail.storage,
+            request.build_absolute_uri if request else None,
+        )
+    
+    def get_scrub_sprite(self, obj):
+        """
+        BACKEND/FRONTEND-READY: Hover-scrub sprite sheet of the video.
+        MAPPED TO: Clip card scrubbing, player thumbnail tracks
+        USED BY: Video listings, detail views
+        
+        Returns the tile layout (width, height, columns, count, interval) with
+        URLs of the sprite image and its JSON and WebVTT indexes, or {}.
+        """
+        if not obj.scrub_sprite:
+            return {}
+        request = self.context.get('request')
+        return sprite_urls(obj.scrub_sprite, obj.thumbnail.storage, request.build_absolute_uri if request else None)
+    
     def get_storage_status_display(self, obj):
         """Get the display value for the storage status."""
         return dict(Video.STORAGE_STATUS_CHOICES).get(obj.storage_status, obj.storage_status)
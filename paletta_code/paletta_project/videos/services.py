@@ -1,76 +1,103 @@
 import os
+import time
+import random
 import logging
-import boto3
 import math
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
 from botocore.exceptions import ClientError
+from paletta_core.resilience import s3_available
+from .storage_backends import get_storage_backend
+from .delivery import cookie_delivery_enabled, library_prefix, delivery_url
+from .storage_keys import canonical_key, is_canonical, CANONICAL_KEY_SQL
+from .download_links import video_download_link, attachment_filename, redirect_expiry
+from .upload_io import PartReader, RSSMonitor, get_inflight_budget
+from .multipart import (
+    default_part_size, clamp_part_size, recommend_upload_plan, measured_throughput,
+    CHECKSUM_ALGORITHM, part_checksum, composite_checksum, check_upload_size, S3_MAX_PARTS,
+)
 
 logger = logging.getLogger(__name__)
 
+# S3 error codes worth retrying after a pause
+RETRYABLE_S3_ERRORS = {'SlowDown', 'InternalError', 'ServiceUnavailable', 'RequestTimeout'}
+
+
+def _backoff(attempt, base=0.5, cap=30):
+    """Sleep with exponential backoff and full jitter."""
+    time.sleep(random.uniform(0, min(cap, base * (2 ** attempt))))
+
+
 class AWSCloudStorageService:
     """
     AWS S3 storage service for video file management.
     Handles S3 operations: multipart upload, download link generation, streaming URLs, deletion.
+    Objects live in the configured storage backend (S3, or local disk for
+    development and on-prem installs); see storage_backends.py.
     """
     
     def __init__(self):
         """
         Initialize AWS S3 service with configuration validation.
+        Cheap to call per request: the S3 client and its health check are shared per process.
         """
         # Get configuration from Django settings
-        self.storage_enabled = getattr(settings, 'AWS_STORAGE_ENABLED', False)
+        self.backend = get_storage_backend()
+        self.storage_enabled = self.backend is not None
         
         if self.storage_enabled:
             self.aws_access_key = getattr(settings, 'AWS_ACCESS_KEY_ID', None)
             self.aws_secret_key = getattr(settings, 'AWS_SECRET_ACCESS_KEY', None)
             self.aws_region = getattr(settings, 'AWS_REGION', 'us-east-1')
-            self.bucket_name = getattr(settings, 'AWS_STORAGE_BUCKET_NAME', None)
+            self.bucket_name = self.backend.bucket_name
             self.download_link_expiry = getattr(settings, 'DOWNLOAD_LINK_EXPIRY_HOURS', 24)
             
             # Multipart upload configuration from settings
             self.multipart_threshold = getattr(settings, 'S3_MULTIPART_THRESHOLD', 5 * 1024 * 1024)  # 5MB default
             self.multipart_chunk_size = getattr(settings, 'S3_MULTIPART_CHUNK_SIZE', 10 * 1024 * 1024)  # 10MB default
             self.max_concurrent_parts = getattr(settings, 'S3_MAX_CONCURRENT_PARTS', 10)  # 10 concurrent parts default
+            self.upload_rss_cap = getattr(settings, 'S3_UPLOAD_RSS_CAP', None)  # optional RSS ceiling in bytes
+            self.last_upload_stats = None
             
-            # Initialize S3 client if credentials are available
-            if self.aws_access_key and self.aws_secret_key and self.bucket_name:
-                try:
-                    self.s3_client = boto3.client(
-                        's3',
-                        aws_access_key_id=self.aws_access_key,
-                        aws_secret_access_key=self.aws_secret_key,
-                        region_name=self.aws_region
-                    )
-                    # Test connection
-                    self.s3_client.list_buckets()
-                    logger.info("Successfully connected to AWS S3")
-                except Exception as e:
+            # The S3 backend uses the process-wide pooled client; its connectivity probe is cached per process
+            try:
+                self.s3_client = self.backend.client
+                if not self.backend.is_available():
                     self.storage_enabled = False
-                    logger.error(f"Failed to connect to AWS S3: {str(e)}")
-            else:
+            except Exception as e:
                 self.storage_enabled = False
-                logger.warning("AWS storage is enabled but AWS credentials are missing")
+                logger.error(f"Failed to connect to {self.backend.name} storage: {str(e)}")
     
     def _multipart_upload(self, video, s3_key, content_type):
         """
         Multipart upload with parallel processing for large files.
         Implements multipart upload with concurrent part uploads for better performance.
-        Supports files up to 10GB with 100MB chunks and 100 concurrent parts.
+        Supports files up to S3's 5TB object limit: parts start at
+        S3_MULTIPART_CHUNK_SIZE and grow so the file fits in 10,000 parts.
+        Memory is bounded: the file is read through one shared PartReader and
+        parts are admitted against the process-wide in-flight byte budget.
+        Each part is sent with its SHA-256 (hashed from the same view that is
+        uploaded), and the composite checksum is stored on the video.
         """
+        upload_id = None
         try:
             file_size = video.video_file.size
-            chunk_size = self.multipart_chunk_size
+            # Grows past S3_MULTIPART_CHUNK_SIZE when the file would need more than 10,000 parts
+            chunk_size = default_part_size(file_size)
             
             # Calculate number of parts
             num_parts = math.ceil(file_size / chunk_size)
             
             # Validate file size limits (S3 supports up to 5TB with multipart)
-            max_file_size = 10 * 1024 * 1024 * 1024  # 10GB limit
-            if file_size > max_file_size:
-                logger.error(f"File size {file_size} bytes exceeds maximum allowed size of {max_file_size} bytes")
+            try:
+                check_upload_size(file_size)
+            except ValueError as e:
+                logger.error(f"Cannot upload video ID {video.id} ({file_size} bytes): {str(e)}")
+                return False
+            if num_parts > S3_MAX_PARTS:
+                logger.error(f"Video ID {video.id} would need {num_parts} parts of {chunk_size} bytes, more than S3 allows")
                 return False
             
             # Log upload details for large files
@@ -82,32 +109,43 @@ class AWSCloudStorageService:
                 Bucket=self.bucket_name,
                 Key=s3_key,
                 ContentType=content_type,
-                ACL='private'
+                ACL='private',
+                ChecksumAlgorithm=CHECKSUM_ALGORITHM
             )
             
             upload_id = response['UploadId']
             parts = []
             
-            # Upload parts in parallel with adaptive concurrency
+            # Concurrency is capped by part count here and by memory through the byte budget
             max_workers = min(self.max_concurrent_parts, num_parts)
-            logger.info(f"Using {max_workers} concurrent workers for {num_parts} parts")
+            budget = get_inflight_budget()
+            logger.info(f"Using up to {max_workers} concurrent workers for {num_parts} parts (in-flight budget {budget.limit / (1024*1024):.0f}MB)")
             
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all part upload tasks
+            with PartReader(video.video_file) as reader, \
+                    RSSMonitor(cap=self.upload_rss_cap) as rss_monitor, \
+                    ThreadPoolExecutor(max_workers=max_workers) as executor:
                 future_to_part = {}
                 
                 for part_number in range(1, num_parts + 1):
                     start_byte = (part_number - 1) * chunk_size
                     end_byte = min(start_byte + chunk_size, file_size)
                     
+                    # Stop admitting parts while the process is above its RSS cap
+                    if rss_monitor.over_cap():
+                        logger.warning(f"RSS {rss_monitor.last_rss / (1024*1024):.0f}MB above cap, throttling video ID {video.id}")
+                        rss_monitor.wait_below_cap(lambda: sum(1 for pending in future_to_part if not pending.done()))
+                    
+                    reserved = budget.acquire(end_byte - start_byte)
                     future = executor.submit(
                         self._upload_part,
-                        video,
+                        reader,
+                        s3_key,
                         upload_id,
                         part_number,
                         start_byte,
                         end_byte
                     )
+                    future.add_done_callback(lambda _f, n=reserved: budget.release(n))
                     future_to_part[future] = part_number
                 
                 # Collect results as they complete
@@ -115,10 +153,11 @@ class AWSCloudStorageService:
                 for future in as_completed(future_to_part):
                     part_number = future_to_part[future]
                     try:
-                        etag = future.result()
+                        etag, checksum = future.result()
                         parts.append({
                             'ETag': etag,
-                            'PartNumber': part_number
+                            'PartNumber': part_number,
+                            'ChecksumSHA256': checksum
                         })
                         completed_parts += 1
                         
@@ -131,6 +170,8 @@ class AWSCloudStorageService:
                             
                     except Exception as e:
                         logger.error(f"Part {part_number} upload failed for video ID {video.id}: {str(e)}")
+                        for pending in future_to_part:
+                            pending.cancel()
                         # Abort multipart upload on failure
                         self.s3_client.abort_multipart_upload(
                             Bucket=self.bucket_name,
@@ -139,64 +180,103 @@ class AWSCloudStorageService:
                         )
                         return False
             
-            # Complete multipart upload
+            self.last_upload_stats = {
+                'parts': num_parts,
+                'part_size': chunk_size,
+                'peak_rss': rss_monitor.peak_rss,
+                'start_rss': rss_monitor.start_rss,
+                'memory_mapped': reader.is_mapped,
+            }
+            logger.info(
+                f"Upload memory for video ID {video.id}: peak RSS {rss_monitor.peak_rss / (1024*1024):.0f}MB "
+                f"(start {(rss_monitor.start_rss or 0) / (1024*1024):.0f}MB)"
+            )
+            
+            # Complete multipart upload (parts must be listed in ascending order)
+            parts.sort(key=lambda part: part['PartNumber'])
             logger.info(f"Completing multipart upload for video ID {video.id} with {len(parts)} parts")
-            self.s3_client.complete_multipart_upload(
+            response = self.s3_client.complete_multipart_upload(
                 Bucket=self.bucket_name,
                 Key=s3_key,
                 UploadId=upload_id,
                 MultipartUpload={'Parts': parts}
             )
             
+            # S3 has verified every part; its composite must match the digests we sent
+            checksum = composite_checksum([part['ChecksumSHA256'] for part in parts])
+            reported = response.get('ChecksumSHA256')
+            if reported and reported != checksum:
+                logger.error(f"Composite checksum mismatch for video ID {video.id}: sent {checksum}, S3 reported {reported}")
+                return False
+            video.checksum_sha256 = checksum
+            if getattr(video, 'pk', None):
+                video.save(update_fields=['checksum_sha256'])
+            self.last_upload_stats['checksum_sha256'] = checksum
+            
             logger.info(f"Successfully completed multipart upload for video ID {video.id}: {file_size_gb:.2f}GB")
             return True
             
         except Exception as e:
             logger.error(f"Multipart upload failed for video ID {video.id}: {str(e)}")
             # Attempt to abort multipart upload
-            try:
-                self.s3_client.abort_multipart_upload(
-                    Bucket=self.bucket_name,
-                    Key=s3_key,
-                    UploadId=upload_id
-                )
-            except:
-                pass
+            if upload_id:
+                try:
+                    self.s3_client.abort_multipart_upload(
+                        Bucket=self.bucket_name,
+                        Key=s3_key,
+                        UploadId=upload_id
+                    )
+                except Exception:
+                    pass
             return False
     
-    def _upload_part(self, video, upload_id, part_number, start_byte, end_byte):
+    def _upload_part(self, reader, s3_key, upload_id, part_number, start_byte, end_byte):
         """
         Upload a single part of a multipart upload.
-        Uploads a specific byte range of the file as a multipart part.
+        Sends a zero-copy view of bytes [start_byte, end_byte) from the shared reader,
+        hashed from the same view so S3 can verify the part on arrival.
+        Returns (etag, base64 SHA-256).
         """
+        body = reader.part(start_byte, end_byte)
         try:
-            with video.video_file.open('rb') as file_data:
-                # Seek to the start position
-                file_data.seek(start_byte)
-                
-                # Read the chunk
-                chunk = file_data.read(end_byte - start_byte)
-                
-                # Upload the part
-                response = self.s3_client.upload_part(
-                    Bucket=self.bucket_name,
-                    Key=video.storage_reference_id or f"videos/user_{video.uploader.id}/{video.id}/{os.path.basename(video.video_file.name)}",
-                    PartNumber=part_number,
-                    UploadId=upload_id,
-                    Body=chunk
-                )
-                
-                return response['ETag']
+            checksum = part_checksum(body.view)
+            response = self.s3_client.upload_part(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                PartNumber=part_number,
+                UploadId=upload_id,
+                Body=body,
+                ContentLength=len(body),
+                ChecksumSHA256=checksum
+            )
+            return response['ETag'], checksum
                 
         except Exception as e:
             logger.error(f"Part {part_number} upload failed: {str(e)}")
             raise e
+        finally:
+            reader.release(body)
+    
+    def presign_url(self, key, expiry, method='GET', params=None, bucket=None):
+        """
+        Presign a request through the storage backend.
+        S3 URLs are signed with a cached signing key and reused within a time window,
+        so listings and detail pages do not re-sign identical URLs; local URLs
+        carry a signed token for LocalStorageObjectView.
+        """
+        return self.backend.presign_url(
+            bucket or self.bucket_name,
+            key,
+            expiry,
+            method=method,
+            params=params
+        )
     
     def generate_download_link(self, video):
         """
-        Generate temporary S3 download link with expiry.
-        Creates presigned S3 URL for video download (24h default expiry).
-        Updates video model with link and expiry timestamp.
+        Stable click-time download link for a video (DOWNLOAD_LINK_EXPIRY_HOURS validity).
+        Nothing is signed against storage and no row is written here: the
+        /d/<token>/ link is resolved by DownloadRedirectView when followed.
         """
         if not self.storage_enabled:
             logger.warning("Deep storage is not enabled")
@@ -205,42 +285,68 @@ class AWSCloudStorageService:
         if not video.storage_reference_id or video.storage_status != 'stored':
             logger.error(f"Video ID {video.id} is not properly stored in deep storage")
             return None
-            
+        
+        return video_download_link(video, self.download_link_expiry)
+    
+    def presign_download(self, video, filename=None):
+        """
+        Short-lived presigned GET for a video, signed when a download link is followed.
+        Lifetime is DOWNLOAD_REDIRECT_EXPIRY_SECONDS; the object is served as an attachment.
+        """
+        if not self.storage_enabled:
+            logger.warning("Deep storage is not enabled")
+            return None
+        
+        if not video.storage_reference_id or video.storage_status != 'stored':
+            logger.error(f"Video ID {video.id} is not properly stored in deep storage")
+            return None
+        
+        filename = (filename or attachment_filename(video)).replace('"', "'")
         try:
-            # Generate a presigned URL that expires after the configured time
-            expiry = int(self.download_link_expiry * 3600)  # Convert hours to seconds
-            
-            url = self.s3_client.generate_presigned_url(
-                'get_object',
-                Params={
-                    'Bucket': self.bucket_name,
-                    'Key': video.storage_reference_id,
-                    'ResponseContentDisposition': f'attachment; filename="{os.path.basename(video.storage_reference_id)}"'
-                },
-                ExpiresIn=expiry
+            return self.presign_url(
+                video.storage_reference_id,
+                redirect_expiry(),
+                params={
+                    'response-content-disposition': f'attachment; filename="{filename}"'
+                }
             )
-            
-            # Update the video with the download link and expiry time
-            video.download_link = url
-            video.download_link_expiry = timezone.now() + timedelta(hours=self.download_link_expiry)
-            video.save(update_fields=['download_link', 'download_link_expiry'])
-            
-            logger.info(f"Generated download link for video ID {video.id}")
-            return url
-            
         except ClientError as e:
             error_code = e.response.get('Error', {}).get('Code', 'Unknown')
-            logger.error(f"AWS S3 error ({error_code}) generating download link for video ID {video.id}: {str(e)}")
+            logger.error(f"AWS S3 error ({error_code}) presigning download for video ID {video.id}: {str(e)}")
             return None
         except Exception as e:
-            logger.error(f"Error generating download link for video ID {video.id}: {str(e)}")
+            logger.error(f"Error presigning download for video ID {video.id}: {str(e)}")
+            return None
+    
+    def media_source(self, video):
+        """
+        Where ffmpeg should read a stored video from: the object's path on the
+        local backend, otherwise a presigned GET URL (MEDIA_SOURCE_URL_EXPIRY,
+        long enough for a full transcode). ffmpeg reads it with Range requests.
+        """
+        if not self.storage_enabled or not video.storage_reference_id:
             return None
+        object_path = getattr(self.backend, 'object_path', None)
+        if object_path:
+            return object_path(self.bucket_name, video.storage_reference_id)
+        return self.presign_url(video.storage_reference_id, getattr(settings, 'MEDIA_SOURCE_URL_EXPIRY', 6 * 3600))
     
-    def generate_streaming_url(self, video):
+    def _cookie_delivery_url(self, video, key, granted_library_id):
+        """Plain delivery URL for key if the request's cookie grant covers it, else None."""
+        if (cookie_delivery_enabled() and video.library_id and granted_library_id == video.library_id
+                and key.startswith(library_prefix(video.library_id))):
+            return delivery_url(key)
+        return None
+    
+    def generate_streaming_url(self, video, granted_library_id=None):
         """
         Generate temporary S3 streaming URL.
         Creates presigned S3 URL for video streaming (1h expiry).
         Used for in-browser video playback without downloads.
+        Identical URLs are served from the presign cache within a time window.
+        In signed-cookie delivery mode, objects under the video's library prefix
+        get a plain delivery URL instead when granted_library_id (the library the
+        request's cookies cover, delivery.granted_library) is the video's library.
         """
         if not self.storage_enabled:
             logger.warning("Deep storage is not enabled")
@@ -249,19 +355,21 @@ class AWSCloudStorageService:
         if not video.storage_reference_id or video.storage_status != 'stored':
             logger.error(f"Video ID {video.id} is not properly stored in deep storage")
             return None
+        
+        if not s3_available():
+            # Pages still render while S3 is failing, just without playable URLs
+            logger.debug(f"S3 circuit open; no streaming URL for video ID {video.id}")
+            return None
             
         try:
+            url = self._cookie_delivery_url(video, video.storage_reference_id, granted_library_id)
+            if url:
+                return url
+            
             # presigned URL that expires after a shorter time for streaming
             expiry = 3600  # 1 hour in seconds
             
-            url = self.s3_client.generate_presigned_url(
-                'get_object',
-                Params={
-                    'Bucket': self.bucket_name,
-                    'Key': video.storage_reference_id
-                },
-                ExpiresIn=expiry
-            )
+            url = self.presign_url(video.storage_reference_id, expiry)
             
             return url
             
@@ -273,6 +381,56 @@ class AWSCloudStorageService:
             logger.error(f"Error generating streaming URL for video ID {video.id}: {str(e)}")
             return None
     
+    def generate_preview_url(self, video, granted_library_id=None):
+        """
+        URL of a video's HLS preview master playlist, or None if it has none.
+        In signed-cookie delivery mode a preview under the video's library prefix is
+        served directly when the request's cookies cover that library (they then
+        cover its segments too); otherwise the playlists go through
+        VideoPreviewPlaylistView, which presigns each segment.
+        """
+        from django.urls import reverse
+        from .previews import MASTER_PLAYLIST
+        
+        key = video.preview_manifest_key
+        if not self.storage_enabled or not key or video.storage_status != 'stored' or not s3_available():
+            return None
+        url = self._cookie_delivery_url(video, key, granted_library_id)
+        if url:
+            return url
+        return reverse('api_video_preview_playlist', args=[video.id, MASTER_PLAYLIST])
+    
+    def read_object(self, key):
+        """The bytes of a (small) stored object, such as a playlist."""
+        return self.s3_client.get_object(Bucket=self.bucket_name, Key=key)['Body'].read()
+    
+    def upload_files(self, files, max_workers=None):
+        """
+        Store local files with parallel PutObject requests.
+        files: [(path, key, content_type)]. They are stored in no particular order;
+        callers that need one (segments before playlists) make separate calls.
+        """
+        max_workers = max_workers or getattr(settings, 'PREVIEW_UPLOAD_CONCURRENCY', 8)
+        
+        def put(path, key, content_type):
+            with open(path, 'rb') as handle:
+                self.s3_client.put_object(Bucket=self.bucket_name, Key=key, Body=handle.read(), ContentType=content_type)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for future in as_completed([executor.submit(put, *entry) for entry in files]):
+                future.result()
+        return len(files)
+    
+    def delete_prefix(self, prefix):
+        """Delete every object under prefix. Returns delete_objects' result."""
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        keys = [
+            item['Key']
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix)
+            for item in page.get('Contents', [])
+        ]
+        return self.delete_objects(keys)
+    
     def delete_from_storage(self, video):
         """
         Delete video and thumbnail from S3 storage.
@@ -335,6 +493,1076 @@ class AWSCloudStorageService:
             logger.error(f"Error deleting video ID {video.id} from S3: {str(e)}")
             return False
 
+    def delete_objects(self, keys, bucket=None, max_attempts=6):
+        """
+        Delete many objects with S3 DeleteObjects, 1,000 keys per request.
+        Throttled requests (SlowDown) and per-key transient errors are retried
+        with exponential backoff and jitter.
+        Returns {'deleted': int, 'failed': [keys]}.
+        """
+        bucket = bucket or self.bucket_name
+        deleted = 0
+        failed = []
+        keys = list(keys)
+        
+        for start in range(0, len(keys), 1000):
+            pending = keys[start:start + 1000]
+            for attempt in range(max_attempts):
+                try:
+                    response = self.s3_client.delete_objects(
+                        Bucket=bucket,
+                        Delete={'Objects': [{'Key': key} for key in pending], 'Quiet': True}
+                    )
+                except ClientError as e:
+                    code = e.response.get('Error', {}).get('Code')
+                    if code not in RETRYABLE_S3_ERRORS or attempt == max_attempts - 1:
+                        raise
+                    _backoff(attempt)
+                    continue
+                
+                errors = response.get('Errors', [])
+                retry = [error['Key'] for error in errors if error.get('Code') in RETRYABLE_S3_ERRORS]
+                permanent = [error['Key'] for error in errors if error.get('Code') not in RETRYABLE_S3_ERRORS]
+                for error in errors:
+                    if error.get('Code') not in RETRYABLE_S3_ERRORS:
+                        logger.error(f"Could not delete s3://{bucket}/{error['Key']}: {error.get('Code')} {error.get('Message', '')}")
+                
+                deleted += len(pending) - len(errors)
+                failed.extend(permanent)
+                pending = retry
+                if not pending:
+                    break
+                if attempt == max_attempts - 1:
+                    failed.extend(pending)
+                else:
+                    _backoff(attempt)
+        
+        logger.info(f"Deleted {deleted} objects from {bucket} ({len(failed)} failed)")
+        return {'deleted': deleted, 'failed': failed}
+    
+    # ------------------------------------------------------------------
+    # Server-side copies
+    # ------------------------------------------------------------------
+    
+    def copy_object(self, source_key, dest_key, content_type=None):
+        """
+        Copy an object within the bucket without its bytes passing through this server.
+        Objects up to S3_COPY_MULTIPART_THRESHOLD (5GB, the CopyObject limit) take one
+        CopyObject request; larger ones are copied as parallel UploadPartCopy ranges.
+        Returns {'size': int, 'checksum_sha256': str} for the new object.
+        """
+        head = self.s3_client.head_object(Bucket=self.bucket_name, Key=source_key)
+        size = head['ContentLength']
+        content_type = content_type or head.get('ContentType')
+        copy_source = {'Bucket': self.bucket_name, 'Key': source_key}
+        threshold = getattr(settings, 'S3_COPY_MULTIPART_THRESHOLD', 5 * 1024 ** 3)
+        
+        if size <= threshold:
+            kwargs = {'Bucket': self.bucket_name, 'Key': dest_key, 'CopySource': copy_source}
+            if content_type:
+                kwargs.update(ContentType=content_type, MetadataDirective='REPLACE')
+            self.s3_client.copy_object(**kwargs)
+            copied = self.s3_client.head_object(Bucket=self.bucket_name, Key=dest_key, ChecksumMode='ENABLED')
+            checksum = copied.get('ChecksumSHA256', '')
+        else:
+            checksum = self._multipart_copy(copy_source, dest_key, size, content_type)
+        
+        logger.info(f"Copied {source_key} to {dest_key} ({size / (1024 ** 3):.2f}GB)")
+        return {'size': size, 'checksum_sha256': checksum}
+    
+    def _copy_part(self, copy_source, dest_key, upload_id, part_number, start_byte, end_byte, max_attempts=5):
+        """UploadPartCopy of bytes [start_byte, end_byte], retried on throttling. Returns the part entry."""
+        for attempt in range(max_attempts):
+            try:
+                response = self.s3_client.upload_part_copy(
+                    Bucket=self.bucket_name,
+                    Key=dest_key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    CopySource=copy_source,
+                    CopySourceRange=f'bytes={start_byte}-{end_byte}'
+                )
+                result = response['CopyPartResult']
+                return {'ETag': result['ETag'], 'PartNumber': part_number, 'ChecksumSHA256': result.get('ChecksumSHA256')}
+            except ClientError as e:
+                code = e.response.get('Error', {}).get('Code')
+                if code not in RETRYABLE_S3_ERRORS or attempt == max_attempts - 1:
+                    raise
+                _backoff(attempt)
+    
+    def _multipart_copy(self, copy_source, dest_key, size, content_type=None):
+        """
+        Copy a large object as parallel UploadPartCopy ranges (S3_COPY_PART_SIZE, 512MB
+        by default, grown to stay within 10,000 parts). Aborts the upload on failure.
+        Returns the composite SHA-256 of the copy.
+        """
+        part_size = clamp_part_size(getattr(settings, 'S3_COPY_PART_SIZE', 512 * 1024 * 1024), size)
+        max_workers = getattr(settings, 'S3_COPY_MAX_CONCURRENT_PARTS', 16)
+        num_parts = math.ceil(size / part_size)
+        
+        kwargs = {'Bucket': self.bucket_name, 'Key': dest_key, 'ChecksumAlgorithm': CHECKSUM_ALGORITHM}
+        if content_type:
+            kwargs['ContentType'] = content_type
+        upload_id = self.s3_client.create_multipart_upload(**kwargs)['UploadId']
+        
+        try:
+            parts = []
+            with ThreadPoolExecutor(max_workers=min(max_workers, num_parts)) as executor:
+                futures = [
+                    executor.submit(
+                        self._copy_part, copy_source, dest_key, upload_id, part_number,
+                        (part_number - 1) * part_size, min(part_number * part_size, size) - 1
+                    )
+                    for part_number in range(1, num_parts + 1)
+                ]
+                for future in as_completed(futures):
+                    parts.append(future.result())
+            
+            parts.sort(key=lambda part: part['PartNumber'])
+            response = self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=dest_key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+        except Exception:
+            try:
+                self.s3_client.abort_multipart_upload(Bucket=self.bucket_name, Key=dest_key, UploadId=upload_id)
+            except Exception as e:
+                logger.error(f"Could not abort multipart copy {upload_id} to {dest_key}: {str(e)}")
+            raise
+        
+        checksums = [part['ChecksumSHA256'] for part in parts]
+        checksum = composite_checksum(checksums) if all(checksums) else ''
+        reported = response.get('ChecksumSHA256')
+        if reported and checksum and reported != checksum:
+            raise ValueError(f"Composite checksum mismatch copying to {dest_key}: expected {checksum}, S3 reported {reported}")
+        logger.info(f"Multipart copy to {dest_key} completed in {num_parts} parts of {part_size / (1024 * 1024):.0f}MB")
+        return reported or checksum
+    
+    # ------------------------------------------------------------------
+    # Browser multipart uploads (tracked by UploadSession)
+    # ------------------------------------------------------------------
+    
+    def create_multipart_upload(self, user, library, content_type, file_size, part_size=None, file_name=''):
+        """
+        Start a browser-driven multipart upload and record it as an UploadSession.
+        The bucket always comes from settings and the key is a new canonical key
+        in library (storage_keys.py); clients choose neither.
+        Part size and concurrency are recommended from the file size and the
+        user's reported throughput; a part size the client asks for is capped
+        the same way (browser buffer size, in-flight budget).
+        """
+        from .models import UploadSession
+        
+        file_size = int(file_size)
+        check_upload_size(file_size)
+        key = canonical_key(library.id, file_name)
+        plan = recommend_upload_plan(file_size, measured_throughput(user), part_size=part_size)
+        part_size = plan['part_size']
+        response = self.s3_client.create_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=key,
+            ContentType=content_type,
+            ACL='private',
+            ChecksumAlgorithm=CHECKSUM_ALGORITHM
+        )
+        session = UploadSession.objects.create(
+            user=user,
+            library=library,
+            upload_id=response['UploadId'],
+            bucket=self.bucket_name,
+            key=key,
+            file_name=file_name or '',
+            content_type=content_type or '',
+            file_size=file_size,
+            part_size=part_size,
+            concurrency=plan['concurrency'],
+            checksum_algorithm=CHECKSUM_ALGORITHM,
+        )
+        logger.info(f"Created upload session {session.id} for {key}: {session.total_parts} parts of {part_size} bytes")
+        return session
+    
+    def list_uploaded_parts(self, session):
+        """
+        Reconcile an UploadSession with S3 ListParts (all pages).
+        S3 is the source of truth: the confirmed part map is replaced with what it reports.
+        """
+        parts = {}
+        marker = 0
+        while True:
+            response = self.s3_client.list_parts(
+                Bucket=session.bucket,
+                Key=session.key,
+                UploadId=session.upload_id,
+                MaxParts=1000,
+                PartNumberMarker=marker
+            )
+            for part in response.get('Parts', []):
+                parts[str(part['PartNumber'])] = {
+                    'etag': part['ETag'],
+                    'size': part['Size'],
+                    'checksum': part.get('ChecksumSHA256', ''),
+                }
+            if not response.get('IsTruncated'):
+                break
+            marker = response['NextPartNumberMarker']
+        
+        if parts != session.parts:
+            session.parts = parts
+            session.save(update_fields=['parts', 'updated_at'])
+        return parts
+    
+    def presign_upload_part(self, session, part_number, expiry=3600, checksum=None):
+        """
+        Presigned PUT URL for one part of an active upload session.
+        With a checksum (base64 SHA-256 of the part) the value is signed into
+        the URL, so S3 rejects the part unless the bytes match it.
+        """
+        params = {'partNumber': str(part_number), 'uploadId': session.upload_id}
+        if checksum:
+            params['x-amz-checksum-sha256'] = checksum
+        return self.presign_url(
+            session.key,
+            expiry,
+            method='PUT',
+            params=params,
+            bucket=session.bucket
+        )
+    
+    def presign_upload_parts(self, session, part_numbers, expiry=3600, checksums=None):
+        """
+        Presigned PUT URLs for many parts in one call.
+        Signing is local (cached signing key), so a window of hundreds of parts
+        costs one request round trip instead of one per part.
+        checksums: optional {part_number: base64 SHA-256}.
+        """
+        checksums = checksums or {}
+        return {
+            part_number: self.presign_upload_part(session, part_number, expiry, checksums.get(part_number))
+            for part_number in part_numbers
+        }
+    
+    def complete_multipart_upload(self, session):
+        """
+        Complete an upload session with a part list built from S3 ListParts.
+        Returns (response, missing_parts); nothing is completed while parts are missing.
+        """
+        self.list_uploaded_parts(session)
+        missing = session.missing_parts()
+        if missing:
+            return None, missing
+        
+        parts = []
+        for number in range(1, session.total_parts + 1):
+            confirmed = session.parts[str(number)]
+            part = {'PartNumber': number, 'ETag': confirmed['etag']}
+            if session.checksum_algorithm:
+                part['ChecksumSHA256'] = confirmed['checksum']
+            parts.append(part)
+        response = self.s3_client.complete_multipart_upload(
+            Bucket=session.bucket,
+            Key=session.key,
+            UploadId=session.upload_id,
+            MultipartUpload={'Parts': parts}
+        )
+        session.status = 'completed'
+        session.completed_at = timezone.now()
+        if session.checksum_algorithm:
+            session.checksum_sha256 = response.get('ChecksumSHA256') or composite_checksum(
+                [part['ChecksumSHA256'] for part in parts]
+            )
+        session.save(update_fields=['status', 'completed_at', 'checksum_sha256', 'updated_at'])
+        logger.info(f"Completed upload session {session.id} for {session.key} ({len(parts)} parts)")
+        return response, []
+    
+    @staticmethod
+    def record_upload_telemetry(session, samples):
+        """
+        Add client-reported part timings to an upload session.
+        samples: iterable of {'bytes': int, 'seconds': float}; implausible entries are dropped.
+        Returns the number of samples recorded.
+        """
+        from django.db.models import F
+        from .models import UploadSession
+        
+        total_bytes = 0
+        total_seconds = 0.0
+        recorded = 0
+        for sample in samples:
+            try:
+                nbytes = int(sample.get('bytes', 0))
+                seconds = float(sample.get('seconds', 0))
+            except (AttributeError, ValueError, TypeError):
+                continue
+            if nbytes <= 0 or seconds <= 0 or nbytes > session.part_size:
+                continue
+            total_bytes += nbytes
+            total_seconds += seconds
+            recorded += 1
+        
+        if recorded:
+            UploadSession.objects.filter(pk=session.pk).update(
+                bytes_transferred=F('bytes_transferred') + total_bytes,
+                transfer_seconds=F('transfer_seconds') + total_seconds
+            )
+        return recorded
+    
+    def abort_multipart_upload(self, session):
+        """Abort an upload session in S3 so its stored parts stop accruing charges."""
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=session.bucket,
+                Key=session.key,
+                UploadId=session.upload_id
+            )
+        except ClientError as e:
+            # NoSuchUpload: already aborted or completed elsewhere
+            if e.response.get('Error', {}).get('Code') != 'NoSuchUpload':
+                raise
+        session.status = 'aborted'
+        session.save(update_fields=['status', 'updated_at'])
+        logger.info(f"Aborted upload session {session.id} for {session.key}")
+
+    def uploaded_object_info(self, user, key):
+        """
+        Size and composite checksum of an uploaded object, taken from storage
+        rather than from the client.
+        Uses the user's completed UploadSession for the key when there is one
+        (no S3 call), otherwise HeadObject with checksum mode enabled.
+        Returns {'file_size', 'checksum_sha256'}, or None if the object does not exist.
+        """
+        from .models import UploadSession
+
+        session = UploadSession.objects.filter(
+            user=user, bucket=self.bucket_name, key=key, status='completed'
+        ).order_by('-completed_at').first()
+        if session:
+            return {'file_size': session.file_size, 'checksum_sha256': session.checksum_sha256}
+
+        try:
+            response = self.s3_client.head_object(Bucket=self.bucket_name, Key=key, ChecksumMode='ENABLED')
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+        return {
+            'file_size': response['ContentLength'],
+            'checksum_sha256': response.get('ChecksumSHA256', ''),
+        }
+
+    
+    # ------------------------------------------------------------------
+    # Stale multipart upload reaper
+    # ------------------------------------------------------------------
+    
+    def _multipart_upload_size(self, key, upload_id):
+        """Total bytes of the parts already stored for an incomplete upload."""
+        total = 0
+        marker = 0
+        while True:
+            response = self.s3_client.list_parts(
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                MaxParts=1000,
+                PartNumberMarker=marker
+            )
+            total += sum(part['Size'] for part in response.get('Parts', []))
+            if not response.get('IsTruncated'):
+                return total
+            marker = response['NextPartNumberMarker']
+    
+    def _reap_multipart_upload(self, key, upload_id, dry_run):
+        """Measure and abort one incomplete upload; returns the bytes it held."""
+        size = self._multipart_upload_size(key, upload_id)
+        if not dry_run:
+            try:
+                self.s3_client.abort_multipart_upload(
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    UploadId=upload_id
+                )
+            except ClientError as e:
+                # Completed or aborted since it was listed
+                if e.response.get('Error', {}).get('Code') != 'NoSuchUpload':
+                    raise
+                return 0
+        return size
+    
+    def _partition_stale_uploads(self, uploads, cutoff):
+        """
+        Split a page of ListMultipartUploads results into (stale, skipped).
+        An upload is live if an active UploadSession was touched since cutoff,
+        or a Video with its key is still pending or uploading (server-side upload).
+        """
+        from .models import UploadSession, Video
+        
+        upload_ids = [upload['UploadId'] for upload in uploads]
+        keys = [upload['Key'] for upload in uploads]
+        live_ids = set(
+            UploadSession.objects.filter(upload_id__in=upload_ids, status='active', updated_at__gte=cutoff)
+            .values_list('upload_id', flat=True)
+        )
+        live_keys = set(
+            Video.objects.filter(storage_reference_id__in=keys, storage_status__in=['pending', 'uploading'])
+            .values_list('storage_reference_id', flat=True)
+        )
+        
+        stale, skipped = [], []
+        for upload in uploads:
+            if upload['Initiated'] >= cutoff or upload['UploadId'] in live_ids or upload['Key'] in live_keys:
+                skipped.append(upload)
+            else:
+                stale.append(upload)
+        return stale, skipped
+    
+    def reap_stale_multipart_uploads(self, older_than_hours=None, dry_run=False, max_workers=None):
+        """
+        Abort incomplete multipart uploads that nobody will finish.
+        Pages through ListMultipartUploads, skips uploads that are recent or
+        still live, and aborts the rest on a bounded thread pool.
+        Returns counts and the bytes of stored parts reclaimed.
+        """
+        from .models import UploadSession
+        
+        stats = {'scanned': 0, 'aborted': 0, 'skipped': 0, 'errors': 0, 'bytes_reclaimed': 0, 'dry_run': dry_run}
+        if not self.storage_enabled:
+            logger.warning("Deep storage is not enabled")
+            return stats
+        
+        if older_than_hours is None:
+            older_than_hours = getattr(settings, 'S3_MULTIPART_REAP_AFTER_HOURS', 24)
+        max_workers = max_workers or getattr(settings, 'S3_MULTIPART_REAP_WORKERS', 8)
+        cutoff = timezone.now() - timedelta(hours=older_than_hours)
+        
+        reaped_ids = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            list_kwargs = {'Bucket': self.bucket_name, 'MaxUploads': 1000}
+            while True:
+                response = self.s3_client.list_multipart_uploads(**list_kwargs)
+                uploads = response.get('Uploads', [])
+                stats['scanned'] += len(uploads)
+                
+                stale, skipped = self._partition_stale_uploads(uploads, cutoff) if uploads else ([], [])
+                stats['skipped'] += len(skipped)
+                for upload in stale:
+                    future = executor.submit(self._reap_multipart_upload, upload['Key'], upload['UploadId'], dry_run)
+                    futures[future] = upload
+                
+                if not response.get('IsTruncated'):
+                    break
+                list_kwargs['KeyMarker'] = response.get('NextKeyMarker')
+                list_kwargs['UploadIdMarker'] = response.get('NextUploadIdMarker')
+            
+            for future in as_completed(futures):
+                upload = futures[future]
+                try:
+                    stats['bytes_reclaimed'] += future.result()
+                    stats['aborted'] += 1
+                    reaped_ids.append(upload['UploadId'])
+                except Exception as e:
+                    stats['errors'] += 1
+                    logger.error(f"Failed to abort multipart upload {upload['UploadId']} for {upload['Key']}: {str(e)}")
+        
+        if reaped_ids and not dry_run:
+            UploadSession.objects.filter(upload_id__in=reaped_ids, status='active').update(
+                status='aborted', updated_at=timezone.now()
+            )
+        
+        logger.info(
+            f"Multipart reaper {'(dry run) ' if dry_run else ''}scanned {stats['scanned']} uploads: "
+            f"aborted {stats['aborted']}, skipped {stats['skipped']}, errors {stats['errors']}, "
+            f"reclaimed {stats['bytes_reclaimed'] / (1024 * 1024):.1f}MB"
+        )
+        return stats
+    
+    def reconcile_storage(self, prefix='', grace_hours=None, on_orphan=None, on_missing=None):
+        """
+        Diff the bucket against Video rows in constant memory (see reconciliation.py).
+        Reports objects no Video references (HLS preview objects count as referenced)
+        and stored Videos whose object is gone, with total bytes.
+        Read-only: nothing is deleted or updated.
+        """
+        from .reconciliation import (
+            iter_bucket_objects, iter_video_keys, iter_preview_prefixes, reconcile, DEFAULT_EXCLUDE_PREFIXES,
+        )
+        
+        if not self.storage_enabled:
+            logger.warning("Deep storage is not enabled")
+            return None
+        
+        if grace_hours is None:
+            grace_hours = getattr(settings, 'S3_RECONCILE_GRACE_HOURS', 24)
+        exclude_prefixes = getattr(settings, 'S3_RECONCILE_EXCLUDE_PREFIXES', DEFAULT_EXCLUDE_PREFIXES)
+        
+        started = time.monotonic()
+        report = reconcile(
+            iter_bucket_objects(self.s3_client, self.bucket_name, prefix=prefix, exclude_prefixes=exclude_prefixes),
+            iter_video_keys(prefix=prefix),
+            grace_hours=grace_hours,
+            on_orphan=on_orphan,
+            on_missing=on_missing,
+            preview_prefixes=iter_preview_prefixes(prefix=prefix),
+        )
+        report['bucket'] = self.bucket_name
+        report['prefix'] = prefix
+        report['duration_seconds'] = round(time.monotonic() - started, 2)
+        
+        logger.info(
+            f"Storage reconciliation of s3://{self.bucket_name}/{prefix}: {report['objects']} objects, "
+            f"{report['videos']} videos, {report['orphans']} orphans ({report['orphan_bytes'] / (1024 ** 3):.2f}GB), "
+            f"{report['missing']} missing objects, {report['recent_unreferenced']} recent unreferenced"
+        )
+        return report
+
+class StorageKeyMigrationService:
+    """
+    Move stored videos onto the canonical key layout (storage_keys.py).
+    Each object is copied server-side to a new canonical key in its video's
+    library, the row is repointed in a transaction that re-checks the old key,
+    and the old object is deleted once that commits. Videos are processed on
+    a bounded thread pool. Runs can be stopped and repeated at any time:
+    videos already on a canonical key for their library are not selected.
+    """
+    
+    def __init__(self, storage_service=None):
+        self.storage = storage_service or AWSCloudStorageService()
+    
+    @staticmethod
+    def pending_videos(library_id=None):
+        """Stored videos whose key is not a canonical key of their own library."""
+        from django.db.models import Q, Value, CharField
+        from django.db.models.functions import Cast, Concat
+        from .models import Video
+        
+        own_prefix = Concat(Value('library_'), Cast('library_id', output_field=CharField()), Value('/'))
+        queryset = Video.objects.filter(storage_status='stored').exclude(storage_reference_id__isnull=True) \
+            .exclude(storage_reference_id='') \
+            .filter(~Q(storage_reference_id__regex=CANONICAL_KEY_SQL) | ~Q(storage_reference_id__startswith=own_prefix))
+        if library_id:
+            queryset = queryset.filter(library_id=library_id)
+        return queryset.order_by('id')
+    
+    def migrate_video(self, video_id, dry_run=False):
+        """
+        Move one video's object to a canonical key.
+        Returns (outcome, bytes) with outcome 'migrated', 'skipped' or 'changed'
+        (the row was updated concurrently; the copy is discarded). Raises on copy errors.
+        """
+        from django.db import transaction
+        from .models import Video
+        from .signals import enqueue_storage_deletion
+        
+        video = Video.objects.filter(pk=video_id, storage_status='stored').only(
+            'id', 'library_id', 'storage_reference_id', 'file_size', 'checksum_sha256'
+        ).first()
+        if video is None or not video.storage_reference_id or is_canonical(video.storage_reference_id, video.library_id):
+            return 'skipped', 0
+        
+        bucket = self.storage.bucket_name
+        source_key = video.storage_reference_id
+        dest_key = canonical_key(video.library_id, source_key)
+        if dry_run:
+            logger.info(f"Would move video ID {video.id} from {source_key} to {dest_key}")
+            return 'migrated', video.file_size or 0
+        
+        copied = self.storage.copy_object(source_key, dest_key)
+        try:
+            with transaction.atomic():
+                target = Video.objects.select_for_update().get(pk=video.pk)
+                if target.storage_reference_id != source_key:
+                    enqueue_storage_deletion(bucket, [dest_key])
+                    return 'changed', 0
+                target.storage_reference_id = dest_key
+                target.storage_url = f"s3://{bucket}/{dest_key}"
+                target.file_size = copied['size']
+                target.checksum_sha256 = copied['checksum_sha256'] or target.checksum_sha256
+                target.save(update_fields=['storage_reference_id', 'storage_url', 'file_size', 'checksum_sha256', 'updated_at'])
+                transaction.on_commit(lambda: enqueue_storage_deletion(bucket, [source_key]))
+        except Exception:
+            # The row still points at the source object; drop the orphaned copy
+            enqueue_storage_deletion(bucket, [dest_key])
+            raise
+        
+        logger.info(f"Moved video ID {video.id} from {source_key} to {dest_key}")
+        return 'migrated', copied['size']
+    
+    def _migrate_in_thread(self, video_id, dry_run):
+        from django.db import connection
+        try:
+            return self.migrate_video(video_id, dry_run)
+        finally:
+            # Worker threads get their own connection; don't leave it open
+            connection.close()
+    
+    def run(self, library_id=None, limit=None, max_workers=None, dry_run=False, on_progress=None):
+        """
+        Migrate pending videos in parallel (STORAGE_KEY_MIGRATION_WORKERS copies at a time).
+        Returns {'scanned', 'migrated', 'skipped', 'changed', 'errors', 'bytes', 'dry_run'}.
+        on_progress(stats) is called after every video.
+        """
+        stats = {'scanned': 0, 'migrated': 0, 'skipped': 0, 'changed': 0, 'errors': 0, 'bytes': 0, 'dry_run': dry_run}
+        if not self.storage.storage_enabled:
+            logger.warning("Deep storage is not enabled")
+            return stats
+        
+        max_workers = max_workers or getattr(settings, 'STORAGE_KEY_MIGRATION_WORKERS', 8)
+        video_ids = self.pending_videos(library_id).values_list('id', flat=True)
+        if limit:
+            video_ids = video_ids[:limit]
+        
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
+            
+            def collect(done):
+                for future in done:
+                    video_id = pending.pop(future)
+                    try:
+                        outcome, size = future.result()
+                        stats[outcome] += 1
+                        stats['bytes'] += size
+                    except Exception as e:
+                        stats['errors'] += 1
+                        logger.error(f"Failed to migrate storage key of video ID {video_id}: {str(e)}")
+                    if on_progress:
+                        on_progress(stats)
+            
+            # Keep a bounded number of videos queued, so huge tables are streamed rather than loaded
+            for video_id in video_ids.iterator(chunk_size=1000):
+                stats['scanned'] += 1
+                pending[executor.submit(self._migrate_in_thread, video_id, dry_run)] = video_id
+                if len(pending) >= max_workers * 2:
+                    collect([next(as_completed(pending))])
+            collect(list(as_completed(pending)))
+        
+        stats['duration_seconds'] = round(time.monotonic() - started, 2)
+        logger.info(
+            f"Storage key migration {'(dry run) ' if dry_run else ''}scanned {stats['scanned']} videos: "
+            f"migrated {stats['migrated']} ({stats['bytes'] / (1024 ** 3):.2f}GB), skipped {stats['skipped']}, "
+            f"changed {stats['changed']}, errors {stats['errors']} in {stats['duration_seconds']}s"
+        )
+        return stats
+
+
+class VideoRelocationService:
+    """
+    Move or copy stored videos between libraries with server-side S3 copies.
+    The object is copied to a key under the target library's prefix, then the
+    row changes (storage key, tags remapped to the target library's Tag rows,
+    content type) are applied in one transaction. A moved video's old object and
+    HLS preview are deleted once that transaction commits; a failed transaction
+    deletes the copy. Previews are keyed by the object, so the moved or copied
+    video gets a new one; generated thumbnails and sprites are content-addressed
+    and stay shared.
+    """
+    
+    MODES = ('move', 'copy')
+    
+    def __init__(self, storage_service=None):
+        self.storage = storage_service or AWSCloudStorageService()
+    
+    @staticmethod
+    def target_key(library, source_key):
+        """Fresh canonical key for a video in library, keeping the source file extension."""
+        return canonical_key(library.id, source_key)
+    
+    @staticmethod
+    def resolve_content_type(video, library, content_type_id=None):
+        """
+        Content type for the video in the target library: the requested one, else the
+        target library's content type with the same subject area (and custom name).
+        Raises ValueError if there is none.
+        """
+        from .models import ContentType
+        
+        if content_type_id:
+            content_type = ContentType.objects.filter(id=content_type_id, library=library, is_active=True).first()
+            if content_type is None:
+                raise ValueError('Content type not found in the target library or is inactive')
+            return content_type
+        
+        source = video.content_type
+        candidates = ContentType.objects.filter(library=library, subject_area=source.subject_area, is_active=True)
+        if source.subject_area == 'custom':
+            candidates = candidates.filter(custom_name=source.custom_name)
+        content_type = candidates.first()
+        if content_type is None:
+            raise ValueError(f"Target library has no '{source.display_name}' content type; choose one explicitly")
+        return content_type
+    
+    @staticmethod
+    def remap_tags(video, library):
+        """Target-library Tag rows with the names of the video's current tags (created as needed)."""
+        from .models import Tag
+        
+        names = sorted({tag.name for tag in video.tags.all()})
+        existing = {tag.name: tag for tag in Tag.objects.filter(library=library, name__in=names)}
+        missing = [Tag(name=name, library=library) for name in names if name not in existing]
+        if missing:
+            Tag.objects.bulk_create(missing, ignore_conflicts=True)
+            existing = {tag.name: tag for tag in Tag.objects.filter(library=library, name__in=names)}
+        return [existing[name] for name in names]
+    
+    def validate(self, video, library, mode='move', content_type_id=None):
+        """
+        Check that video can be moved or copied into library.
+        Returns the target content type. Raises ValueError for invalid requests.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {', '.join(self.MODES)}")
+        if not self.storage.storage_enabled:
+            raise ValueError('Deep storage is not enabled')
+        if video.storage_status != 'stored' or not video.storage_reference_id:
+            raise ValueError('Only stored videos can be moved or copied')
+        if mode == 'move' and video.library_id == library.id:
+            raise ValueError('Video is already in this library')
+        return self.resolve_content_type(video, library, content_type_id)
+    
+    def runs_in_background(self, video):
+        """
+        True if the copy is above S3_COPY_MULTIPART_THRESHOLD. Such copies are made of
+        many UploadPartCopy requests and outlast an HTTP request, so they run as the
+        relocate_video task.
+        """
+        size = video.file_size
+        if not size:
+            size = self.storage.s3_client.head_object(
+                Bucket=self.storage.bucket_name, Key=video.storage_reference_id
+            )['ContentLength']
+        return size > getattr(settings, 'S3_COPY_MULTIPART_THRESHOLD', 5 * 1024 ** 3)
+    
+    def relocate(self, video, library, mode='move', content_type_id=None, user=None):
+        """
+        Move video into library, or copy it there as a new Video owned by user.
+        Returns the moved or newly created Video. Raises ValueError for invalid requests.
+        """
+        from django.db import transaction
+        from .models import Video, VideoTag
+        from .previews import manifest_prefix
+        from .signals import enqueue_storage_deletion, enqueue_prefix_deletion
+        
+        content_type = self.validate(video, library, mode, content_type_id)
+        bucket = self.storage.bucket_name
+        source_key = video.storage_reference_id
+        dest_key = self.target_key(library, source_key)
+        copied = self.storage.copy_object(source_key, dest_key)
+        
+        try:
+            with transaction.atomic():
+                tags = self.remap_tags(video, library)
+                if mode == 'move':
+                    target = Video.objects.select_for_update().get(pk=video.pk)
+                    if target.storage_reference_id != source_key:
+                        raise ValueError('Video storage changed during the move; try again')
+                    VideoTag.objects.filter(video=target).delete()
+                    # The preview lives next to the old key; it is rebuilt next to the new one
+                    old_manifest_key = target.preview_manifest_key
+                    target.preview_manifest_key = None
+                else:
+                    target = Video(
+                        title=video.title,
+                        description=video.description,
+                        uploader=user or video.uploader,
+                        duration=video.duration,
+                        resolution=video.resolution,
+                        frame_rate=video.frame_rate,
+                        format=video.format,
+                        thumbnail_variants=video.thumbnail_variants,
+                        scrub_sprite=video.scrub_sprite,
+                    )
+                target.library = library
+                target.content_type = content_type
+                target.storage_reference_id = dest_key
+                target.storage_url = f"s3://{bucket}/{dest_key}"
+                target.storage_status = 'stored'
+                target.file_size = copied['size']
+                target.checksum_sha256 = copied['checksum_sha256'] or video.checksum_sha256
+                target.save()
+                VideoTag.objects.bulk_create([VideoTag(video=target, tag=tag) for tag in tags])
+                if mode == 'move':
+                    transaction.on_commit(lambda: enqueue_storage_deletion(bucket, [source_key]))
+                    if old_manifest_key:
+                        old_prefix = manifest_prefix(old_manifest_key)
+                        transaction.on_commit(lambda: enqueue_prefix_deletion(bucket, old_prefix))
+        except Exception:
+            # The row still points at the source object; drop the orphaned copy
+            enqueue_storage_deletion(bucket, [dest_key])
+            raise
+        
+        if mode == 'copy' and video.thumbnail:
+            self._copy_thumbnail(video, target)
+        if video.preview_manifest_key:
+            # Previews live next to their object; the moved or copied object gets its own
+            VideoProcessingService.start_preview(target)
+        
+        logger.info(f"{'Moved' if mode == 'move' else 'Copied'} video ID {video.id} to library {library.id} as video ID {target.id} ({dest_key})")
+        return target
+    
+    @staticmethod
+    def _copy_thumbnail(video, target):
+        """
+        Give a copied video its own thumbnail file, so deleting one video keeps the other's.
+        Generated thumbnails are content-addressed and shared instead (deletion checks references).
+        """
+        from .thumbnails import is_generated
+        
+        if is_generated(video.thumbnail.name):
+            target.thumbnail.name = video.thumbnail.name
+            target.save(update_fields=['thumbnail'])
+            return
+        try:
+            with video.thumbnail.open('rb') as source:
+                target.thumbnail.save(os.path.basename(video.thumbnail.name), source, save=True)
+        except Exception as e:
+            logger.warning(f"Could not copy thumbnail of video ID {video.id} to video ID {target.id}: {str(e)}")
+
+
+class VideoProcessingService:
+    """
+    Post-upload media pipeline. A registered upload is marked 'processing' and
+    handed to the 'media' Celery queue, whose workers run ffprobe against the
+    stored object (see media.py) and fill in duration, resolution, frame rate
+    and format. The video becomes 'stored' when that succeeds and
+    'processing_failed' when the file cannot be read as a video. Thumbnails,
+    the scrub sprite and the HLS preview are made afterwards; failing to make
+    them does not fail the video.
+    """
+    
+    def __init__(self, storage_service=None):
+        self.storage = storage_service or AWSCloudStorageService()
+    
+    @staticmethod
+    def enabled():
+        return getattr(settings, 'MEDIA_PROCESSING_ENABLED', False)
+    
+    @staticmethod
+    def start(video):
+        """
+        Queue the pipeline for a newly stored video once the surrounding transaction commits.
+        The video stays 'stored' (with browser-reported metadata) when processing is
+        disabled or the queue is unreachable.
+        """
+        from django.db import transaction
+        from .models import Video
+        
+        if not VideoProcessingService.enabled() or not video.storage_reference_id:
+            return False
+        Video.objects.filter(pk=video.pk).update(storage_status='processing')
+        video.storage_status = 'processing'
+        
+        def enqueue():
+            from .tasks import probe_video
+            try:
+                probe_video.delay(video.pk)
+            except Exception as e:
+                logger.warning(f"Could not queue processing of video ID {video.pk} ({e}); leaving it stored")
+                Video.objects.filter(pk=video.pk, storage_status='processing').update(storage_status='stored')
+        
+        transaction.on_commit(enqueue)
+        return True
+    
+    def probe(self, video):
+        """
+        Read the stored object's metadata with ffprobe, save it and mark the video stored.
+        Returns the metadata. Raises media.MediaError if the file cannot be probed.
+        """
+        from .media import probe, read_metadata, MediaError
+        
+        source = self.storage.media_source(video)
+        if not source:
+            raise MediaError('Video has no readable storage object')
+        
+        started = time.monotonic()
+        metadata = read_metadata(probe(source), video.storage_reference_id)
+        for field, value in metadata.items():
+            setattr(video, field, value)
+        video.storage_status = 'stored'
+        video.save(update_fields=list(metadata) + ['storage_status', 'updated_at'])
+        
+        logger.info(f"Probed video ID {video.id} in {time.monotonic() - started:.2f}s: {metadata}")
+        VideoLogService.log_processing(
+            video, None,
+            f"Media metadata read: {metadata.get('resolution', '?')}, {metadata.get('frame_rate', '?')}fps, "
+            f"{metadata.get('duration', '?')}s, {metadata.get('format', '?')}"
+        )
+        return metadata
+    
+    def generate_thumbnails(self, video):
+        """
+        Grab a representative keyframe of the stored object and store it in every
+        thumbnail size as WebP and JPEG (see thumbnails.py). Videos without an
+        uploaded thumbnail get the detail JPEG as their thumbnail.
+        Returns the thumbnail_variants mapping. Raises media.MediaError if no frame can be read.
+        """
+        from paletta_core.storage import get_media_storage
+        from .media import extract_frame, thumbnail_time, MediaError
+        from . import thumbnails
+        
+        source = self.storage.media_source(video)
+        if not source:
+            raise MediaError('Video has no readable storage object')
+        
+        started = time.monotonic()
+        frame = extract_frame(source, thumbnail_time(video.duration), thumbnails.frame_box())
+        variants = thumbnails.store(thumbnails.render(frame), get_media_storage())
+        
+        video.thumbnail_variants = variants
+        update_fields = ['thumbnail_variants', 'updated_at']
+        if not video.thumbnail and 'detail' in variants:
+            video.thumbnail.name = variants['detail']['jpeg']
+            update_fields.append('thumbnail')
+        video.save(update_fields=update_fields)
+        
+        logger.info(f"Generated {len(variants)} thumbnail sizes for video ID {video.id} in {time.monotonic() - started:.2f}s")
+        VideoLogService.log_processing(video, None, f"Thumbnails generated: {', '.join(variants)}")
+        return variants
+    
+    def generate_scrub_sprite(self, video):
+        """
+        Extract SCRUB_SPRITE_FRAMES frames at fixed intervals, tile them into one
+        sprite sheet with JSON and WebVTT indexes and store it in MediaStorage
+        (see sprites.py). Returns the scrub_sprite mapping.
+        Raises media.MediaError if the video has no duration/resolution yet or no frame can be read.
+        """
+        from paletta_core.storage import get_media_storage
+        from .media import extract_frames, MediaError
+        from . import sprites
+        
+        if not video.duration or not video.resolution:
+            raise MediaError('Video has not been probed yet')
+        source = self.storage.media_source(video)
+        if not source:
+            raise MediaError('Video has no readable storage object')
+        
+        started = time.monotonic()
+        width, height = (int(value) for value in video.resolution.split('x'))
+        tile = sprites.tile_size(width, height)
+        times = sprites.frame_times(video.duration, sprites.frame_count())
+        frames = extract_frames(source, times, tile)
+        files, layout = sprites.render(frames, times, video.duration, tile)
+        sprite = sprites.store(files, layout, get_media_storage())
+        
+        video.scrub_sprite = sprite
+        video.save(update_fields=['scrub_sprite', 'updated_at'])
+        
+        logger.info(f"Generated a {len(frames)}-frame scrub sprite for video ID {video.id} in {time.monotonic() - started:.2f}s")
+        VideoLogService.log_processing(video, None, f"Scrub sprite generated: {len(frames)} frames")
+        return sprite
+    
+    def transcode_preview(self, video):
+        """
+        Transcode the stored object into the HLS preview ladder (see previews.py),
+        store it alongside the original and point preview_manifest_key at it.
+        The master playlist is stored last, so a manifest key always refers to a
+        complete preview. Returns the renditions. Raises media.MediaError on ffmpeg errors.
+        """
+        import tempfile
+        from .models import Video
+        from .media import probe, read_metadata, has_audio, transcode_hls, package_hls, MediaError
+        from .transcoding import SegmentedTranscoder, transcode_workers
+        from .previews import (
+            plan_renditions, master_playlist, segment_seconds, manifest_prefix,
+            MASTER_PLAYLIST, PLAYLIST_CONTENT_TYPE, SEGMENT_CONTENT_TYPE,
+        )
+        from .signals import enqueue_prefix_deletion
+        from .storage_keys import preview_prefix
+        
+        source_key = video.storage_reference_id
+        source = self.storage.media_source(video)
+        if not source:
+            raise MediaError('Video has no readable storage object')
+        
+        started = time.monotonic()
+        info = probe(source)
+        resolution = read_metadata(info, source_key).get('resolution')
+        if not resolution:
+            raise MediaError('Video stream has no dimensions')
+        width, height = (int(value) for value in resolution.split('x'))
+        renditions = plan_renditions(width, height)
+        audio = has_audio(info)
+        prefix = preview_prefix(source_key)
+        
+        with tempfile.TemporaryDirectory(prefix='paletta-hls-', dir=getattr(settings, 'MEDIA_WORK_DIR', None)) as work_dir:
+            output_dir = os.path.join(work_dir, 'hls')
+            duration = float(info.get('format', {}).get('duration') or 0)
+            if transcode_workers() > 1 and duration >= getattr(settings, 'TRANSCODE_PARALLEL_MIN_SECONDS', 60):
+                # Long sources: encode segments in parallel, then cut the joined renditions without re-encoding
+                transcoder = SegmentedTranscoder(
+                    source, work_dir, keyframe_seconds=segment_seconds(),
+                    start_time=float(info.get('format', {}).get('start_time') or 0),
+                )
+                for name, path in transcoder.transcode(renditions, audio).items():
+                    package_hls(path, os.path.join(output_dir, name), segment_seconds())
+                    os.remove(path)
+            else:
+                transcode_hls(source, output_dir, renditions, segment_seconds(), audio)
+            with open(os.path.join(output_dir, MASTER_PLAYLIST), 'w') as handle:
+                handle.write(master_playlist(renditions, audio))
+            
+            segments, playlists = [], []
+            for directory, _, names in os.walk(output_dir):
+                for name in names:
+                    path = os.path.join(directory, name)
+                    key = prefix + os.path.relpath(path, output_dir).replace(os.sep, '/')
+                    if name.endswith('.m3u8'):
+                        playlists.append((path, key, PLAYLIST_CONTENT_TYPE))
+                    else:
+                        segments.append((path, key, SEGMENT_CONTENT_TYPE))
+            playlists.sort(key=lambda entry: entry[1].endswith(MASTER_PLAYLIST))
+            self.storage.upload_files(segments)
+            self.storage.upload_files(playlists[:-1])
+            self.storage.upload_files(playlists[-1:])
+        
+        # The object may have been moved (key migration, relocation) while transcoding
+        manifest_key = prefix + MASTER_PLAYLIST
+        current = Video.objects.filter(pk=video.pk, storage_reference_id=source_key)
+        previous = current.values_list('preview_manifest_key', flat=True).first()
+        if not current.update(preview_manifest_key=manifest_key):
+            enqueue_prefix_deletion(self.storage.bucket_name, prefix)
+            raise MediaError('Video storage changed while transcoding; preview discarded')
+        if previous and previous != manifest_key:
+            enqueue_prefix_deletion(self.storage.bucket_name, manifest_prefix(previous))
+        video.preview_manifest_key = manifest_key
+        
+        logger.info(
+            f"Transcoded preview of video ID {video.id} ({', '.join(r['name'] for r in renditions)}, "
+            f"{len(segments)} segments) in {time.monotonic() - started:.1f}s"
+        )
+        VideoLogService.log_processing(
+            video, None, f"HLS preview ready: {', '.join(r['name'] for r in renditions)}"
+        )
+        return renditions
+    
+    @staticmethod
+    def start_preview(video):
+        """Queue preview transcoding for a stored video once the surrounding transaction commits."""
+        from django.db import transaction
+        from .previews import preview_enabled
+        
+        if not VideoProcessingService.enabled() or not preview_enabled() or not video.storage_reference_id:
+            return False
+        
+        def enqueue():
+            from .tasks import transcode_preview
+            try:
+                transcode_preview.delay(video.pk)
+            except Exception as e:
+                logger.warning(f"Could not queue preview transcoding of video ID {video.pk}: {str(e)}")
+        
+        transaction.on_commit(enqueue)
+        return True
+    
+    @staticmethod
+    def fail(video, reason):
+        """Mark a video whose processing cannot succeed."""
+        video.storage_status = 'processing_failed'
+        video.save(update_fields=['storage_status', 'updated_at'])
+        VideoLogService.log_error(video, None, f"Processing failed: {reason}")
+
+
 class VideoLogService:
     """
     Comprehensive video activity logging service.
@@ -0,0 +1,219 @@
+"""
+Storage bookkeeping for videos.
+
+Saving a Video whose video_file is a StreamedUpload (see
+videos.upload_handlers) records the already-stored object instead of
+writing the file again.
+
+Deleting a Video (directly, through a queryset, or by CASCADE from a Library)
+fires post_delete for every row. The handler only records the storage objects
+that belonged to the row; once the surrounding transaction commits, the keys
+are handed to a Celery task in batches that map onto S3 DeleteObjects
+(1,000 keys per request) instead of one DeleteObject call per file.
+Generated thumbnails and scrub sprites are content-addressed and may be
+shared between videos; the batch collects their names and, when it is
+flushed, removes only those that no remaining video refers to, looked up in
+a few queries for the whole batch rather than one per deleted row.
+"""
+
+import logging
+import threading
+import weakref
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, pre_save
+from django.dispatch import receiver
+
+from .models import Video
+from .previews import manifest_prefix
+from .storage_backends import get_storage_backend
+from .storage_keys import is_preview_prefix
+from .sprites import sprite_names
+from .thumbnails import is_generated, variant_names
+from .upload_handlers import StreamedUpload
+
+logger = logging.getLogger(__name__)
+
+DELETE_BATCH_SIZE = 1000  # S3 DeleteObjects limit
+REFERENCE_LOOKUP_BATCH = 100  # generated image names per reference query
+
+_local = threading.local()
+
+
+class PendingDeletion:
+    """
+    Storage objects of rows deleted in one transaction (or savepoint).
+    Flushed once by transaction.on_commit; discarded with it on rollback.
+    registered is True from the on_commit registration until flush runs.
+    """
+
+    def __init__(self):
+        self.registered = False
+        self.s3_keys = defaultdict(set)  # bucket -> keys
+        self.s3_prefixes = defaultdict(set)  # bucket -> HLS preview prefixes
+        self.local_files = []  # (storage, name) for non-S3 storages
+        self.generated_images = defaultdict(set)  # storage -> shareable thumbnail/sprite names
+
+    def flush(self):
+        self.registered = False
+        for storage, names in self.generated_images.items():
+            for name in sorted(names - _referenced_images(names)):
+                _add_storage_name(self, storage, name)
+
+        for bucket, keys in self.s3_keys.items():
+            keys = sorted(keys)
+            for start in range(0, len(keys), DELETE_BATCH_SIZE):
+                enqueue_storage_deletion(bucket, keys[start:start + DELETE_BATCH_SIZE])
+
+        for bucket, prefixes in self.s3_prefixes.items():
+            for prefix in sorted(prefixes):
+                enqueue_prefix_deletion(bucket, prefix)
+
+        for storage, name in self.local_files:
+            try:
+                storage.delete(name)
+            except Exception as e:
+                logger.error(f"Error deleting file {name}: {e}")
+
+
+def enqueue_storage_deletion(bucket, keys):
+    """Hand a batch of keys to the deletion task, deleting inline if Celery is unreachable."""
+    from .tasks import delete_storage_objects
+    try:
+        delete_storage_objects.delay(bucket, keys)
+    except Exception as e:
+        logger.warning(f"Could not queue deletion of {len(keys)} objects ({e}); deleting inline")
+        delete_storage_objects(bucket, keys)
+
+
+def enqueue_prefix_deletion(bucket, prefix):
+    """Hand an HLS preview prefix to the prefix deletion task, deleting inline if Celery is unreachable."""
+    from .tasks import delete_storage_prefix
+    if not is_preview_prefix(prefix):
+        logger.error(f"Refusing to delete non-preview prefix {prefix!r}")
+        return
+    try:
+        delete_storage_prefix.delay(bucket, prefix)
+    except Exception as e:
+        logger.warning(f"Could not queue deletion of {prefix} ({e}); deleting inline")
+        delete_storage_prefix(bucket, prefix)
+
+
+def _pending_deletion():
+    """
+    Return the PendingDeletion for the current transaction scope.
+    A new batch is started per savepoint level so a rolled-back savepoint
+    cannot leave keys of surviving rows in a batch that still commits.
+    Batches are held weakly: the only strong reference is the queued
+    on_commit hook, so a batch disappears once its transaction commits
+    (flush also clears registered) or rolls back (Django drops the hook).
+    """
+    if not connection.in_atomic_block:
+        return None
+
+    scope = (connection.alias, tuple(connection.savepoint_ids))
+    batches = getattr(_local, 'batches', None)
+    if batches is None:
+        batches = _local.batches = weakref.WeakValueDictionary()
+
+    batch = batches.get(scope)
+    if batch is None or not batch.registered:
+        batch = batches[scope] = PendingDeletion()
+        transaction.on_commit(batch.flush)
+        batch.registered = True
+    return batch
+
+
+def _add_storage_name(batch, storage, name):
+    """Record a stored file for deletion: S3 storages by key, anything else by name."""
+    bucket = getattr(storage, 'bucket_name', None)
+    normalize = getattr(storage, '_normalize_name', None)
+    if bucket and normalize:
+        try:
+            batch.s3_keys[bucket].add(normalize(name))
+            return
+        except Exception:
+            pass
+    batch.local_files.append((storage, name))
+
+
+def _add_field_file(batch, field_file):
+    """Record a FieldFile for deletion."""
+    if not field_file or not field_file.name:
+        return
+    _add_storage_name(batch, field_file.storage, field_file.name)
+
+
+def _add_generated_images(batch, instance):
+    """Record the deleted row's generated thumbnails and scrub sprite files; shared ones are kept at flush."""
+    names = set(variant_names(instance.thumbnail_variants)) | set(sprite_names(instance.scrub_sprite))
+    if is_generated(instance.thumbnail.name):
+        names.add(instance.thumbnail.name)
+    if names:
+        batch.generated_images[instance.thumbnail.storage].update(names)
+
+
+def _referenced_images(names):
+    """
+    The generated image names that a remaining video still refers to.
+    Runs after the deleting transaction committed, so deleted rows are gone;
+    if the lookup fails every name is treated as referenced and kept.
+    """
+    names = sorted(names)
+    still_used = set()
+    try:
+        for start in range(0, len(names), REFERENCE_LOOKUP_BATCH):
+            referencing = Q()
+            for name in names[start:start + REFERENCE_LOOKUP_BATCH]:
+                referencing |= Q(thumbnail=name) | Q(thumbnail_variants__icontains=name) | Q(scrub_sprite__icontains=name)
+            for thumbnail, variants, sprite in Video.objects.filter(referencing) \
+                    .values_list('thumbnail', 'thumbnail_variants', 'scrub_sprite'):
+                still_used.add(thumbnail)
+                still_used.update(variant_names(variants))
+                still_used.update(sprite_names(sprite))
+    except Exception as e:
+        logger.error(f"Could not check references of {len(names)} generated images ({e}); kept")
+        return set(names)
+    return still_used
+
+
+@receiver(pre_save, sender=Video, dispatch_uid='videos.claim_streamed_upload')
+def claim_streamed_upload(sender, instance, **kwargs):
+    """Point a Video at the object its streamed upload already wrote, instead of saving the file again."""
+    video_file = instance.video_file
+    upload = getattr(video_file, '_file', None)
+    if not isinstance(upload, StreamedUpload) or video_file._committed or not upload.storage_key:
+        return
+    instance.storage_reference_id = upload.storage_key
+    instance.storage_url = upload.storage_url
+    instance.storage_status = 'stored'
+    instance.file_size = upload.size
+    instance.checksum_sha256 = upload.checksum_sha256
+    instance.video_file = None
+    upload.claimed = True
+    logger.info(f"Video '{instance.title}' claimed streamed upload {upload.storage_key}")
+
+
+@receiver(post_delete, sender=Video, dispatch_uid='videos.collect_storage_objects')
+def collect_video_storage_objects(sender, instance, **kwargs):
+    """Queue the video object, its HLS preview, uploaded file, thumbnails and scrub sprite of a deleted Video for removal."""
+    batch = _pending_deletion()
+    immediate = batch is None
+    if immediate:
+        batch = PendingDeletion()
+
+    backend = get_storage_backend()
+    if instance.storage_reference_id and backend is not None and backend.bucket_name:
+        batch.s3_keys[backend.bucket_name].add(instance.storage_reference_id)
+    if instance.preview_manifest_key and backend is not None and backend.bucket_name:
+        batch.s3_prefixes[backend.bucket_name].add(manifest_prefix(instance.preview_manifest_key))
+
+    _add_field_file(batch, instance.video_file)
+    if not is_generated(instance.thumbnail.name):
+        _add_field_file(batch, instance.thumbnail)
+    _add_generated_images(batch, instance)
+
+    if immediate:
+        batch.flush()
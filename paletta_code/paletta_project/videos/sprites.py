@@ -0,0 +1,161 @@
+"""
+Hover-scrub sprite sheets for clip store cards.
+
+SCRUB_SPRITE_FRAMES frames taken at fixed intervals across a video
+(media.extract_frames) are tiled, SCRUB_SPRITE_COLUMNS per row, into one
+JPEG, so a card scrubs through the whole clip with a single image request.
+Each sheet is stored in MediaStorage with its indexes:
+
+    sprites/<hh>/<digest>/sprite.jpg
+    sprites/<hh>/<digest>/index.json   layout and per-frame times and offsets
+    sprites/<hh>/<digest>/index.vtt    WebVTT thumbnails track (sprite.jpg#xywh=...)
+
+The digest covers the image and the layout, so an unchanged sheet is never
+stored twice; the indexes refer to the image by relative name. As with
+generated thumbnails, sheets may be shared by copied videos and are only
+deleted once no video refers to them (see signals.py).
+
+Video.scrub_sprite records the names and the layout the cards need.
+"""
+
+import json
+import hashlib
+import logging
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+SPRITE_PREFIX = 'sprites/'
+IMAGE_NAME = 'sprite.jpg'
+DEFAULT_FRAMES = 30
+DEFAULT_COLUMNS = 10
+DEFAULT_TILE_WIDTH = 160
+DEFAULT_JPEG_QUALITY = 70
+
+# Stored file -> key in Video.scrub_sprite
+FILES = {'image': IMAGE_NAME, 'index': 'index.json', 'vtt': 'index.vtt'}
+
+
+def frame_count():
+    return getattr(settings, 'SCRUB_SPRITE_FRAMES', DEFAULT_FRAMES)
+
+
+def tile_size(width, height):
+    """Tile (width, height) for a width x height video: SCRUB_SPRITE_TILE_WIDTH wide, even height."""
+    tile_width = getattr(settings, 'SCRUB_SPRITE_TILE_WIDTH', DEFAULT_TILE_WIDTH)
+    tile_height = max(2, int(round(tile_width * height / width / 2)) * 2)
+    return tile_width, tile_height
+
+
+def frame_times(duration, count):
+    """count times at fixed intervals, each in the middle of its share of the video."""
+    interval = duration / count
+    return [round(interval * (index + 0.5), 3) for index in range(count)]
+
+
+def build_sheet(frames, tile, columns):
+    """Tile frames (image bytes, None for frames that could not be read) into one RGB image."""
+    tile_width, tile_height = tile
+    rows = -(-len(frames) // columns)
+    sheet = Image.new('RGB', (tile_width * columns, tile_height * rows))
+    previous = None
+    for index, frame in enumerate(frames):
+        if frame is None:
+            frame = previous  # repeat the last good frame rather than leave a black tile
+        if frame is None:
+            continue
+        with Image.open(BytesIO(frame)) as image:
+            image = image.convert('RGB').resize(tile, Image.LANCZOS)
+        sheet.paste(image, ((index % columns) * tile_width, (index // columns) * tile_height))
+        previous = frame
+    return sheet
+
+
+def _timestamp(seconds):
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{seconds:06.3f}"
+
+
+def build_indexes(times, duration, tile, columns):
+    """(index.json dict, index.vtt text) for frames at times, tiled columns per row."""
+    tile_width, tile_height = tile
+    frames = []
+    cues = ['WEBVTT', '']
+    for index, start in enumerate(times):
+        x, y = (index % columns) * tile_width, (index // columns) * tile_height
+        end = times[index + 1] if index + 1 < len(times) else duration
+        cue_start = 0 if index == 0 else start
+        frames.append({'time': start, 'x': x, 'y': y})
+        cues += [f"{_timestamp(cue_start)} --> {_timestamp(end)}", f"{IMAGE_NAME}#xywh={x},{y},{tile_width},{tile_height}", '']
+    index = {
+        'image': IMAGE_NAME,
+        'width': tile_width,
+        'height': tile_height,
+        'columns': columns,
+        'count': len(times),
+        'interval': round(duration / len(times), 3) if times else 0,
+        'frames': frames,
+    }
+    return index, '\n'.join(cues)
+
+
+def render(frames, times, duration, tile, columns=None):
+    """
+    Encode a sprite sheet and its indexes.
+    Returns ({'image', 'index', 'vtt'}: bytes, layout dict for Video.scrub_sprite).
+    """
+    columns = min(columns or getattr(settings, 'SCRUB_SPRITE_COLUMNS', DEFAULT_COLUMNS), len(frames))
+    buffer = BytesIO()
+    build_sheet(frames, tile, columns).save(
+        buffer, 'JPEG', quality=getattr(settings, 'SCRUB_SPRITE_JPEG_QUALITY', DEFAULT_JPEG_QUALITY),
+        optimize=True, progressive=True,
+    )
+    index, vtt = build_indexes(times, duration, tile, columns)
+    files = {
+        'image': buffer.getvalue(),
+        'index': json.dumps(index, separators=(',', ':')).encode('utf-8'),
+        'vtt': vtt.encode('utf-8'),
+    }
+    layout = {key: index[key] for key in ('width', 'height', 'columns', 'count', 'interval')}
+    return files, layout
+
+
+def store(files, layout, storage):
+    """
+    Save a rendered sheet under its content-derived directory (skipping files that exist).
+    Returns the Video.scrub_sprite mapping: layout plus the stored names.
+    """
+    digest = hashlib.sha256(files['image'] + files['index']).hexdigest()
+    directory = f"{SPRITE_PREFIX}{digest[:2]}/{digest}/"
+    sprite = dict(layout)
+    for key, name in FILES.items():
+        name = directory + name
+        if not storage.exists(name):
+            saved = storage.save(name, ContentFile(files[key]))
+            if saved != name:
+                logger.warning(f"Sprite file {name} was stored as {saved}")
+                name = saved
+        sprite[key] = name
+    return sprite
+
+
+def sprite_names(sprite):
+    """Every stored file name in a Video.scrub_sprite mapping."""
+    return [sprite[key] for key in FILES if (sprite or {}).get(key)]
+
+
+def sprite_urls(sprite, storage, build_uri=None):
+    """Video.scrub_sprite with file names replaced by URLs (absolute when build_uri is given)."""
+    if not sprite:
+        return {}
+    urls = dict(sprite)
+    for key in FILES:
+        if sprite.get(key):
+            url = storage.url(sprite[key])
+            urls[key] = build_uri(url) if build_uri else url
+    return urls
@@ -0,0 +1,572 @@
+"""
+Storage backends behind AWSCloudStorageService.
+
+VIDEO_STORAGE_BACKEND selects where video objects live:
+  's3'    - the configured S3 bucket (production)
+  'local' - a directory on local disk (LOCAL_STORAGE_ROOT), for development
+            and on-prem installs without S3
+
+Both backends expose an S3-shaped client (the subset of the boto3 API the
+services use: objects, batch deletes, listings and multipart uploads) plus
+URL signing, so the service code is the same for either. Local URLs carry a
+signed token and are served by LocalStorageObjectView, which streams with
+HTTP Range support and accepts presigned part uploads.
+"""
+
+import os
+import json
+import time
+import uuid
+import base64
+import shutil
+import hashlib
+import logging
+import mimetypes
+import threading
+from datetime import datetime, timezone as dt_timezone
+
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+
+from paletta_core.s3_client import get_s3_client, s3_is_healthy
+from paletta_core.presign import get_presign_engine
+
+logger = logging.getLogger(__name__)
+
+COPY_CHUNK = 8 * 1024 * 1024
+TOKEN_SALT = 'paletta.videos.local-storage'
+UPLOADS_DIR = '.uploads'  # S3 bucket names cannot start with '.', so this never collides
+META_DIR = '.meta'
+
+
+def _client_error(code, message, operation, status=400):
+    return ClientError(
+        {'Error': {'Code': code, 'Message': message}, 'ResponseMetadata': {'HTTPStatusCode': status}},
+        operation,
+    )
+
+
+# ----------------------------------------------------------------------
+# Signed tokens for local URLs
+# ----------------------------------------------------------------------
+
+def make_storage_token(bucket, key, expires_in, method='GET', params=None):
+    """Signed, expiring token granting one method on one object (and optional request params)."""
+    payload = {'b': bucket, 'k': key, 'm': method, 'x': int(time.time()) + int(expires_in)}
+    if params:
+        payload['p'] = params
+    return signing.dumps(payload, salt=TOKEN_SALT, compress=True)
+
+
+def read_storage_token(token):
+    """
+    Decode a storage token.
+    Raises signing.BadSignature if it was tampered with and signing.SignatureExpired once expired.
+    """
+    payload = signing.loads(token, salt=TOKEN_SALT)
+    if payload['x'] < time.time():
+        raise signing.SignatureExpired('Storage token expired')
+    return {
+        'bucket': payload['b'],
+        'key': payload['k'],
+        'method': payload['m'],
+        'params': payload.get('p') or {},
+        'expires_at': payload['x'],
+    }
+
+
+# ----------------------------------------------------------------------
+# Local disk client
+# ----------------------------------------------------------------------
+
+class _BoundedReader:
+    """Reads at most length bytes from an open file (an UploadPartCopy source range)."""
+
+    def __init__(self, handle, length):
+        self._handle = handle
+        self._remaining = length
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._handle.read(size)
+        self._remaining -= len(data)
+        return data
+
+
+class LocalObjectClient:
+    """
+    S3-shaped client over a directory tree.
+
+    Objects live at <root>/<bucket>/<key>; their metadata (content type, ETag,
+    checksum) is kept in <root>/.meta/<bucket>/<key>.json. Multipart uploads
+    stage parts under <root>/.uploads/<upload_id>/ and are concatenated on
+    completion with os.sendfile, so parts are never read into memory.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self._lock = threading.Lock()
+
+    # -- paths ---------------------------------------------------------
+
+    def _bucket_dir(self, bucket):
+        return os.path.join(self.root, bucket)
+
+    def _object_path(self, bucket, key, operation='GetObject'):
+        bucket_dir = self._bucket_dir(bucket)
+        path = os.path.abspath(os.path.join(bucket_dir, key))
+        if not path.startswith(bucket_dir + os.sep):
+            raise _client_error('InvalidArgument', f'Invalid key: {key}', operation)
+        return path
+
+    def _meta_path(self, bucket, key):
+        return os.path.join(self.root, META_DIR, bucket, key) + '.json'
+
+    def _upload_dir(self, upload_id):
+        if not upload_id or not all(c in '0123456789abcdef' for c in upload_id):
+            raise _client_error('NoSuchUpload', 'The specified upload does not exist.', 'UploadPart', status=404)
+        return os.path.join(self.root, UPLOADS_DIR, upload_id)
+
+    @staticmethod
+    def _write_json(path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+        with open(tmp, 'w') as handle:
+            json.dump(data, handle)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _read_json(path):
+        try:
+            with open(path) as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return {}
+
+    def _upload_manifest(self, upload_id, operation):
+        manifest = self._read_json(os.path.join(self._upload_dir(upload_id), 'upload.json'))
+        if not manifest:
+            raise _client_error('NoSuchUpload', 'The specified upload does not exist.', operation, status=404)
+        return manifest
+
+    # -- body handling -------------------------------------------------
+
+    @staticmethod
+    def _write_body(body, path, content_length=None):
+        """Stream a request body into path; returns (size, md5 hex, base64 sha256)."""
+        md5 = hashlib.md5()
+        sha256 = hashlib.sha256()
+        size = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as out:
+            if isinstance(body, (bytes, bytearray, memoryview)):
+                chunks = [memoryview(body)]
+            elif isinstance(body, str):
+                chunks = [body.encode('utf-8')]
+            else:
+                chunks = iter(lambda: body.read(COPY_CHUNK), b'')
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                md5.update(chunk)
+                sha256.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        if content_length is not None and int(content_length) != size:
+            os.remove(path)
+            raise _client_error('IncompleteBody', 'Body shorter than Content-Length', 'PutObject')
+        return size, md5.hexdigest(), base64.b64encode(sha256.digest()).decode('ascii')
+
+    @staticmethod
+    def _concatenate(dest, sources):
+        """Join part files into dest, zero-copy where the OS supports it."""
+        with open(dest, 'wb') as out:
+            for source in sources:
+                with open(source, 'rb') as part:
+                    size = os.fstat(part.fileno()).st_size
+                    if hasattr(os, 'sendfile'):
+                        offset = 0
+                        while offset < size:
+                            sent = os.sendfile(out.fileno(), part.fileno(), offset, size - offset)
+                            if not sent:
+                                break
+                            offset += sent
+                        out.seek(0, os.SEEK_END)
+                    else:
+                        shutil.copyfileobj(part, out, COPY_CHUNK)
+
+    # -- buckets and objects -------------------------------------------
+
+    def head_bucket(self, Bucket):
+        os.makedirs(self._bucket_dir(Bucket), exist_ok=True)
+        return {'ResponseMetadata': {'HTTPStatusCode': 200}}
+
+    def put_object(self, Bucket, Key, Body=b'', ContentType=None, ContentLength=None, **kwargs):
+        path = self._object_path(Bucket, Key, 'PutObject')
+        tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+        size, md5_hex, checksum = self._write_body(Body, tmp, ContentLength)
+        os.replace(tmp, path)
+        self._write_json(self._meta_path(Bucket, Key), {
+            'content_type': ContentType or mimetypes.guess_type(Key)[0] or 'binary/octet-stream',
+            'etag': f'"{md5_hex}"',
+            'checksum_sha256': checksum,
+        })
+        return {'ETag': f'"{md5_hex}"'}
+
+    def head_object(self, Bucket, Key, **kwargs):
+        path = self._object_path(Bucket, Key, 'HeadObject')
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            raise _client_error('404', 'Not Found', 'HeadObject', status=404)
+        meta = self._read_json(self._meta_path(Bucket, Key))
+        response = {
+            'ContentLength': stat.st_size,
+            'ContentType': meta.get('content_type') or mimetypes.guess_type(Key)[0] or 'binary/octet-stream',
+            'ETag': meta.get('etag') or f'"{int(stat.st_mtime)}-{stat.st_size}"',
+            'LastModified': datetime.fromtimestamp(stat.st_mtime, dt_timezone.utc),
+        }
+        if kwargs.get('ChecksumMode') == 'ENABLED' and meta.get('checksum_sha256'):
+            response['ChecksumSHA256'] = meta['checksum_sha256']
+        return response
+
+    def get_object(self, Bucket, Key, Range=None, **kwargs):
+        head = self.head_object(Bucket, Key)
+        handle = open(self._object_path(Bucket, Key), 'rb')
+        length = head['ContentLength']
+        if Range:
+            first, _, last = Range.replace('bytes=', '').partition('-')
+            if first:
+                start, end = int(first), min(int(last), length - 1) if last else length - 1
+            else:
+                start, end = max(length - int(last), 0), length - 1
+            handle.seek(start)
+            length = end - start + 1
+        return {**head, 'Body': handle, 'ContentLength': length}
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        for path in (self._object_path(Bucket, Key, 'DeleteObject'), self._meta_path(Bucket, Key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        return {}
+
+    def delete_objects(self, Bucket, Delete, **kwargs):
+        deleted, errors = [], []
+        for item in Delete.get('Objects', []):
+            try:
+                self.delete_object(Bucket, item['Key'])
+                deleted.append({'Key': item['Key']})
+            except (ClientError, OSError) as e:
+                errors.append({'Key': item['Key'], 'Code': 'InternalError', 'Message': str(e)})
+        response = {'Errors': errors} if errors else {}
+        if not Delete.get('Quiet'):
+            response['Deleted'] = deleted
+        return response
+
+    def copy_object(self, Bucket, Key, CopySource, **kwargs):
+        source = self._object_path(CopySource['Bucket'], CopySource['Key'], 'CopyObject')
+        if not os.path.exists(source):
+            raise _client_error('NoSuchKey', 'The specified key does not exist.', 'CopyObject', status=404)
+        dest = self._object_path(Bucket, Key, 'CopyObject')
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shutil.copyfile(source, dest)
+        meta = self._read_json(self._meta_path(CopySource['Bucket'], CopySource['Key']))
+        if kwargs.get('ContentType'):
+            meta['content_type'] = kwargs['ContentType']
+        self._write_json(self._meta_path(Bucket, Key), meta)
+        return {'CopyObjectResult': {'ETag': meta.get('etag', ''), 'LastModified': datetime.now(dt_timezone.utc)}}
+
+    def list_objects_v2(self, Bucket, Prefix='', ContinuationToken=None, StartAfter=None, MaxKeys=1000, **kwargs):
+        bucket_dir = self._bucket_dir(Bucket)
+        keys = []
+        for directory, _, files in os.walk(bucket_dir):
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                key = os.path.relpath(os.path.join(directory, name), bucket_dir).replace(os.sep, '/')
+                if key.startswith(Prefix):
+                    keys.append(key)
+        keys.sort()
+        after = ContinuationToken or StartAfter
+        if after:
+            keys = [key for key in keys if key > after]
+        page, rest = keys[:MaxKeys], keys[MaxKeys:]
+        contents = []
+        for key in page:
+            stat = os.stat(os.path.join(bucket_dir, key))
+            contents.append({
+                'Key': key,
+                'Size': stat.st_size,
+                'LastModified': datetime.fromtimestamp(stat.st_mtime, dt_timezone.utc),
+            })
+        response = {'KeyCount': len(page), 'IsTruncated': bool(rest), 'Contents': contents}
+        if rest:
+            response['NextContinuationToken'] = page[-1]
+        return response
+
+    def get_paginator(self, operation_name):
+        if operation_name != 'list_objects_v2':
+            raise NotImplementedError(f"LocalObjectClient has no paginator for {operation_name}")
+        client = self
+
+        class _Paginator:
+            def paginate(self, **kwargs):
+                page_size = kwargs.pop('PaginationConfig', {}).get('PageSize', 1000)
+                token = None
+                while True:
+                    response = client.list_objects_v2(MaxKeys=page_size, ContinuationToken=token, **kwargs)
+                    yield response
+                    if not response.get('IsTruncated'):
+                        return
+                    token = response['NextContinuationToken']
+
+        return _Paginator()
+
+    # -- multipart uploads ---------------------------------------------
+
+    def create_multipart_upload(self, Bucket, Key, ContentType=None, ChecksumAlgorithm=None, **kwargs):
+        self._object_path(Bucket, Key, 'CreateMultipartUpload')
+        upload_id = uuid.uuid4().hex
+        self._write_json(os.path.join(self._upload_dir(upload_id), 'upload.json'), {
+            'bucket': Bucket,
+            'key': Key,
+            'content_type': ContentType or mimetypes.guess_type(Key)[0] or 'binary/octet-stream',
+            'checksum_algorithm': ChecksumAlgorithm or '',
+            'initiated': time.time(),
+        })
+        return {'Bucket': Bucket, 'Key': Key, 'UploadId': upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body=b'', ContentLength=None, ChecksumSHA256=None, **kwargs):
+        manifest = self._upload_manifest(UploadId, 'UploadPart')
+        if (manifest['bucket'], manifest['key']) != (Bucket, Key):
+            raise _client_error('NoSuchUpload', 'The specified upload does not exist.', 'UploadPart', status=404)
+        part_number = int(PartNumber)
+        if not 1 <= part_number <= 10000:
+            raise _client_error('InvalidArgument', 'Part number must be an integer between 1 and 10000', 'UploadPart')
+
+        upload_dir = self._upload_dir(UploadId)
+        tmp = os.path.join(upload_dir, f'{part_number:05d}.{uuid.uuid4().hex}.tmp')
+        size, md5_hex, checksum = self._write_body(Body, tmp, ContentLength)
+        if ChecksumSHA256 and ChecksumSHA256 != checksum:
+            os.remove(tmp)
+            raise _client_error('BadDigest', 'The SHA256 you specified did not match the calculated checksum.', 'UploadPart')
+        os.replace(tmp, os.path.join(upload_dir, f'{part_number:05d}'))
+        self._write_json(os.path.join(upload_dir, f'{part_number:05d}.json'), {
+            'etag': f'"{md5_hex}"', 'size': size, 'checksum_sha256': checksum,
+        })
+        response = {'ETag': f'"{md5_hex}"'}
+        if manifest.get('checksum_algorithm') == 'SHA256':
+            response['ChecksumSHA256'] = checksum
+        return response
+
+    def upload_part_copy(self, Bucket, Key, UploadId, PartNumber, CopySource, CopySourceRange=None, **kwargs):
+        manifest = self._upload_manifest(UploadId, 'UploadPartCopy')
+        if (manifest['bucket'], manifest['key']) != (Bucket, Key):
+            raise _client_error('NoSuchUpload', 'The specified upload does not exist.', 'UploadPartCopy', status=404)
+        source = self._object_path(CopySource['Bucket'], CopySource['Key'], 'UploadPartCopy')
+        try:
+            source_size = os.path.getsize(source)
+        except FileNotFoundError:
+            raise _client_error('NoSuchKey', 'The specified key does not exist.', 'UploadPartCopy', status=404)
+        start, end = 0, source_size - 1
+        if CopySourceRange:
+            start, end = (int(value) for value in CopySourceRange.replace('bytes=', '').split('-'))
+        if start < 0 or end >= source_size or start > end:
+            raise _client_error('InvalidArgument', 'The x-amz-copy-source-range value must be within the source object', 'UploadPartCopy')
+
+        part_number = int(PartNumber)
+        upload_dir = self._upload_dir(UploadId)
+        tmp = os.path.join(upload_dir, f'{part_number:05d}.{uuid.uuid4().hex}.tmp')
+        with open(source, 'rb') as handle:
+            handle.seek(start)
+            size, md5_hex, checksum = self._write_body(_BoundedReader(handle, end - start + 1), tmp, end - start + 1)
+        os.replace(tmp, os.path.join(upload_dir, f'{part_number:05d}'))
+        self._write_json(os.path.join(upload_dir, f'{part_number:05d}.json'), {
+            'etag': f'"{md5_hex}"', 'size': size, 'checksum_sha256': checksum,
+        })
+        result = {'ETag': f'"{md5_hex}"', 'LastModified': datetime.now(dt_timezone.utc)}
+        if manifest.get('checksum_algorithm') == 'SHA256':
+            result['ChecksumSHA256'] = checksum
+        return {'CopyPartResult': result}
+
+    def _stored_parts(self, upload_id):
+        upload_dir = self._upload_dir(upload_id)
+        parts = {}
+        for name in os.listdir(upload_dir):
+            if name.endswith('.json') and name[:5].isdigit():
+                parts[int(name[:5])] = self._read_json(os.path.join(upload_dir, name))
+        return parts
+
+    def list_parts(self, Bucket, Key, UploadId, MaxParts=1000, PartNumberMarker=0, **kwargs):
+        self._upload_manifest(UploadId, 'ListParts')
+        parts = self._stored_parts(UploadId)
+        numbers = sorted(number for number in parts if number > int(PartNumberMarker))
+        page, rest = numbers[:MaxParts], numbers[MaxParts:]
+        response = {
+            'Parts': [
+                {'PartNumber': number, 'ETag': parts[number]['etag'], 'Size': parts[number]['size'],
+                 'ChecksumSHA256': parts[number].get('checksum_sha256')}
+                for number in page
+            ],
+            'IsTruncated': bool(rest),
+        }
+        if rest:
+            response['NextPartNumberMarker'] = page[-1]
+        return response
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload, **kwargs):
+        manifest = self._upload_manifest(UploadId, 'CompleteMultipartUpload')
+        stored = self._stored_parts(UploadId)
+        requested = MultipartUpload.get('Parts', [])
+        numbers = [part['PartNumber'] for part in requested]
+        if not requested or numbers != sorted(numbers):
+            raise _client_error('InvalidPartOrder', 'The list of parts was not in ascending order.', 'CompleteMultipartUpload')
+        for part in requested:
+            confirmed = stored.get(part['PartNumber'])
+            if not confirmed or confirmed['etag'] != part['ETag']:
+                raise _client_error('InvalidPart', 'One or more of the specified parts could not be found.', 'CompleteMultipartUpload')
+
+        upload_dir = self._upload_dir(UploadId)
+        dest = self._object_path(Bucket, Key, 'CompleteMultipartUpload')
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f'{dest}.{UploadId}.tmp'
+        self._concatenate(tmp, [os.path.join(upload_dir, f'{number:05d}') for number in numbers])
+        os.replace(tmp, dest)
+
+        md5s = b''.join(bytes.fromhex(stored[number]['etag'].strip('"')) for number in numbers)
+        etag = f'"{hashlib.md5(md5s).hexdigest()}-{len(numbers)}"'
+        checksum = ''
+        if manifest.get('checksum_algorithm') == 'SHA256':
+            digests = b''.join(base64.b64decode(stored[number]['checksum_sha256']) for number in numbers)
+            checksum = f"{base64.b64encode(hashlib.sha256(digests).digest()).decode('ascii')}-{len(numbers)}"
+        self._write_json(self._meta_path(Bucket, Key), {
+            'content_type': manifest.get('content_type'),
+            'etag': etag,
+            'checksum_sha256': checksum,
+        })
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+        response = {'Location': Key, 'Bucket': Bucket, 'Key': Key, 'ETag': etag}
+        if checksum:
+            response['ChecksumSHA256'] = checksum
+        return response
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId, **kwargs):
+        self._upload_manifest(UploadId, 'AbortMultipartUpload')
+        shutil.rmtree(self._upload_dir(UploadId), ignore_errors=True)
+        return {}
+
+    def list_multipart_uploads(self, Bucket, KeyMarker='', UploadIdMarker='', MaxUploads=1000, **kwargs):
+        uploads_root = os.path.join(self.root, UPLOADS_DIR)
+        uploads = []
+        if os.path.isdir(uploads_root):
+            for upload_id in os.listdir(uploads_root):
+                manifest = self._read_json(os.path.join(uploads_root, upload_id, 'upload.json'))
+                if manifest.get('bucket') == Bucket:
+                    uploads.append((manifest['key'], upload_id, manifest['initiated']))
+        uploads.sort()
+        if KeyMarker:
+            uploads = [u for u in uploads if (u[0], u[1]) > (KeyMarker, UploadIdMarker or '')]
+        page, rest = uploads[:MaxUploads], uploads[MaxUploads:]
+        response = {
+            'Uploads': [
+                {'Key': key, 'UploadId': upload_id, 'Initiated': datetime.fromtimestamp(initiated, dt_timezone.utc)}
+                for key, upload_id, initiated in page
+            ],
+            'IsTruncated': bool(rest),
+        }
+        if rest:
+            response['NextKeyMarker'] = page[-1][0]
+            response['NextUploadIdMarker'] = page[-1][1]
+        return response
+
+
+# ----------------------------------------------------------------------
+# Backends
+# ----------------------------------------------------------------------
+
+class S3StorageBackend:
+    """Video objects in the configured S3 bucket, served through presigned URLs."""
+
+    name = 's3'
+
+    def __init__(self):
+        self.bucket_name = getattr(settings, 'AWS_STORAGE_BUCKET_NAME', None)
+
+    @property
+    def client(self):
+        return get_s3_client()
+
+    def is_available(self):
+        if not (getattr(settings, 'AWS_ACCESS_KEY_ID', None)
+                and getattr(settings, 'AWS_SECRET_ACCESS_KEY', None) and self.bucket_name):
+            logger.warning("AWS storage is enabled but AWS credentials are missing")
+            return False
+        return s3_is_healthy(self.bucket_name)
+
+    def presign_url(self, bucket, key, expiry, method='GET', params=None):
+        return get_presign_engine().presign(bucket, key, expires_in=expiry, method=method, params=params)
+
+
+class LocalStorageBackend:
+    """
+    Video objects on local disk under LOCAL_STORAGE_ROOT.
+    URLs point at LocalStorageObjectView with a signed, expiring token.
+    """
+
+    name = 'local'
+
+    def __init__(self, root=None):
+        self.root = str(root or getattr(settings, 'LOCAL_STORAGE_ROOT', None)
+                        or os.path.join(settings.MEDIA_ROOT, 'storage'))
+        self.bucket_name = getattr(settings, 'AWS_STORAGE_BUCKET_NAME', None) or 'videos'
+        self.client = LocalObjectClient(self.root)
+
+    def is_available(self):
+        try:
+            self.client.head_bucket(Bucket=self.bucket_name)
+        except OSError as e:
+            logger.error(f"Local storage root {self.root} is not usable: {e}")
+            return False
+        return os.access(self.root, os.W_OK)
+
+    def presign_url(self, bucket, key, expiry, method='GET', params=None):
+        token = make_storage_token(bucket, key, expiry, method=method, params=params)
+        return reverse('local_storage_object', args=[token])
+
+    def object_path(self, bucket, key):
+        """Filesystem path of an object (for streaming with sendfile)."""
+        return self.client._object_path(bucket, key)
+
+
+BACKENDS = {
+    's3': S3StorageBackend,
+    'local': LocalStorageBackend,
+}
+
+_backends = {}
+
+
+def get_storage_backend():
+    """
+    The configured storage backend, or None when video storage is disabled.
+    VIDEO_STORAGE_BACKEND defaults to 's3' when AWS_STORAGE_ENABLED is set.
+    """
+    name = getattr(settings, 'VIDEO_STORAGE_BACKEND', None)
+    if name is None and getattr(settings, 'AWS_STORAGE_ENABLED', False):
+        name = 's3'
+    if not name:
+        return None
+    backend = _backends.get(name)
+    if backend is None:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown VIDEO_STORAGE_BACKEND '{name}' (expected one of {', '.join(BACKENDS)})")
+        backend = _backends[name] = BACKENDS[name]()
+    return backend
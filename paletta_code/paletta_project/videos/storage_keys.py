@@ -0,0 +1,85 @@
+"""
+Canonical storage keys for video objects.
+
+    library_<library id>/<hh>/<digest><.ext>
+
+- library_<id>/ groups a library's objects, so lifecycle rules, signed-cookie
+  grants (see delivery.py) and per-library reports work on one prefix
+- <hh> is the first two hex characters of the digest: 256 evenly filled
+  prefixes per library, so S3's per-prefix request rates scale out
+- <digest> is 32 hex characters issued by the server when the upload starts
+
+Keys are always generated here (or by the presign Lambda, which mirrors this
+layout); client-supplied keys are not accepted. The digest is random rather
+than a hash of the content: the key has to exist before the first byte is
+uploaded, and content-derived keys would let two videos share one object,
+which deleting either video would remove. Content integrity is tracked
+separately in Video.checksum_sha256.
+
+HLS previews of a video live next to it, under the key without its extension:
+
+    library_<id>/<hh>/<digest>/hls/master.m3u8, .../hls/360p/index.m3u8, ...
+
+Older objects (videos/<uuid>.<ext> from the Lambda, client-chosen keys,
+library_<id>/<uuid>.<ext> from relocations) are moved to this layout by
+`manage.py migrate_storage_keys`.
+"""
+
+import os
+import re
+import uuid
+
+from .delivery import library_prefix
+
+DIGEST_LENGTH = 32
+PREFIX_LENGTH = 2
+
+_EXTENSION = re.compile(r'^\.[a-z0-9]{1,10}$')
+CANONICAL_KEY = re.compile(r'^library_(?P<library_id>\d+)/(?P<prefix>[0-9a-f]{2})/(?P<digest>[0-9a-f]{32})(?:\.[a-z0-9]{1,10})?$')
+
+# CANONICAL_KEY as a database regex (for __regex lookups on PostgreSQL and SQLite)
+CANONICAL_KEY_SQL = r'^library_[0-9]+/[0-9a-f]{2}/[0-9a-f]{32}(\.[a-z0-9]{1,10})?$'
+
+
+def new_digest():
+    return uuid.uuid4().hex
+
+
+def key_extension(name):
+    """Lower-cased extension of a file name or key ('.mp4'), or '' if it has none or an unusable one."""
+    _, extension = os.path.splitext(name or '')
+    extension = extension.lower()
+    return extension if _EXTENSION.match(extension) else ''
+
+
+def canonical_key(library_id, name='', digest=None):
+    """A new canonical key in library_id for a file called name (only its extension is kept)."""
+    digest = digest or new_digest()
+    return f"{library_prefix(library_id)}{digest[:PREFIX_LENGTH]}/{digest}{key_extension(name)}"
+
+
+def parse_key(key):
+    """The canonical key's match (library_id, prefix, digest groups), or None for other layouts."""
+    return CANONICAL_KEY.match(key or '')
+
+
+def is_canonical(key, library_id=None):
+    """True if key follows the canonical layout (under library_id, when given)."""
+    match = parse_key(key)
+    if match is None or match.group('prefix') != match.group('digest')[:PREFIX_LENGTH]:
+        return False
+    return library_id is None or match.group('library_id') == str(library_id)
+
+
+PREVIEW_DIRECTORY = 'hls/'
+
+
+def preview_prefix(key):
+    """Prefix of the HLS preview objects stored alongside the object at key."""
+    root, _ = os.path.splitext(key)
+    return f"{root}/{PREVIEW_DIRECTORY}"
+
+
+def is_preview_prefix(prefix):
+    """True for prefixes made by preview_prefix (guards prefix-wide deletes)."""
+    return bool(prefix) and prefix.endswith('/' + PREVIEW_DIRECTORY) and len(prefix) > len(PREVIEW_DIRECTORY) + 1
@@ -1,11 +1,13 @@
 from celery import shared_task
-from django.core.mail import send_mail
+from paletta_core.resilience import send_mail
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from django.utils import timezone
 
 from .models import Video
-from .services import AWSCloudStorageService, VideoLogService
+from .services import (
+    AWSCloudStorageService, VideoLogService, StorageKeyMigrationService, VideoProcessingService, VideoRelocationService,
+)
 
 import logging
 
@@ -133,3 +135,277 @@ def retry_failed_uploads():
         
     except Exception as e:
         logger.error(f"Error retrying failed uploads: {str(e)}")
+
+
+@shared_task
+def reap_stale_multipart_uploads(older_than_hours=None):
+    """
+    BACKEND-READY: Celery task for aborting abandoned multipart uploads.
+    MAPPED TO: Scheduled task (cron/periodic)
+    USED BY: Celery beat scheduler for storage cost control
+    
+    Aborts incomplete S3 multipart uploads older than S3_MULTIPART_REAP_AFTER_HOURS
+    that have no live UploadSession or in-flight Video, and reports reclaimed bytes.
+    Required fields: None (operates on the whole bucket)
+    """
+    try:
+        stats = AWSCloudStorageService().reap_stale_multipart_uploads(older_than_hours=older_than_hours)
+        return stats
+    except Exception as e:
+        logger.error(f"Error reaping stale multipart uploads: {str(e)}")
+
+
+@shared_task
+def reconcile_storage(prefix=''):
+    """
+    BACKEND-READY: Celery task for reconciling the bucket against Video rows.
+    MAPPED TO: Scheduled task (cron/periodic)
+    USED BY: Celery beat scheduler for storage auditing
+    
+    Streams ListObjectsV2 and a server-side cursor over Videos through a
+    sorted merge and reports orphaned objects and missing objects with bytes.
+    Report only: orphans are not deleted.
+    Required fields: None (operates on the whole bucket)
+    """
+    try:
+        report = AWSCloudStorageService().reconcile_storage(prefix=prefix)
+        if report and (report['orphans'] or report['missing']):
+            logger.warning(
+                f"Storage reconciliation found {report['orphans']} orphaned objects "
+                f"({report['orphan_bytes']} bytes) and {report['missing']} videos with missing objects"
+            )
+        return report
+    except Exception as e:
+        logger.error(f"Error reconciling storage: {str(e)}")
+
+
+@shared_task
+def migrate_storage_keys(library_id=None, limit=None):
+    """
+    BACKEND-READY: Celery task for moving videos onto canonical storage keys.
+    MAPPED TO: Admin-triggered background job (python manage.py migrate_storage_keys --background)
+    USED BY: Storage layout migration (see videos/storage_keys.py)
+    
+    Copies each non-canonical object server-side to library_<id>/<hh>/<digest>,
+    repoints the row and deletes the old object after commit.
+    Required fields: None (optionally one library and a maximum number of videos)
+    """
+    try:
+        return StorageKeyMigrationService().run(library_id=library_id, limit=limit)
+    except Exception as e:
+        logger.error(f"Error migrating storage keys: {str(e)}")
+
+
+@shared_task(bind=True, max_retries=3, acks_late=True)
+def relocate_video(self, video_id, library_id, mode='move', content_type_id=None, user_id=None):
+    """
+    BACKEND-READY: Celery task for moving or copying a large video between libraries.
+    MAPPED TO: VideoRelocateAPIView (202 response) for objects over S3_COPY_MULTIPART_THRESHOLD
+    USED BY: Library owners and administrators reorganising clips
+    
+    Runs VideoRelocationService.relocate, whose parallel UploadPartCopy of a
+    multi-GB object would outlast the HTTP request. Storage errors are retried
+    with backoff (a failed copy is aborted, and a move only switches keys once
+    the copy is complete); invalid requests are logged and dropped.
+    Required fields: video_id (int), library_id (int)
+    """
+    from django.contrib.auth import get_user_model
+    from libraries.models import Library
+    
+    video = Video.objects.select_related('library', 'content_type').filter(pk=video_id).first()
+    library = Library.objects.filter(pk=library_id).first()
+    if video is None or library is None:
+        logger.warning(f"Cannot relocate video ID {video_id} to library {library_id}: not found")
+        return None
+    user = get_user_model().objects.filter(pk=user_id).first() if user_id else None
+    
+    try:
+        target = VideoRelocationService().relocate(video, library, mode=mode, content_type_id=content_type_id, user=user)
+    except ValueError as e:
+        logger.error(f"Not relocating video ID {video_id} to library {library_id}: {str(e)}")
+        return None
+    except Exception as e:
+        logger.warning(f"Relocating video ID {video_id} to library {library_id} failed ({str(e)}); retrying")
+        raise self.retry(exc=e, countdown=60 * 2 ** self.request.retries)
+    return target.id
+
+
+@shared_task(bind=True, max_retries=3, acks_late=True, soft_time_limit=300, time_limit=360)
+def probe_video(self, video_id):
+    """
+    BACKEND-READY: Celery task for reading a video's media metadata.
+    MAPPED TO: 'media' queue (CELERY_TASK_ROUTES); queued by VideoProcessingService.start
+    USED BY: Upload registration (VideoAPIUploadView), probe_videos backfill command
+    
+    Runs ffprobe against the stored object with ranged reads (no download),
+    saves duration/resolution/frame rate/format and moves the video from
+    'processing' to 'stored', then queues generate_thumbnails,
+    generate_scrub_sprite and transcode_preview.
+    Retries with backoff; a video that still cannot be read becomes
+    'processing_failed' (backfilled videos keep their status).
+    Required fields: video_id (int)
+    """
+    video = Video.objects.filter(pk=video_id).first()
+    if video is None or not video.storage_reference_id:
+        logger.warning(f"Video ID {video_id} has no stored object to probe")
+        return None
+    
+    service = VideoProcessingService()
+    try:
+        metadata = service.probe(video)
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            logger.warning(f"Probing video ID {video_id} failed ({str(e)}); retrying")
+            raise self.retry(exc=e, countdown=30 * 2 ** self.request.retries)
+        logger.error(f"Giving up probing video ID {video_id}: {str(e)}")
+        if video.storage_status == 'processing':
+            service.fail(video, str(e))
+        return None
+    
+    generate_thumbnails.delay(video_id)
+    generate_scrub_sprite.delay(video_id)
+    VideoProcessingService.start_preview(video)
+    return metadata
+
+
+@shared_task(bind=True, max_retries=2, acks_late=True, soft_time_limit=300, time_limit=360)
+def generate_thumbnails(self, video_id):
+    """
+    BACKEND-READY: Celery task for server-side thumbnail generation.
+    MAPPED TO: 'media' queue (CELERY_TASK_ROUTES); queued by probe_video
+    USED BY: Upload pipeline, probe_videos --thumbnails backfill
+    
+    Seeks to a representative keyframe of the stored object (ranged reads over
+    a presigned URL), renders every THUMBNAIL_SIZES variant as WebP and JPEG
+    and stores them in MediaStorage under content-hash names.
+    The video's status is not changed when this fails.
+    Required fields: video_id (int)
+    """
+    video = Video.objects.filter(pk=video_id).first()
+    if video is None or not video.storage_reference_id:
+        logger.warning(f"Video ID {video_id} has no stored object to take thumbnails from")
+        return None
+    
+    try:
+        return VideoProcessingService().generate_thumbnails(video)
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            logger.warning(f"Thumbnails for video ID {video_id} failed ({str(e)}); retrying")
+            raise self.retry(exc=e, countdown=60 * 2 ** self.request.retries)
+        logger.error(f"Giving up generating thumbnails for video ID {video_id}: {str(e)}")
+        VideoLogService.log_error(video, None, f"Thumbnail generation failed: {str(e)}")
+        return None
+
+
+@shared_task(bind=True, max_retries=2, acks_late=True, soft_time_limit=600, time_limit=660)
+def generate_scrub_sprite(self, video_id):
+    """
+    BACKEND-READY: Celery task for hover-scrub sprite sheets.
+    MAPPED TO: 'media' queue (CELERY_TASK_ROUTES); queued by probe_video
+    USED BY: Clip store cards (inside_category.html), probe_videos --sprites backfill
+    
+    Grabs SCRUB_SPRITE_FRAMES frames at fixed intervals with parallel seeks
+    over a presigned URL and stores them as one sprite sheet with JSON and
+    WebVTT indexes in MediaStorage. The video's status is not changed when this fails.
+    Required fields: video_id (int)
+    """
+    video = Video.objects.filter(pk=video_id).first()
+    if video is None or not video.storage_reference_id:
+        logger.warning(f"Video ID {video_id} has no stored object to take sprite frames from")
+        return None
+    
+    try:
+        return VideoProcessingService().generate_scrub_sprite(video)
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            logger.warning(f"Scrub sprite for video ID {video_id} failed ({str(e)}); retrying")
+            raise self.retry(exc=e, countdown=60 * 2 ** self.request.retries)
+        logger.error(f"Giving up generating scrub sprite for video ID {video_id}: {str(e)}")
+        VideoLogService.log_error(video, None, f"Scrub sprite generation failed: {str(e)}")
+        return None
+
+
+@shared_task(bind=True, max_retries=2, acks_late=True, soft_time_limit=4 * 3600, time_limit=4 * 3600 + 300)
+def transcode_preview(self, video_id):
+    """
+    BACKEND-READY: Celery task for HLS preview transcoding.
+    MAPPED TO: 'media' queue (CELERY_TASK_ROUTES); queued by probe_video and video copies
+    USED BY: Video detail page and API playback (Video.get_preview_url)
+    
+    Transcodes the stored original, read over a presigned URL, into the
+    HLS_PREVIEW_LADDER renditions with HLS_SEGMENT_SECONDS segments and
+    stores them alongside it. Until it finishes, players use the original.
+    Required fields: video_id (int)
+    """
+    video = Video.objects.filter(pk=video_id, storage_status='stored').first()
+    if video is None or not video.storage_reference_id:
+        logger.warning(f"Video ID {video_id} has no stored object to transcode")
+        return None
+    
+    try:
+        renditions = VideoProcessingService().transcode_preview(video)
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            logger.warning(f"Preview transcoding of video ID {video_id} failed ({str(e)}); retrying")
+            raise self.retry(exc=e, countdown=300 * 2 ** self.request.retries)
+        logger.error(f"Giving up transcoding preview of video ID {video_id}: {str(e)}")
+        VideoLogService.log_error(video, None, f"Preview transcoding failed: {str(e)}")
+        return None
+    return [rendition['name'] for rendition in renditions]
+
+
+@shared_task(bind=True, max_retries=5)
+def delete_storage_objects(self, bucket, keys):
+    """
+    BACKEND-READY: Celery task for batched S3 object deletion.
+    MAPPED TO: videos.signals (post_delete of Video, including library cascades)
+    USED BY: Video deletion, bulk-delete API
+    
+    Deletes up to 1,000 keys per DeleteObjects request with SlowDown backoff.
+    Keys that a remaining Video still references are kept.
+    Required fields: bucket (str), keys (list of str)
+    """
+    storage_service = AWSCloudStorageService()
+    if not storage_service.storage_enabled:
+        logger.warning(f"Deep storage is not enabled; {len(keys)} objects in {bucket} were not deleted")
+        return {'deleted': 0, 'failed': keys}
+    
+    if bucket == storage_service.bucket_name:
+        still_referenced = set(
+            Video.objects.filter(storage_reference_id__in=keys).values_list('storage_reference_id', flat=True)
+        )
+        keys = [key for key in keys if key not in still_referenced]
+    
+    result = storage_service.delete_objects(keys, bucket=bucket)
+    if result['failed'] and not self.request.called_directly:
+        raise self.retry(args=(bucket, result['failed']), countdown=60)
+    return result
+
+
+@shared_task(bind=True, max_retries=5)
+def delete_storage_prefix(self, bucket, prefix):
+    """
+    BACKEND-READY: Celery task for deleting a video's HLS preview objects.
+    MAPPED TO: videos.signals.enqueue_prefix_deletion
+    USED BY: Video deletion, preview regeneration after a key change
+    
+    Lists and deletes every object under an HLS preview prefix, unless a
+    remaining Video's preview_manifest_key still points into it.
+    Required fields: bucket (str), prefix (str)
+    """
+    storage_service = AWSCloudStorageService()
+    if not storage_service.storage_enabled or bucket != storage_service.bucket_name:
+        logger.warning(f"Objects under {prefix} in {bucket} were not deleted")
+        return {'deleted': 0, 'failed': []}
+    
+    if Video.objects.filter(preview_manifest_key__startswith=prefix).exists():
+        logger.info(f"Preview prefix {prefix} is still in use; kept")
+        return {'deleted': 0, 'failed': []}
+    
+    try:
+        result = storage_service.delete_prefix(prefix)
+    except Exception as e:
+        raise self.retry(exc=e, countdown=60)
+    if result['failed'] and not self.request.called_directly:
+        raise self.retry(countdown=60)
+    return result
@@ -44,4 +44,26 @@ def divisibleby(value, arg):
     try:
         return int(value) % int(arg) == 0
     except (ValueError, ZeroDivisionError):
-        return False 
\ No newline at end of file
+        return False 
+@register.filter
+def thumbnail_srcset(video, image_format='jpeg'):
+    """
+    srcset of a video's generated thumbnails in one format ('webp' or 'jpeg')
+    Usage: <source type="image/webp" srcset="{{ video|thumbnail_srcset:'webp' }}">
+    """
+    from videos.thumbnails import srcset
+    variants = getattr(video, 'thumbnail_variants', None)
+    if not variants:
+        return ''
+    return srcset(variants, video.thumbnail.storage, image_format)
+
+@register.filter
+def scrub_sprite_url(video):
+    """
+    URL of a video's hover-scrub sprite sheet, or ''
+    Usage: data-sprite-url="{{ video|scrub_sprite_url }}"
+    """
+    sprite = getattr(video, 'scrub_sprite', None)
+    if not sprite or not sprite.get('image'):
+        return ''
+    return video.thumbnail.storage.url(sprite['image'])
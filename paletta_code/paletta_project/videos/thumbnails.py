@@ -0,0 +1,145 @@
+"""
+Server-generated video thumbnails.
+
+One representative frame is grabbed by ffmpeg (media.extract_frame) and
+rendered by Pillow into every size in THUMBNAIL_SIZES, each as WebP and
+JPEG. Files are stored in MediaStorage under content-hash names:
+
+    thumbnails/generated/<hh>/<sha256 of the image>.<webp|jpg>
+
+so regenerating an unchanged thumbnail writes nothing, and URLs can be cached
+forever. Video.thumbnail_variants records the names:
+
+    {"card": {"width": 320, "height": 180, "webp": "...", "jpeg": "..."}, ...}
+
+A name can be shared (copied videos, identical frames), so deleting a video
+only removes generated files no other video refers to (see signals.py).
+"""
+
+import hashlib
+import logging
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+GENERATED_PREFIX = 'thumbnails/generated/'
+
+# name -> bounding box (width, height); frames keep their aspect ratio within it
+DEFAULT_THUMBNAIL_SIZES = {
+    'card': (320, 180),
+    'detail': (640, 360),
+    'retina': (1280, 720),
+}
+DEFAULT_WEBP_QUALITY = 80
+DEFAULT_JPEG_QUALITY = 82
+
+# Pillow format name and file extension per variant format
+FORMATS = {
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+
+
+def thumbnail_sizes():
+    return getattr(settings, 'THUMBNAIL_SIZES', DEFAULT_THUMBNAIL_SIZES)
+
+
+def frame_box():
+    """The largest size any variant needs; frames are extracted no larger than this."""
+    sizes = thumbnail_sizes().values()
+    return max(width for width, _ in sizes), max(height for _, height in sizes)
+
+
+def is_generated(name):
+    return bool(name) and name.startswith(GENERATED_PREFIX)
+
+
+def content_name(data, extension):
+    """Storage name for an encoded image, derived from its bytes."""
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{GENERATED_PREFIX}{digest[:2]}/{digest}.{extension}"
+
+
+def encode(image, image_format):
+    """Encode a Pillow RGB image as 'webp' or 'jpeg' bytes."""
+    buffer = BytesIO()
+    if image_format == 'webp':
+        image.save(buffer, 'WEBP', quality=getattr(settings, 'THUMBNAIL_WEBP_QUALITY', DEFAULT_WEBP_QUALITY), method=4)
+    else:
+        image.save(
+            buffer, 'JPEG', quality=getattr(settings, 'THUMBNAIL_JPEG_QUALITY', DEFAULT_JPEG_QUALITY),
+            optimize=True, progressive=True,
+        )
+    return buffer.getvalue()
+
+
+def render(frame):
+    """
+    Resize an extracted frame (image bytes) into every thumbnail size and format.
+    Returns {size name: {'width', 'height', 'webp': bytes, 'jpeg': bytes}}.
+    """
+    with Image.open(BytesIO(frame)) as source:
+        source = source.convert('RGB')
+    rendered = {}
+    for size_name, box in thumbnail_sizes().items():
+        image = source.copy()
+        image.thumbnail(box, Image.LANCZOS)  # never upscales
+        rendered[size_name] = {'width': image.width, 'height': image.height}
+        for image_format in FORMATS:
+            rendered[size_name][image_format] = encode(image, image_format)
+    return rendered
+
+
+def store(rendered, storage):
+    """
+    Save rendered variants under content-hash names (skipping files that already exist).
+    Returns the Video.thumbnail_variants mapping.
+    """
+    variants = {}
+    for size_name, variant in rendered.items():
+        variants[size_name] = {'width': variant['width'], 'height': variant['height']}
+        for image_format, (_, extension) in FORMATS.items():
+            name = content_name(variant[image_format], extension)
+            if not storage.exists(name):
+                saved = storage.save(name, ContentFile(variant[image_format]))
+                if saved != name:
+                    logger.warning(f"Thumbnail {name} was stored as {saved}")
+                name = saved
+            variants[size_name][image_format] = name
+    return variants
+
+
+def variant_names(variants):
+    """Every stored file name in a thumbnail_variants mapping."""
+    return [
+        variant[image_format]
+        for variant in (variants or {}).values()
+        for image_format in FORMATS
+        if variant.get(image_format)
+    ]
+
+
+def variant_urls(variants, storage, build_uri=None):
+    """thumbnail_variants with file names replaced by URLs (absolute when build_uri is given)."""
+    urls = {}
+    for size_name, variant in (variants or {}).items():
+        urls[size_name] = {'width': variant.get('width'), 'height': variant.get('height')}
+        for image_format in FORMATS:
+            name = variant.get(image_format)
+            url = storage.url(name) if name else None
+            urls[size_name][image_format] = build_uri(url) if url and build_uri else url
+    return urls
+
+
+def srcset(variants, storage, image_format):
+    """An <img srcset> value ('<url> 320w, ...') for one format, smallest first."""
+    entries = sorted(
+        (variant['width'], storage.url(variant[image_format]))
+        for variant in (variants or {}).values()
+        if variant.get(image_format) and variant.get('width')
+    )
+    return ', '.join(f"{url} {width}w" for width, url in entries)
@@ -0,0 +1,274 @@
+"""
+Streaming upload handler: multipart/form-data video files go straight into a
+storage multipart upload instead of memory or a temporary file.
+
+S3StreamingUploadHandler claims file fields named in STREAMING_UPLOAD_FIELDS
+(default: video_file) or sent with a video/* content type, and only for
+authenticated users with a current library, under whose prefix the
+object gets a canonical key (storage_keys.py). Incoming chunks are collected into fixed-size parts
+(S3_STREAMING_UPLOAD_PART_SIZE, grown so the request fits in 10,000 parts)
+and each full part is uploaded with its SHA-256 on a small thread pool.
+At most S3_STREAMING_UPLOAD_CONCURRENCY parts per upload are in flight and
+their bytes count against the process-wide S3_UPLOAD_MEMORY_BUDGET; reading
+the request pauses until a part finishes, so memory stays flat at a few
+parts per upload whatever the file size.
+
+The handler produces a StreamedUpload in request.FILES. Assigning it to
+Video.video_file and saving stores the object reference instead of the file
+(see videos.signals). Uploads that no Video claims by the end of the request
+are deleted, and aborted requests abort the multipart upload.
+
+Other files (thumbnails, logos) fall through to Django's memory/temporary
+file handlers, bounded by FILE_UPLOAD_MAX_MEMORY_SIZE.
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers
+
+from .storage_backends import get_storage_backend
+from .storage_keys import canonical_key
+from .upload_io import PartBody, get_inflight_budget
+from .multipart import CHECKSUM_ALGORITHM, part_checksum, composite_checksum, clamp_part_size
+
+logger = logging.getLogger(__name__)
+
+
+class StorageObjectReader:
+    """Lazily opened, forward-only read stream over a stored object; seek(0) restarts it."""
+
+    def __init__(self, backend, key):
+        self._backend = backend
+        self._key = key
+        self._body = None
+
+    def _stream(self):
+        if self._body is None:
+            response = self._backend.client.get_object(Bucket=self._backend.bucket_name, Key=self._key)
+            self._body = response['Body']
+        return self._body
+
+    def read(self, size=-1):
+        return self._stream().read(None if size is None or size < 0 else size)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if offset != 0 or whence != os.SEEK_SET:
+            raise OSError('StorageObjectReader can only seek to the start')
+        self.close()
+        return 0
+
+    def tell(self):
+        raise OSError('StorageObjectReader does not track its position')
+
+    def close(self):
+        if self._body is not None:
+            self._body.close()
+            self._body = None
+
+
+class StreamedUpload(UploadedFile):
+    """
+    An uploaded file that already lives in storage under storage_key.
+    Reading it streams the object back; saving it on a Video records the key
+    (videos.signals.claim_streamed_upload) and marks it claimed.
+    """
+
+    def __init__(self, backend, storage_key, name, content_type, size, charset=None,
+                 content_type_extra=None, checksum_sha256=''):
+        super().__init__(StorageObjectReader(backend, storage_key), name, content_type, size, charset, content_type_extra)
+        self.backend = backend
+        self.storage_key = storage_key
+        self.checksum_sha256 = checksum_sha256
+        self.claimed = False
+
+    @property
+    def storage_url(self):
+        return f"s3://{self.backend.bucket_name}/{self.storage_key}"
+
+    def close(self):
+        """Called by Django when the request finishes; removes the object if nothing claimed it."""
+        super().close()
+        if not self.claimed and self.storage_key:
+            from .signals import enqueue_storage_deletion
+            logger.info(f"Streamed upload {self.storage_key} was not claimed by a video; deleting it")
+            enqueue_storage_deletion(self.backend.bucket_name, [self.storage_key])
+            self.storage_key = None
+
+
+class S3StreamingUploadHandler(FileUploadHandler):
+    """Django upload handler piping video file fields into a storage multipart upload."""
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.activated = False
+        self._reset()
+
+    def _reset(self):
+        self.upload_id = None
+        self.key = None
+        self.buffer = None
+        self.parts = []
+        self.futures = []
+        self.executor = None
+        self.size = 0
+        self.error = None
+        self._lock = threading.Lock()
+
+    # -- activation ----------------------------------------------------
+
+    def _wants(self, field_name, content_type):
+        fields = getattr(settings, 'STREAMING_UPLOAD_FIELDS', ('video_file',))
+        if field_name not in fields and not (content_type or '').startswith('video/'):
+            return False
+        user = getattr(self.request, 'user', None)
+        # The key is issued under the request's library (LibraryContextMiddleware)
+        library = getattr(self.request, 'current_library', None)
+        return bool(user is not None and user.is_authenticated and library is not None)
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.request_length = content_length or 0
+        self.backend = get_storage_backend()
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.activated = self.backend is not None and self._wants(field_name, content_type)
+        if not self.activated:
+            return
+
+        self._reset()
+        # The request length bounds the file size, so parts sized for it always fit 10,000 parts
+        self.part_size = clamp_part_size(
+            getattr(settings, 'S3_STREAMING_UPLOAD_PART_SIZE', 16 * 1024 * 1024), self.request_length
+        )
+        self.key = canonical_key(self.request.current_library.id, file_name)
+        response = self.backend.client.create_multipart_upload(
+            Bucket=self.backend.bucket_name,
+            Key=self.key,
+            ContentType=content_type or 'application/octet-stream',
+            ChecksumAlgorithm=CHECKSUM_ALGORITHM,
+        )
+        self.upload_id = response['UploadId']
+        self.buffer = bytearray()
+        self.budget = get_inflight_budget()
+        self.max_inflight = getattr(settings, 'S3_STREAMING_UPLOAD_CONCURRENCY', 2)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_inflight)
+        logger.info(f"Streaming upload of '{file_name}' to {self.key} in {self.part_size / (1024 * 1024):.0f}MB parts")
+        # This handler owns the file; the memory/temporary-file handlers never see it
+        raise StopFutureHandlers()
+
+    # -- data ----------------------------------------------------------
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.activated:
+            return raw_data
+        self.buffer += raw_data
+        if len(self.buffer) >= self.part_size:
+            self._flush_part()
+        return None
+
+    def _flush_part(self):
+        """
+        Hand the full buffer to the pool. Blocks (reading no more of the request)
+        while this upload already has its share of parts in flight or the
+        process-wide byte budget is spent.
+        """
+        data, self.buffer = self.buffer, bytearray()
+        part_number = len(self.futures) + 1
+        self.size += len(data)
+        try:
+            pending = [future for future in self.futures if not future.done()]
+            while len(pending) >= self.max_inflight:
+                pending.pop(0).result()
+            if self.error:
+                raise self.error
+            self.futures.append(self.executor.submit(self._upload_part, part_number, data))
+        except Exception:
+            self._abort()
+            raise
+
+    def _upload_part(self, part_number, data):
+        reserved = self.budget.acquire(len(data))
+        try:
+            view = memoryview(data)
+            checksum = part_checksum(view)
+            response = self.backend.client.upload_part(
+                Bucket=self.backend.bucket_name,
+                Key=self.key,
+                UploadId=self.upload_id,
+                PartNumber=part_number,
+                Body=PartBody(view),
+                ContentLength=len(data),
+                ChecksumSHA256=checksum,
+            )
+            with self._lock:
+                self.parts.append({'PartNumber': part_number, 'ETag': response['ETag'], 'ChecksumSHA256': checksum})
+        except Exception as e:
+            self.error = e
+            raise
+        finally:
+            self.budget.release(reserved)
+
+    def file_complete(self, file_size):
+        if not self.activated:
+            return None
+        try:
+            if self.buffer or not self.futures:
+                # Last (or only, possibly empty) part
+                self._flush_part()
+            for future in self.futures:
+                future.result()
+            self.executor.shutdown()
+            self.parts.sort(key=lambda part: part['PartNumber'])
+            response = self.backend.client.complete_multipart_upload(
+                Bucket=self.backend.bucket_name,
+                Key=self.key,
+                UploadId=self.upload_id,
+                MultipartUpload={'Parts': self.parts},
+            )
+        except Exception:
+            self._abort()
+            raise
+
+        checksum = composite_checksum([part['ChecksumSHA256'] for part in self.parts])
+        reported = response.get('ChecksumSHA256')
+        if reported and reported != checksum:
+            logger.error(f"Composite checksum mismatch for streamed upload {self.key}: sent {checksum}, storage reported {reported}")
+            self._delete()
+            raise ValueError('Uploaded file failed its integrity check')
+
+        logger.info(f"Streamed {self.size / (1024 * 1024):.1f}MB to {self.key} in {len(self.parts)} parts")
+        upload = StreamedUpload(
+            self.backend, self.key, self.file_name, self.content_type, self.size,
+            self.charset, self.content_type_extra, checksum_sha256=checksum,
+        )
+        self.activated = False
+        return upload
+
+    def upload_interrupted(self):
+        if self.activated:
+            logger.warning(f"Upload to {self.key} interrupted; aborting multipart upload")
+            self._abort()
+
+    def _abort(self):
+        self.activated = False
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+        if self.upload_id:
+            try:
+                self.backend.client.abort_multipart_upload(
+                    Bucket=self.backend.bucket_name, Key=self.key, UploadId=self.upload_id
+                )
+            except Exception as e:
+                logger.error(f"Could not abort multipart upload {self.upload_id} for {self.key}: {str(e)}")
+            self.upload_id = None
+
+    def _delete(self):
+        try:
+            self.backend.client.delete_object(Bucket=self.backend.bucket_name, Key=self.key)
+        except Exception as e:
+            logger.error(f"Could not delete rejected upload {self.key}: {str(e)}")
@@ -0,0 +1,293 @@
+"""
+Bounded-memory I/O helpers for server-side multipart uploads.
+
+PartReader opens the source file once per upload and hands each part to
+boto3 as a file-like view over a memoryview slice (mmap for local files), so
+a part is never copied into a bytes object. InflightByteBudget caps how many
+part bytes may be in flight across all uploads in the process, and
+RSSMonitor samples resident memory so an upload can report its peak and
+back off when it approaches S3_UPLOAD_RSS_CAP.
+"""
+
+import os
+import io
+import mmap
+import time
+import logging
+import threading
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PartBody(io.RawIOBase):
+    """
+    Read-only, seekable file object over a memoryview slice.
+    read() returns memoryview slices of the shared buffer, so sending a part
+    does not materialise it; seek/tell let botocore rewind on retries.
+    """
+
+    def __init__(self, view):
+        super().__init__()
+        self._view = view
+        self._pos = 0
+
+    def __len__(self):
+        return len(self._view)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._pos + offset
+        else:
+            position = len(self._view) + offset
+        self._pos = max(0, min(position, len(self._view)))
+        return self._pos
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            end = len(self._view)
+        else:
+            end = min(self._pos + size, len(self._view))
+        chunk = self._view[self._pos:end]
+        self._pos = end
+        return chunk
+
+    def readinto(self, buffer):
+        chunk = self.read(len(buffer))
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+    @property
+    def view(self):
+        """The underlying memoryview, e.g. for hashing without a copy."""
+        return self._view
+
+    def close(self):
+        self._view = memoryview(b'')
+        super().close()
+
+
+class PartReader:
+    """
+    Shared reader for every part of one multipart upload.
+    Local files are memory-mapped once; other storages fall back to a single
+    open handle with locked positional reads into a per-part buffer.
+    """
+
+    def __init__(self, field_file):
+        self._lock = threading.Lock()
+        self._fd = None
+        self._mmap = None
+        self._view = None
+        self._handle = None
+
+        path = None
+        try:
+            path = field_file.path
+        except (NotImplementedError, AttributeError, ValueError):
+            path = None
+
+        if path and os.path.exists(path):
+            self._fd = os.open(path, os.O_RDONLY)
+            self.size = os.fstat(self._fd).st_size
+            if self.size:
+                self._mmap = mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ)
+                if hasattr(self._mmap, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    self._mmap.madvise(mmap.MADV_SEQUENTIAL)
+                self._view = memoryview(self._mmap)
+        else:
+            self._handle = field_file.open('rb')
+            self.size = field_file.size
+
+    @property
+    def is_mapped(self):
+        return self._view is not None
+
+    def part(self, start, end):
+        """Return a PartBody over bytes [start, end) of the file."""
+        if self._view is not None:
+            body = PartBody(self._view[start:end])
+            body.offset = start
+            return body
+
+        if self._fd is not None:
+            # Zero-length file: nothing to map
+            return PartBody(memoryview(b''))
+
+        buffer = bytearray(end - start)
+        with self._lock:
+            self._handle.seek(start)
+            read = self._handle.readinto(buffer) if hasattr(self._handle, 'readinto') else None
+            if read is None:
+                data = self._handle.read(end - start)
+                buffer[:len(data)] = data
+        return PartBody(memoryview(buffer))
+
+    def release(self, body):
+        """Drop a sent part's pages from this process's mapping; they stay in the page cache."""
+        offset = getattr(body, 'offset', None)
+        if offset is not None and self._mmap is not None and hasattr(mmap, 'MADV_DONTNEED'):
+            aligned = offset - offset % mmap.PAGESIZE
+            try:
+                self._mmap.madvise(mmap.MADV_DONTNEED, aligned, len(body) + offset - aligned)
+            except (OSError, ValueError):
+                pass
+        body.close()
+
+    def close(self):
+        try:
+            if self._view is not None:
+                self._view.release()
+            if self._mmap is not None:
+                self._mmap.close()
+        except BufferError:
+            # A part body is still referenced (e.g. by a retrying request); the GC unmaps it later
+            logger.debug("Part buffers still exported, deferring unmap")
+        self._view = None
+        self._mmap = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class InflightByteBudget:
+    """
+    Counting limit on part bytes in flight across the whole process.
+    Concurrency is throttled by memory rather than by part count: a request
+    larger than the whole budget is admitted alone.
+    """
+
+    def __init__(self, limit):
+        self.limit = max(1, int(limit))
+        self.in_use = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, nbytes):
+        nbytes = min(int(nbytes), self.limit)
+        with self._condition:
+            while self.in_use and self.in_use + nbytes > self.limit:
+                self._condition.wait()
+            self.in_use += nbytes
+        return nbytes
+
+    def release(self, nbytes):
+        with self._condition:
+            self.in_use = max(0, self.in_use - nbytes)
+            self._condition.notify_all()
+
+
+_budget = None
+_budget_lock = threading.Lock()
+
+
+def get_inflight_budget():
+    """Process-wide byte budget sized by S3_UPLOAD_MEMORY_BUDGET (default 512MB)."""
+    global _budget
+    if _budget is None:
+        with _budget_lock:
+            if _budget is None:
+                _budget = InflightByteBudget(getattr(settings, 'S3_UPLOAD_MEMORY_BUDGET', 512 * 1024 * 1024))
+    return _budget
+
+
+def current_rss():
+    """Resident set size of this process in bytes (None if unavailable)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        pass
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except Exception:
+        return None
+
+
+class RSSCapExceeded(Exception):
+    """RSS stayed above S3_UPLOAD_RSS_CAP with none of the upload's parts left in flight."""
+
+    def __init__(self, rss, cap):
+        super().__init__(f"RSS {rss / (1024 * 1024):.0f}MB stayed above the {cap / (1024 * 1024):.0f}MB cap")
+        self.rss = rss
+        self.cap = cap
+
+
+class RSSMonitor:
+    """
+    Background sampler recording the peak RSS seen during an upload.
+    over_cap() tells the caller to stop admitting new parts; wait_below_cap()
+    holds it until memory is back under the cap.
+    """
+
+    def __init__(self, cap=None, interval=0.25):
+        self.cap = cap
+        self.interval = interval
+        self.start_rss = current_rss()
+        self.peak_rss = self.start_rss or 0
+        self.last_rss = self.start_rss
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rss-monitor', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        rss = current_rss()
+        if rss is not None:
+            self.last_rss = rss
+            self.peak_rss = max(self.peak_rss, rss)
+        return rss
+
+    def over_cap(self):
+        return bool(self.cap and self.last_rss and self.last_rss >= self.cap)
+
+    def wait_below_cap(self, in_flight, timeout=30):
+        """
+        Block until RSS is below the cap.
+        Waits for as long as in_flight() reports parts still draining (each is
+        bounded by the S3 client timeouts); once none are left, memory has
+        timeout seconds to come back before RSSCapExceeded is raised, so the
+        caller never admits a part while over the cap.
+        """
+        deadline = None
+        while self.over_cap():
+            if in_flight():
+                deadline = None
+            elif deadline is None:
+                deadline = time.monotonic() + timeout
+            elif time.monotonic() >= deadline:
+                raise RSSCapExceeded(self.last_rss, self.cap)
+            time.sleep(self.interval)
+            self.sample()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join(timeout=self.interval * 4)
+        self.sample()
@@ -3,13 +3,16 @@ from rest_framework.response import Response
 from rest_framework import status, permissions, generics, parsers
 from rest_framework.pagination import PageNumberPagination
 from django.db.models import Count, Q
-from django.db import IntegrityError
-from ..models import Video, ContentType, Tag, VideoTag
+from django.db import IntegrityError, transaction
+from ..models import Video, ContentType, Tag, VideoTag, UploadSession
 from ..serializers import VideoSerializer, TagSerializer
-from libraries.models import Library
+from ..multipart import is_valid_part_checksum, check_upload_size
+from ..storage_keys import is_canonical
+from libraries.models import Library, UserLibraryRole
 import logging
 import urllib.parse
 from django.conf import settings
+from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
 
@@ -74,25 +77,51 @@ class VideoFilterMixin:
 # S3 MULTIPART UPLOAD ENDPOINTS (For large file uploads)
 # ==============================================================================
 
+def can_upload_to(user, library):
+    """Whether user may add videos to library: its owner, a platform owner, or a member with a library role."""
+    if library.owner_id == user.id or user.is_superuser or getattr(user, 'role', None) == 'owner':
+        return True
+    return UserLibraryRole.objects.filter(library=library, user=user, role__in=['admin', 'user']).exists()
+
+
 class S3MultipartUploadView(APIView):
     """
     Create multipart upload for large files.
     MAPPED TO: /api/s3/create-multipart-upload/
     USED BY: Frontend multipart upload for files > 5MB
+    
+    Records an UploadSession so the upload can be resumed after the tab dies.
+    The bucket and the key are chosen by the server (a canonical key in the
+    target library, see storage_keys.py); a client-sent bucket or key is ignored
+    apart from the key's file extension.
+    Responds with the key, part size and concurrency the client should use.
     """
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request, format=None):
         try:
-            bucket = request.data.get('bucket')
-            key = request.data.get('key')
             content_type = request.data.get('content_type')
+            file_size = request.data.get('file_size')
+            file_name = request.data.get('file_name') or request.data.get('key') or ''
+            
+            if not all([content_type, file_size]):
+                return Response(
+                    {'error': 'Missing required fields: content_type, file_size'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
-            if not all([bucket, key, content_type]):
+            try:
+                file_size = int(file_size)
+                part_size = int(request.data.get('part_size') or 0) or None
+            except (ValueError, TypeError):
                 return Response(
-                    {'error': 'Missing required fields: bucket, key, content_type'},
+                    {'error': 'file_size and part_size must be integers'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
+            try:
+                check_upload_size(file_size)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
             
             # Initialize S3 client
             from ..services import AWSCloudStorageService
@@ -104,18 +133,29 @@ class S3MultipartUploadView(APIView):
                     status=status.HTTP_503_SERVICE_UNAVAILABLE
                 )
             
-            # Create multipart upload
-            response = storage_service.s3_client.create_multipart_upload(
-                Bucket=bucket,
-                Key=key,
-                ContentType=content_type,
-                ACL='private'
+            library_id = request.data.get('library_id')
+            library = Library.objects.filter(id=library_id).first() if library_id else getattr(request, 'current_library', None)
+            if library is None:
+                return Response({'error': 'Library not found'}, status=status.HTTP_400_BAD_REQUEST)
+            if not can_upload_to(request.user, library):
+                return Response({'error': 'Not authorized to upload to this library'}, status=status.HTTP_403_FORBIDDEN)
+            session = storage_service.create_multipart_upload(
+                user=request.user,
+                content_type=content_type,
+                file_size=file_size,
+                part_size=part_size,
+                file_name=file_name,
+                library=library
             )
             
             return Response({
-                'upload_id': response['UploadId'],
-                'key': key,
-                'bucket': bucket
+                'upload_id': session.upload_id,
+                'key': session.key,
+                'bucket': session.bucket,
+                'part_size': session.part_size,
+                'total_parts': session.total_parts,
+                'concurrency': session.concurrency,
+                'checksum_algorithm': session.checksum_algorithm
             }, status=status.HTTP_201_CREATED)
             
         except Exception as e:
@@ -126,6 +166,14 @@ class S3MultipartUploadView(APIView):
             )
 
 
+def get_upload_session(request, upload_id, active_only=True):
+    """Return the requesting user's UploadSession for upload_id, or None."""
+    queryset = UploadSession.objects.filter(upload_id=upload_id, user=request.user)
+    if active_only:
+        queryset = queryset.filter(status='active')
+    return queryset.first()
+
+
 class S3UploadPartView(APIView):
     """
     Get presigned URL for uploading a part.
@@ -136,17 +184,38 @@ class S3UploadPartView(APIView):
     
     def post(self, request, format=None):
         try:
-            bucket = request.data.get('bucket')
-            key = request.data.get('key')
             upload_id = request.data.get('upload_id')
             part_number = request.data.get('part_number')
             
-            if not all([bucket, key, upload_id, part_number]):
+            if not all([upload_id, part_number]):
+                return Response(
+                    {'error': 'Missing required fields: upload_id, part_number'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            session = get_upload_session(request, upload_id)
+            if not session:
+                return Response({'error': 'Upload session not found'}, status=status.HTTP_404_NOT_FOUND)
+            
+            try:
+                part_number = int(part_number)
+            except (ValueError, TypeError):
+                part_number = 0
+            if not 1 <= part_number <= session.total_parts:
                 return Response(
-                    {'error': 'Missing required fields: bucket, key, upload_id, part_number'},
+                    {'error': f'part_number must be between 1 and {session.total_parts}'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
+            try:
+                checksums = requested_part_checksums(
+                    {'checksums': {part_number: request.data['checksum']}} if request.data.get('checksum') else {},
+                    session,
+                    [part_number]
+                )
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            
             # Initialize S3 client
             from ..services import AWSCloudStorageService
             storage_service = AWSCloudStorageService()
@@ -157,17 +226,8 @@ class S3UploadPartView(APIView):
                     status=status.HTTP_503_SERVICE_UNAVAILABLE
                 )
             
-            # Generate presigned URL for part upload
-            presigned_url = storage_service.s3_client.generate_presigned_url(
-                'upload_part',
-                Params={
-                    'Bucket': bucket,
-                    'Key': key,
-                    'UploadId': upload_id,
-                    'PartNumber': part_number
-                },
-                ExpiresIn=3600  # 1 hour expiry
-            )
+            # Generate presigned URL for part upload (1 hour expiry)
+            presigned_url = storage_service.presign_upload_part(session, part_number, checksum=checksums.get(part_number))
             
             return Response({
                 'presigned_url': presigned_url,
@@ -182,27 +242,238 @@ class S3UploadPartView(APIView):
             )
 
 
+def requested_part_numbers(data, total_parts, limit):
+    """
+    Part numbers asked for by a batch URL request: 'part_numbers' (list) or
+    'start_part'/'end_part' (inclusive). Raises ValueError with a client-facing message.
+    """
+    try:
+        part_numbers = data.get('part_numbers')
+        if part_numbers:
+            part_numbers = sorted({int(number) for number in part_numbers})
+        else:
+            start_part = int(data.get('start_part', 1))
+            end_part = int(data.get('end_part', start_part + limit - 1))
+            part_numbers = list(range(start_part, min(end_part, total_parts) + 1))
+    except (ValueError, TypeError):
+        raise ValueError('Part numbers must be integers')
+    
+    if not part_numbers or part_numbers[0] < 1 or part_numbers[-1] > total_parts:
+        raise ValueError(f'Part numbers must be between 1 and {total_parts}')
+    if len(part_numbers) > limit:
+        raise ValueError(f'At most {limit} part URLs can be requested at once')
+    return part_numbers
+
+
+def requested_part_checksums(data, session, part_numbers):
+    """
+    Per-part SHA-256 checksums sent with a URL request as 'checksums'
+    ({part number: base64 digest}). Sessions created with a checksum algorithm
+    need one for every requested part. Raises ValueError with a client-facing message.
+    """
+    raw = data.get('checksums') or {}
+    if not isinstance(raw, dict):
+        raise ValueError('checksums must be an object of part number -> base64 SHA-256')
+    try:
+        checksums = {int(number): value for number, value in raw.items()}
+    except (ValueError, TypeError):
+        raise ValueError('Part numbers must be integers')
+    
+    for number in part_numbers:
+        checksum = checksums.get(number)
+        if checksum is None:
+            if session.checksum_algorithm:
+                raise ValueError(f'Missing SHA-256 checksum for part {number}')
+        elif not is_valid_part_checksum(checksum):
+            raise ValueError(f'Invalid SHA-256 checksum for part {number}')
+    return {number: checksums[number] for number in part_numbers if number in checksums}
+
+
+class S3UploadPartURLsView(APIView):
+    """
+    Get presigned URLs for a range of parts in one request.
+    MAPPED TO: /api/s3/get-upload-part-urls/
+    USED BY: upload.js, which prefetches part URLs in windows
+    
+    Accepts either 'part_numbers' (list) or 'start_part'/'end_part' (inclusive).
+    At most MAX_PARTS_PER_REQUEST URLs are returned per call.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    MAX_PARTS_PER_REQUEST = 1000
+    URL_EXPIRY = 3600  # 1 hour
+    
+    def post(self, request, format=None):
+        try:
+            upload_id = request.data.get('upload_id')
+            if not upload_id:
+                return Response(
+                    {'error': 'Missing required field: upload_id'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            session = get_upload_session(request, upload_id)
+            if not session:
+                return Response({'error': 'Upload session not found'}, status=status.HTTP_404_NOT_FOUND)
+            
+            try:
+                part_numbers = requested_part_numbers(request.data, session.total_parts, self.MAX_PARTS_PER_REQUEST)
+                checksums = requested_part_checksums(request.data, session, part_numbers)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            
+            # Initialize S3 client
+            from ..services import AWSCloudStorageService
+            storage_service = AWSCloudStorageService()
+            
+            if not storage_service.storage_enabled:
+                return Response(
+                    {'error': 'S3 storage is not enabled'},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE
+                )
+            
+            urls = storage_service.presign_upload_parts(session, part_numbers, self.URL_EXPIRY, checksums)
+            
+            return Response({
+                'upload_id': session.upload_id,
+                'expires_in': self.URL_EXPIRY,
+                'urls': {str(number): url for number, url in urls.items()}
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            logger.error(f"Error generating upload part URLs: {str(e)}")
+            return Response(
+                {'error': 'Failed to generate upload part URLs'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+def upload_session_payload(session):
+    """Resume information for an active UploadSession (after reconciling with S3)."""
+    return {
+        'upload_id': session.upload_id,
+        'key': session.key,
+        'bucket': session.bucket,
+        'status': session.status,
+        'file_size': session.file_size,
+        'part_size': session.part_size,
+        'total_parts': session.total_parts,
+        'concurrency': session.concurrency,
+        'checksum_algorithm': session.checksum_algorithm,
+        'uploaded_parts': sorted(int(number) for number in session.parts),
+        'missing_parts': session.missing_parts()
+    }
+
+
+class S3UploadSessionView(APIView):
+    """
+    Reconcile an upload session with S3 before resuming it.
+    MAPPED TO: /api/s3/upload-sessions/<upload_id>/
+    USED BY: upload.js when resuming an interrupted multipart upload
+    
+    Returns the parts S3 has confirmed and the part numbers still missing,
+    so the client re-sends only those.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request, upload_id, format=None):
+        session = get_upload_session(request, upload_id, active_only=False)
+        if not session:
+            return Response({'error': 'Upload session not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        if session.status != 'active':
+            return Response({
+                'upload_id': session.upload_id,
+                'key': session.key,
+                'status': session.status
+            }, status=status.HTTP_200_OK)
+        
+        try:
+            from ..services import AWSCloudStorageService
+            storage_service = AWSCloudStorageService()
+            
+            if not storage_service.storage_enabled:
+                return Response(
+                    {'error': 'S3 storage is not enabled'},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE
+                )
+            
+            try:
+                storage_service.list_uploaded_parts(session)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'NoSuchUpload':
+                    raise
+                # Aborted or expired in S3: the client must start over
+                session.status = 'aborted'
+                session.save(update_fields=['status', 'updated_at'])
+                return Response({
+                    'upload_id': session.upload_id,
+                    'key': session.key,
+                    'status': session.status
+                }, status=status.HTTP_200_OK)
+            
+            return Response(upload_session_payload(session), status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            logger.error(f"Error reconciling upload session {upload_id}: {str(e)}")
+            return Response(
+                {'error': 'Failed to reconcile upload session'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class S3UploadTelemetryView(APIView):
+    """
+    Record per-part transfer timings reported by the browser.
+    MAPPED TO: /api/s3/upload-sessions/<upload_id>/telemetry/
+    USED BY: upload.js after parts finish uploading
+    
+    Body: {"parts": [{"part_number": 1, "bytes": 104857600, "seconds": 12.5}, ...]}
+    The totals feed the part size / concurrency recommended for later uploads.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    MAX_SAMPLES_PER_REQUEST = 1000
+    
+    def post(self, request, upload_id, format=None):
+        session = get_upload_session(request, upload_id, active_only=False)
+        if not session:
+            return Response({'error': 'Upload session not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        samples = request.data.get('parts')
+        if not isinstance(samples, list) or len(samples) > self.MAX_SAMPLES_PER_REQUEST:
+            return Response(
+                {'error': f"'parts' must be a list of at most {self.MAX_SAMPLES_PER_REQUEST} samples"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        from ..services import AWSCloudStorageService
+        recorded = AWSCloudStorageService.record_upload_telemetry(session, samples)
+        return Response({'recorded': recorded}, status=status.HTTP_200_OK)
+
+
 class S3CompleteMultipartUploadView(APIView):
     """
     Complete multipart upload.
     MAPPED TO: /api/s3/complete-multipart-upload/
     USED BY: Frontend multipart upload completion
+    
+    The part list is built from S3 ListParts; a client-sent 'parts' payload is ignored.
     """
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request, format=None):
         try:
-            bucket = request.data.get('bucket')
-            key = request.data.get('key')
             upload_id = request.data.get('upload_id')
-            parts = request.data.get('parts', [])
             
-            if not all([bucket, key, upload_id]) or not parts:
+            if not upload_id:
                 return Response(
-                    {'error': 'Missing required fields: bucket, key, upload_id, parts'},
+                    {'error': 'Missing required field: upload_id'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
+            session = get_upload_session(request, upload_id)
+            if not session:
+                return Response({'error': 'Upload session not found'}, status=status.HTTP_404_NOT_FOUND)
+            
             # Initialize S3 client
             from ..services import AWSCloudStorageService
             storage_service = AWSCloudStorageService()
@@ -214,17 +485,18 @@ class S3CompleteMultipartUploadView(APIView):
                 )
             
             # Complete multipart upload
-            response = storage_service.s3_client.complete_multipart_upload(
-                Bucket=bucket,
-                Key=key,
-                UploadId=upload_id,
-                MultipartUpload={'Parts': parts}
-            )
+            response, missing_parts = storage_service.complete_multipart_upload(session)
+            if missing_parts:
+                return Response({
+                    'error': 'Upload is missing parts',
+                    'missing_parts': missing_parts
+                }, status=status.HTTP_409_CONFLICT)
             
             return Response({
                 'location': response.get('Location'),
                 'etag': response.get('ETag'),
-                'key': key
+                'key': session.key,
+                'checksum_sha256': session.checksum_sha256
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
@@ -245,16 +517,18 @@ class S3AbortMultipartUploadView(APIView):
     
     def post(self, request, format=None):
         try:
-            bucket = request.data.get('bucket')
-            key = request.data.get('key')
             upload_id = request.data.get('upload_id')
             
-            if not all([bucket, key, upload_id]):
+            if not upload_id:
                 return Response(
-                    {'error': 'Missing required fields: bucket, key, upload_id'},
+                    {'error': 'Missing required field: upload_id'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
+            session = get_upload_session(request, upload_id)
+            if not session:
+                return Response({'error': 'Upload session not found'}, status=status.HTTP_404_NOT_FOUND)
+            
             # Initialize S3 client
             from ..services import AWSCloudStorageService
             storage_service = AWSCloudStorageService()
@@ -266,11 +540,7 @@ class S3AbortMultipartUploadView(APIView):
                 )
             
             # Abort multipart upload
-            storage_service.s3_client.abort_multipart_upload(
-                Bucket=bucket,
-                Key=key,
-                UploadId=upload_id
-            )
+            storage_service.abort_multipart_upload(session)
             
             return Response({
                 'message': 'Multipart upload aborted successfully'
@@ -288,6 +558,143 @@ class S3AbortMultipartUploadView(APIView):
 # METADATA CREATION ENDPOINT (After S3 upload completes)
 # ==============================================================================
 
+def create_video_from_upload(request, data, files):
+    """
+    Create the Video record for a completed S3 upload.
+    Shared by VideoAPIUploadView and its async counterpart.
+    
+    Returns:
+        tuple: (response payload, HTTP status code)
+    """
+    s3_key = data.get('s3_key')
+    if not s3_key:
+        return {'message': 's3_key is required.'}, status.HTTP_400_BAD_REQUEST
+        
+    try:
+        # Get required data from request
+        title = data.get('title', 'Untitled Video')
+        description = data.get('description', '')
+        content_type_id = data.get('content_type')
+        library_id = data.get('library_id')
+        tags_str = data.get('tags', '')
+        duration = data.get('duration')
+        file_size = data.get('file_size')
+        format_type = data.get('format')
+        thumbnail = files.get('thumbnail')
+        
+        # Validation
+        if not title or not title.strip():
+            return {'message': 'Title is required and cannot be empty.'}, status.HTTP_400_BAD_REQUEST
+        
+        if len(title) > 200:
+            return {'message': 'Title cannot exceed 200 characters.'}, status.HTTP_400_BAD_REQUEST
+        
+        if duration is not None:
+            try:
+                duration = int(duration)
+                if duration < 0:
+                    return {'message': 'Duration cannot be negative.'}, status.HTTP_400_BAD_REQUEST
+                if duration > 86400:
+                    return {'message': 'Duration cannot exceed 24 hours (86400 seconds).'}, status.HTTP_400_BAD_REQUEST
+            except (ValueError, TypeError):
+                return {'message': 'Duration must be a valid integer.'}, status.HTTP_400_BAD_REQUEST
+        
+        if file_size is not None:
+            try:
+                file_size = int(file_size)
+            except (ValueError, TypeError):
+                return {'message': 'File size must be a valid integer.'}, status.HTTP_400_BAD_REQUEST
+            try:
+                check_upload_size(file_size)
+            except ValueError as e:
+                return {'message': str(e)}, status.HTTP_400_BAD_REQUEST
+        
+        if not content_type_id:
+            return {'message': 'Content type is required.'}, status.HTTP_400_BAD_REQUEST
+        
+        # Keys are issued by the server under the target library (storage_keys.py)
+        if not is_canonical(s3_key, library_id):
+            return {'message': 'The upload key was not issued for this library.'}, status.HTTP_400_BAD_REQUEST
+        if Video.objects.filter(storage_reference_id=s3_key).exists():
+            return {'message': 'This upload has already been registered.'}, status.HTTP_400_BAD_REQUEST
+        
+        # Size and checksum come from storage, not from the client
+        checksum_sha256 = ''
+        from ..services import AWSCloudStorageService
+        storage_service = AWSCloudStorageService()
+        if storage_service.storage_enabled:
+            stored = storage_service.uploaded_object_info(request.user, s3_key)
+            if stored is None:
+                return {'message': 'Uploaded file not found in storage.'}, status.HTTP_400_BAD_REQUEST
+            file_size = stored['file_size']
+            checksum_sha256 = stored['checksum_sha256']
+        
+        # Validate library and content type
+        try:
+            library = Library.objects.get(id=library_id)
+        except Library.DoesNotExist:
+            return {'message': 'Library not found'}, status.HTTP_404_NOT_FOUND
+        if not can_upload_to(request.user, library):
+            return {'message': 'Not authorized to upload to this library.'}, status.HTTP_403_FORBIDDEN
+        
+        try:
+            content_type = ContentType.objects.get(
+                id=content_type_id, 
+                library=library, 
+                is_active=True
+            )
+        except ContentType.DoesNotExist:
+            return {
+                'message': f"Content type with id {content_type_id} not found in library '{library.name}' or is inactive"
+            }, status.HTTP_404_NOT_FOUND
+        
+        # Create video record
+        video = Video.objects.create(
+            title=title,
+            description=description,
+            content_type=content_type,
+            library=library,
+            uploader=request.user,
+            storage_reference_id=s3_key,
+            storage_url=f"s3://{settings.AWS_STORAGE_BUCKET_NAME}/{s3_key}",
+            storage_status='stored',
+            duration=duration,
+            file_size=file_size,
+            checksum_sha256=checksum_sha256,
+            format=format_type
+        )
+        
+        # Set thumbnail if provided
+        if thumbnail:
+            video.thumbnail = thumbnail
+            video.save(update_fields=['thumbnail'])
+            
+        # Handle tags with race condition protection
+        if tags_str:
+            tag_names = [name.strip() for name in tags_str.split(',') if name.strip()]
+            for tag_name in tag_names:
+                try:
+                    tag = Tag.objects.get(name=tag_name, library=library)
+                except Tag.DoesNotExist:
+                    try:
+                        tag = Tag.objects.create(name=tag_name, library=library)
+                    except IntegrityError:
+                        tag = Tag.objects.get(name=tag_name, library=library)
+                
+                VideoTag.objects.get_or_create(video=video, tag=tag)
+        
+        # Read the real duration, resolution and frame rate from the stored file
+        from ..services import VideoProcessingService
+        VideoProcessingService.start(video)
+                
+        serializer = VideoSerializer(video, context={'request': request})
+        return serializer.data, status.HTTP_201_CREATED
+            
+    except Exception as e:
+        logger.error(f"Error in VideoAPIUploadView: {e}")
+        return {'message': 'An unexpected error occurred.'}, status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
 class VideoAPIUploadView(APIView):
     """
     Main video upload endpoint for metadata creation.
@@ -298,115 +705,15 @@ class VideoAPIUploadView(APIView):
     This is the final step in the upload process flow:
     1. Frontend uploads file directly to S3 using presigned URL
     2. Frontend calls this endpoint with S3 key and metadata
-    3. This endpoint creates the Video record with storage_status='stored'
+    3. This endpoint creates the Video record with storage_status='stored', or
+       'processing' while the media pipeline reads its metadata
     """
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [parsers.MultiPartParser, parsers.FormParser]
     
     def post(self, request, format=None):
-        s3_key = request.data.get('s3_key')
-        if not s3_key:
-            return Response({'message': 's3_key is required.'}, status=status.HTTP_400_BAD_REQUEST)
-            
-        try:
-            # Get required data from request
-            title = request.data.get('title', 'Untitled Video')
-            description = request.data.get('description', '')
-            content_type_id = request.data.get('content_type')
-            library_id = request.data.get('library_id')
-            tags_str = request.data.get('tags', '')
-            duration = request.data.get('duration')
-            file_size = request.data.get('file_size')
-            format_type = request.data.get('format')
-            thumbnail = request.FILES.get('thumbnail')
-            
-            # Validation
-            if not title or not title.strip():
-                return Response({'message': 'Title is required and cannot be empty.'}, status=status.HTTP_400_BAD_REQUEST)
-            
-            if len(title) > 200:
-                return Response({'message': 'Title cannot exceed 200 characters.'}, status=status.HTTP_400_BAD_REQUEST)
-            
-            if duration is not None:
-                try:
-                    duration = int(duration)
-                    if duration < 0:
-                        return Response({'message': 'Duration cannot be negative.'}, status=status.HTTP_400_BAD_REQUEST)
-                    if duration > 86400:
-                        return Response({'message': 'Duration cannot exceed 24 hours (86400 seconds).'}, status=status.HTTP_400_BAD_REQUEST)
-                except (ValueError, TypeError):
-                    return Response({'message': 'Duration must be a valid integer.'}, status=status.HTTP_400_BAD_REQUEST)
-            
-            if file_size is not None:
-                try:
-                    file_size = int(file_size)
-                    if file_size < 0:
-                        return Response({'message': 'File size cannot be negative.'}, status=status.HTTP_400_BAD_REQUEST)
-                    if file_size > 10737418240:
-                        return Response({'message': 'File size cannot exceed 10GB.'}, status=status.HTTP_400_BAD_REQUEST)
-                except (ValueError, TypeError):
-                    return Response({'message': 'File size must be a valid integer.'}, status=status.HTTP_400_BAD_REQUEST)
-            
-            if not content_type_id:
-                return Response({'message': 'Content type is required.'}, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Validate library and content type
-            try:
-                library = Library.objects.get(id=library_id)
-            except Library.DoesNotExist:
-                return Response({'message': 'Library not found'}, status=status.HTTP_404_NOT_FOUND)
-            
-            try:
-                content_type = ContentType.objects.get(
-                    id=content_type_id, 
-                    library=library, 
-                    is_active=True
-                )
-            except ContentType.DoesNotExist:
-                return Response({
-                    'message': f"Content type with id {content_type_id} not found in library '{library.name}' or is inactive"
-                }, status=status.HTTP_404_NOT_FOUND)
-            
-            # Create video record
-            video = Video.objects.create(
-                title=title,
-                description=description,
-                content_type=content_type,
-                library=library,
-                uploader=request.user,
-                storage_reference_id=s3_key,
-                storage_url=f"s3://{settings.AWS_STORAGE_BUCKET_NAME}/{s3_key}",
-                storage_status='stored',
-                duration=duration,
-                file_size=file_size,
-                format=format_type
-            )
-            
-            # Set thumbnail if provided
-            if thumbnail:
-                video.thumbnail = thumbnail
-                video.save(update_fields=['thumbnail'])
-                
-            # Handle tags with race condition protection
-            if tags_str:
-                tag_names = [name.strip() for name in tags_str.split(',') if name.strip()]
-                for tag_name in tag_names:
-                    try:
-                        tag = Tag.objects.get(name=tag_name, library=library)
-                    except Tag.DoesNotExist:
-                        try:
-                            tag = Tag.objects.create(name=tag_name, library=library)
-                        except IntegrityError:
-                            tag = Tag.objects.get(name=tag_name, library=library)
-                    
-                    VideoTag.objects.get_or_create(video=video, tag=tag)
-                    
-            serializer = VideoSerializer(video, context={'request': request})
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-                
-        except Exception as e:
-            logger.error(f"Error in VideoAPIUploadView: {e}")
-            return Response({'message': 'An unexpected error occurred.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        payload, status_code = create_video_from_upload(request, request.data, request.FILES)
+        return Response(payload, status=status_code)
 
 
 class PopularTagsAPIView(APIView):
@@ -584,4 +891,122 @@ class VideoDetailAPIView(generics.RetrieveAPIView):
             return Response(
                 {"error": "Unable to retrieve video details"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+class VideoBulkDeleteAPIView(APIView):
+    """
+    Delete several of the requesting user's videos at once.
+    MAPPED TO: /api/videos/bulk-delete/
+    USED BY: Uploaders removing clips from "My Videos"
+    
+    Body: {"video_ids": [1, 2, 3]}. Only videos uploaded by the requester are deleted;
+    other ids are reported back as not found. Rows are removed in one transaction and
+    their S3 objects are deleted afterwards in batches (see videos/signals.py).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    MAX_VIDEOS_PER_REQUEST = 500
+    
+    def post(self, request, format=None):
+        video_ids = request.data.get('video_ids')
+        if not isinstance(video_ids, list) or not video_ids:
+            return Response({'error': "'video_ids' must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(video_ids) > self.MAX_VIDEOS_PER_REQUEST:
+            return Response(
+                {'error': f'At most {self.MAX_VIDEOS_PER_REQUEST} videos can be deleted per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            video_ids = {int(video_id) for video_id in video_ids}
+        except (ValueError, TypeError):
+            return Response({'error': 'Video ids must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            with transaction.atomic():
+                videos = Video.objects.filter(id__in=video_ids, uploader=request.user)
+                deleted_ids = set(videos.values_list('id', flat=True))
+                videos.delete()
+            
+            logger.info(f"Bulk deleted {len(deleted_ids)} videos for user {request.user.id}")
+            return Response({
+                'deleted': sorted(deleted_ids),
+                'not_found': sorted(video_ids - deleted_ids)
+            }, status=status.HTTP_200_OK)
+            
+        except Exception as e:
+            logger.error(f"Error bulk deleting videos: {str(e)}")
+            return Response({'error': 'Failed to delete videos'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class VideoRelocateAPIView(APIView):
+    """
+    Move or copy a stored video into another library without re-uploading it.
+    MAPPED TO: /api/videos/<video_id>/relocate/
+    USED BY: Library owners and administrators reorganising clips
+    
+    Body: {"library_id": 2, "mode": "move" | "copy", "content_type_id": 7 (optional)}.
+    The object is copied server-side (CopyObject, or parallel UploadPartCopy over 5GB);
+    tags are remapped to the target library's tags and the content type defaults to the
+    target library's one with the same subject area. Copies belong to the requester.
+    Objects over S3_COPY_MULTIPART_THRESHOLD are relocated by the relocate_video task:
+    the request is validated, queued and answered with 202.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    @staticmethod
+    def _can_manage(user, library):
+        return library.owner_id == user.id or UserLibraryRole.objects.filter(
+            library=library, user=user, role='admin'
+        ).exists()
+    
+    def post(self, request, video_id, format=None):
+        from ..services import VideoRelocationService
+        
+        mode = request.data.get('mode', 'move')
+        library_id = request.data.get('library_id')
+        if not library_id:
+            return Response({'error': "'library_id' is required"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            video = Video.objects.select_related('library', 'content_type').get(id=video_id)
+            library = Library.objects.get(id=library_id)
+        except (Video.DoesNotExist, Library.DoesNotExist, ValueError, TypeError):
+            return Response({'error': 'Video or library not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        # The requester must control the source video and be able to add videos to the target
+        owns_source = video.uploader_id == request.user.id or self._can_manage(request.user, video.library)
+        if not owns_source or not self._can_manage(request.user, library):
+            return Response({'error': 'Not authorized to move this video to that library'}, status=status.HTTP_403_FORBIDDEN)
+        
+        content_type_id = request.data.get('content_type_id')
+        try:
+            service = VideoRelocationService()
+            service.validate(video, library, mode, content_type_id)
+            if service.runs_in_background(video):
+                from ..tasks import relocate_video
+                relocate_video.delay(video.id, library.id, mode, content_type_id, request.user.id)
+                return Response({
+                    'mode': mode,
+                    'status': 'queued',
+                    'video_id': video.id,
+                    'library_id': library.id,
+                }, status=status.HTTP_202_ACCEPTED)
+            
+            target = service.relocate(
+                video, library, mode=mode,
+                content_type_id=content_type_id,
+                user=request.user,
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except ClientError as e:
+            code = e.response.get('Error', {}).get('Code', 'Unknown')
+            logger.error(f"S3 error ({code}) relocating video {video_id}: {str(e)}")
+            return Response({'error': 'Storage copy failed'}, status=status.HTTP_502_BAD_GATEWAY)
+        except Exception as e:
+            logger.error(f"Error relocating video {video_id}: {str(e)}")
+            return Response({'error': 'Failed to relocate video'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        return Response({
+            'mode': mode,
+            'video': VideoSerializer(target, context={'request': request}).data,
+        }, status=status.HTTP_201_CREATED if mode == 'copy' else status.HTTP_200_OK)
@@ -0,0 +1,191 @@
+"""
+Async versions of the S3-bound video API endpoints.
+
+Served under /api/async/ when the project runs on an ASGI server (see
+DEPLOYMENT_GUIDE.md). Request parsing and validation happen on the event
+loop; S3 and database work is awaited on the bounded storage executor
+(videos/async_storage.py), so one worker can keep many S3 calls in flight.
+Request and response formats match the synchronous endpoints under /api/.
+"""
+
+import logging
+
+from botocore.exceptions import ClientError
+from django.http import JsonResponse
+
+from paletta_core.async_views import AsyncAPIView, AsyncAPIError
+from libraries.models import Library
+from ..async_storage import AsyncStorageService, run_blocking
+from ..multipart import check_upload_size
+from .api_views import (
+    get_upload_session, requested_part_numbers, requested_part_checksums, upload_session_payload, create_video_from_upload,
+    can_upload_to, S3UploadPartURLsView,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def _storage_service():
+    storage_service = await AsyncStorageService.create()
+    if not storage_service.storage_enabled:
+        raise AsyncAPIError('S3 storage is not enabled', status=503)
+    return storage_service
+
+
+async def _active_session(request, upload_id, active_only=True):
+    if not upload_id:
+        raise AsyncAPIError('Missing required field: upload_id')
+    session = await run_blocking(get_upload_session, request, upload_id, active_only)
+    if not session:
+        raise AsyncAPIError('Upload session not found', status=404)
+    return session
+
+
+class AsyncS3MultipartUploadView(AsyncAPIView):
+    """
+    Async create multipart upload.
+    MAPPED TO: /api/async/s3/create-multipart-upload/
+    USED BY: upload.js when served from an ASGI deployment
+    """
+
+    async def post(self, request):
+        content_type = self.data.get('content_type')
+        file_size = self.data.get('file_size')
+        file_name = self.data.get('file_name') or self.data.get('key') or ''
+        if not all([content_type, file_size]):
+            raise AsyncAPIError('Missing required fields: content_type, file_size')
+        try:
+            file_size = int(file_size)
+            part_size = int(self.data.get('part_size') or 0) or None
+        except (ValueError, TypeError):
+            raise AsyncAPIError('file_size and part_size must be integers')
+        try:
+            check_upload_size(file_size)
+        except ValueError as e:
+            raise AsyncAPIError(str(e))
+
+        storage_service = await _storage_service()
+        library_id = self.data.get('library_id')
+        # Same fallback as S3MultipartUploadView: the library the request is browsing (set by LibraryContextMiddleware)
+        library = await run_blocking(lambda: Library.objects.filter(id=library_id).first()) if library_id else getattr(request, 'current_library', None)
+        if library is None:
+            raise AsyncAPIError('Library not found')
+        if not await run_blocking(can_upload_to, self.user, library):
+            raise AsyncAPIError('Not authorized to upload to this library', status=403)
+
+        session = await storage_service.create_multipart_upload(
+            user=self.user,
+            content_type=content_type,
+            file_size=file_size,
+            part_size=part_size,
+            file_name=file_name,
+            library=library,
+        )
+        return JsonResponse({
+            'upload_id': session.upload_id,
+            'key': session.key,
+            'bucket': session.bucket,
+            'part_size': session.part_size,
+            'total_parts': session.total_parts,
+            'concurrency': session.concurrency,
+            'checksum_algorithm': session.checksum_algorithm,
+        }, status=201)
+
+
+class AsyncS3UploadPartURLsView(AsyncAPIView):
+    """
+    Async batch part-URL presigning.
+    MAPPED TO: /api/async/s3/get-upload-part-urls/
+    USED BY: upload.js when served from an ASGI deployment
+    """
+
+    async def post(self, request):
+        session = await _active_session(request, self.data.get('upload_id'))
+        try:
+            part_numbers = requested_part_numbers(
+                self.data, session.total_parts, S3UploadPartURLsView.MAX_PARTS_PER_REQUEST
+            )
+            checksums = requested_part_checksums(self.data, session, part_numbers)
+        except ValueError as e:
+            raise AsyncAPIError(str(e))
+
+        storage_service = await _storage_service()
+        urls = storage_service.presign_upload_parts(
+            session, part_numbers, S3UploadPartURLsView.URL_EXPIRY, checksums
+        )
+        return JsonResponse({
+            'upload_id': session.upload_id,
+            'expires_in': S3UploadPartURLsView.URL_EXPIRY,
+            'urls': {str(number): url for number, url in urls.items()},
+        })
+
+
+class AsyncS3UploadSessionView(AsyncAPIView):
+    """
+    Async upload session reconciliation.
+    MAPPED TO: /api/async/s3/upload-sessions/<upload_id>/
+    USED BY: upload.js when resuming from an ASGI deployment
+    """
+
+    async def get(self, request, upload_id):
+        session = await _active_session(request, upload_id, active_only=False)
+        if session.status == 'active':
+            storage_service = await _storage_service()
+            try:
+                await storage_service.list_uploaded_parts(session)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'NoSuchUpload':
+                    raise
+                session.status = 'aborted'
+                await run_blocking(session.save, update_fields=['status', 'updated_at'])
+
+        if session.status != 'active':
+            return JsonResponse({'upload_id': session.upload_id, 'key': session.key, 'status': session.status})
+        return JsonResponse(upload_session_payload(session))
+
+
+class AsyncS3CompleteMultipartUploadView(AsyncAPIView):
+    """
+    Async complete multipart upload (part list built from S3 ListParts).
+    MAPPED TO: /api/async/s3/complete-multipart-upload/
+    USED BY: upload.js when served from an ASGI deployment
+    """
+
+    async def post(self, request):
+        session = await _active_session(request, self.data.get('upload_id'))
+        storage_service = await _storage_service()
+        response, missing_parts = await storage_service.complete_multipart_upload(session)
+        if missing_parts:
+            raise AsyncAPIError('Upload is missing parts', status=409, missing_parts=missing_parts)
+        return JsonResponse({
+            'location': response.get('Location'),
+            'etag': response.get('ETag'),
+            'key': session.key,
+            'checksum_sha256': session.checksum_sha256,
+        })
+
+
+class AsyncS3AbortMultipartUploadView(AsyncAPIView):
+    """
+    Async abort multipart upload.
+    MAPPED TO: /api/async/s3/abort-multipart-upload/
+    USED BY: upload.js cleanup when served from an ASGI deployment
+    """
+
+    async def post(self, request):
+        session = await _active_session(request, self.data.get('upload_id'))
+        storage_service = await _storage_service()
+        await storage_service.abort_multipart_upload(session)
+        return JsonResponse({'message': 'Multipart upload aborted successfully'})
+
+
+class AsyncVideoUploadView(AsyncAPIView):
+    """
+    Async video metadata creation after an S3 upload completes.
+    MAPPED TO: /api/async/uploads/
+    USED BY: upload.js notifyBackend when served from an ASGI deployment
+    """
+
+    async def post(self, request):
+        payload, status_code = await run_blocking(create_video_from_upload, request, request.POST, request.FILES)
+        return JsonResponse(payload, status=status_code, safe=False)
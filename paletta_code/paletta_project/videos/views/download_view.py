@@ -3,9 +3,13 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from django.contrib import messages
+from django.core import signing
+from django.http import HttpResponse, HttpResponseRedirect
 from ..models import Video
 from ..tasks import generate_and_send_download_link
-from ..services import VideoLogService
+from ..services import AWSCloudStorageService, VideoLogService
+from ..download_links import read_download_token, KIND_REQUEST
+import time
 import logging
 from django.urls import reverse
 
@@ -125,4 +129,57 @@ class DownloadRequestView(View):
         except Exception as e:
             logger.error(f"Error in RequestDownloadView.post: {str(e)}")
             messages.error(request, "An error occurred while processing your request.")
-            return redirect('my_videos') 
\ No newline at end of file
+            return redirect('my_videos')
+
+
+class DownloadRedirectView(View):
+    """
+    FRONTEND VIEW: Click-time resolution of download links.
+    MAPPED TO: /d/<token>/
+    USED BY: Download links in emails (videos.tasks, orders.services)
+    
+    The token names a DownloadRequest or a video with its own expiry
+    (see download_links.py). The grant is checked when the link is
+    followed and the response is a 302 to a presigned URL that lives for
+    DOWNLOAD_REDIRECT_EXPIRY_SECONDS, signed only now.
+    No login is required: like the presigned URL it replaces, the token
+    is the authorisation.
+    """
+    http_method_names = ['get']
+    
+    def get(self, request, token):
+        try:
+            kind, object_id, expires_at = read_download_token(token)
+        except signing.BadSignature:
+            return HttpResponse("Invalid download link.", status=404, content_type='text/plain')
+        
+        filename = None
+        if kind == KIND_REQUEST:
+            from orders.models import DownloadRequest
+            download_request = DownloadRequest.objects.select_related('video').filter(pk=object_id).first()
+            if download_request is None:
+                return HttpResponse("Invalid download link.", status=404, content_type='text/plain')
+            if download_request.status in ('failed', 'expired') or download_request.is_expired():
+                return HttpResponse("This download link has expired.", status=410, content_type='text/plain')
+            video = download_request.video
+            filename = video.title
+        else:
+            if expires_at <= time.time():
+                return HttpResponse("This download link has expired.", status=410, content_type='text/plain')
+            video = Video.objects.filter(pk=object_id).first()
+            if video is None:
+                return HttpResponse("Invalid download link.", status=404, content_type='text/plain')
+        
+        if video.storage_status != 'stored' or not video.storage_reference_id:
+            return HttpResponse("This video is not available for download.", status=404, content_type='text/plain')
+        
+        url = AWSCloudStorageService().presign_download(video, filename)
+        if not url:
+            return HttpResponse("Download is temporarily unavailable.", status=503, content_type='text/plain')
+        
+        logger.info(f"Download link followed for video ID {video.id} ({'request' if kind == KIND_REQUEST else 'video'} grant {object_id})")
+        response = HttpResponseRedirect(url)
+        # The target URL is short-lived: never cache the redirect or leak it onwards
+        response['Cache-Control'] = 'no-store'
+        response['Referrer-Policy'] = 'no-referrer'
+        return response
@@ -0,0 +1,231 @@
+"""
+Serving and receiving objects of the local storage backend.
+
+URLs generated by LocalStorageBackend.presign_url point here with a signed,
+expiring token naming the bucket, key and allowed method, so these endpoints
+need no session: they stand in for S3 presigned URLs.
+
+GET/HEAD stream the object with HTTP Range support (video seeking). The
+response wraps the open file, so WSGI servers with wsgi.file_wrapper
+(gunicorn) send it with os.sendfile instead of copying it through Python.
+PUT stores an object or, with partNumber/uploadId in the token, one part of
+a multipart upload, streaming the request body to disk.
+
+LocalDeliveryView serves plain /delivery/<key> URLs to holders of valid
+delivery cookies, standing in for CloudFront in signed-cookie mode.
+"""
+
+import re
+import logging
+
+from botocore.exceptions import ClientError
+from django.core import signing
+from django.http import FileResponse, HttpResponse, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from ..storage_backends import get_storage_backend, read_storage_token, LocalStorageBackend
+from ..delivery import delivery_url, verify_signed_cookies
+
+logger = logging.getLogger(__name__)
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+BLOCK_SIZE = 512 * 1024
+
+ERROR_STATUS = {
+    'NoSuchKey': 404,
+    '404': 404,
+    'NoSuchUpload': 404,
+    'BadDigest': 400,
+    'InvalidArgument': 400,
+    'IncompleteBody': 400,
+}
+
+
+class RangeFile:
+    """
+    File-like view of [start, start + length) of an open file.
+    Exposes fileno() so wsgi.file_wrapper can use sendfile from the current
+    offset; read() stops at the end of the range for servers that iterate.
+    """
+
+    def __init__(self, handle, start, length):
+        self._handle = handle
+        self._remaining = length
+        handle.seek(start)
+
+    def fileno(self):
+        return self._handle.fileno()
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._handle.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def close(self):
+        self._handle.close()
+
+
+def parse_range(header, size):
+    """
+    (start, end) for a single 'bytes=' range, None to send the whole file,
+    or False if the range cannot be satisfied.
+    Multiple ranges are answered with the whole file, which HTTP allows.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(size - int(last), 0), size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def stream_object(request, backend, bucket, key, params=None):
+    """Response streaming a local storage object, honouring a single Range header."""
+    params = params or {}
+    head = backend.client.head_object(Bucket=bucket, Key=key)
+    size = head['ContentLength']
+
+    byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    length = max(end - start + 1, 0)
+    handle = open(backend.object_path(bucket, key), 'rb')
+    response = FileResponse(
+        RangeFile(handle, start, length),
+        status=206 if byte_range else 200,
+        content_type=params.get('response-content-type') or head['ContentType'],
+    )
+    response.block_size = BLOCK_SIZE
+    # FileResponse cannot size a range wrapper; the WSGI server also uses this to bound sendfile
+    response['Content-Length'] = str(length)
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = head['ETag']
+    response['Cache-Control'] = 'private, max-age=3600'
+    if params.get('response-content-disposition'):
+        response['Content-Disposition'] = params['response-content-disposition']
+    return response
+
+
+def head_response(response):
+    """Headers of a GET response without its body."""
+    if isinstance(response, FileResponse):
+        response.file_to_stream.close()
+        headers = dict(response.items())
+        response = HttpResponse(status=response.status_code)
+        for name, value in headers.items():
+            response[name] = value
+    return response
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class LocalStorageObjectView(View):
+    """
+    Token-authorised access to local storage objects.
+    MAPPED TO: /storage/local/<token>/
+    USED BY: Video players, download links and upload.js part uploads when VIDEO_STORAGE_BACKEND='local'
+    """
+    http_method_names = ['get', 'head', 'put']
+
+    def dispatch(self, request, token):
+        backend = get_storage_backend()
+        if not isinstance(backend, LocalStorageBackend):
+            return HttpResponse(status=404)
+        try:
+            grant = read_storage_token(token)
+        except signing.SignatureExpired:
+            return JsonResponse({'error': 'Link expired'}, status=403)
+        except signing.BadSignature:
+            return JsonResponse({'error': 'Invalid link'}, status=403)
+
+        method = 'GET' if request.method == 'HEAD' else request.method
+        if method != grant['method']:
+            return JsonResponse({'error': f'Method {request.method} not allowed'}, status=405)
+
+        self.backend = backend
+        self.grant = grant
+        try:
+            return super().dispatch(request, token)
+        except ClientError as e:
+            code = e.response.get('Error', {}).get('Code')
+            return JsonResponse({'error': code}, status=ERROR_STATUS.get(code, 500))
+
+    def get(self, request, token):
+        return stream_object(request, self.backend, self.grant['bucket'], self.grant['key'], self.grant['params'])
+
+    def head(self, request, token):
+        return head_response(self.get(request, token))
+
+    def put(self, request, token):
+        bucket, key, params = self.grant['bucket'], self.grant['key'], self.grant['params']
+        content_length = request.META.get('CONTENT_LENGTH') or None
+        checksum = params.get('x-amz-checksum-sha256')
+
+        if params.get('uploadId'):
+            result = self.backend.client.upload_part(
+                Bucket=bucket,
+                Key=key,
+                UploadId=params['uploadId'],
+                PartNumber=int(params['partNumber']),
+                Body=request,
+                ContentLength=content_length,
+                ChecksumSHA256=checksum,
+            )
+        else:
+            result = self.backend.client.put_object(
+                Bucket=bucket,
+                Key=key,
+                Body=request,
+                ContentType=request.content_type or None,
+                ContentLength=content_length,
+            )
+        response = HttpResponse(status=200)
+        response['ETag'] = result['ETag']
+        return response
+
+
+class LocalDeliveryView(View):
+    """
+    Cookie-authorised delivery of local storage objects (CloudFront stand-in).
+    MAPPED TO: /delivery/<key>
+    USED BY: Video players in signed-cookie delivery mode without a CloudFront distribution
+    """
+    http_method_names = ['get', 'head']
+
+    def dispatch(self, request, key):
+        backend = get_storage_backend()
+        if not isinstance(backend, LocalStorageBackend):
+            return HttpResponse(status=404)
+        if not verify_signed_cookies(request.COOKIES, delivery_url(key)):
+            return JsonResponse({'error': 'Access denied'}, status=403)
+        self.backend = backend
+        try:
+            return super().dispatch(request, key)
+        except ClientError as e:
+            code = e.response.get('Error', {}).get('Code')
+            return JsonResponse({'error': code}, status=ERROR_STATUS.get(code, 500))
+
+    def get(self, request, key):
+        return stream_object(request, self.backend, self.backend.bucket_name, key)
+
+    def head(self, request, key):
+        return head_response(self.get(request, key))
@@ -4,6 +4,7 @@ from django.utils.decorators import method_decorator
 from django.conf import settings
 from libraries.models import Library, UserLibraryRole
 from django.db.models import Q
+from ..multipart import max_upload_size, format_size
 
 @method_decorator(login_required, name='dispatch')
 class UploadPageView(TemplateView):
@@ -36,4 +37,8 @@ class UploadPageView(TemplateView):
         
         # Inject the API Gateway URL from settings into the template (optional)
         context['API_GATEWAY_URL'] = getattr(settings, 'API_GATEWAY_URL', '')
+        
+        # Largest accepted file, enforced again by the upload APIs
+        context['max_upload_size'] = max_upload_size()
+        context['max_upload_size_display'] = format_size(context['max_upload_size'])
         return context 
\ No newline at end of file
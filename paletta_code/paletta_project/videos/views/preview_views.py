@@ -0,0 +1,71 @@
+"""
+HLS preview playlists for presigned delivery.
+
+Stored preview playlists reference their segments relatively. With
+presigned delivery those objects are private, so players fetch the
+playlists from here instead: rendition playlists come back with each
+segment URL presigned, and the master playlist points at this view for
+each rendition. Segments themselves are fetched straight from storage.
+"""
+
+import logging
+import posixpath
+
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views import View
+
+from ..models import Video
+from ..previews import PLAYLIST_PATH, PLAYLIST_CONTENT_TYPE, manifest_prefix, rewrite_playlist
+from ..services import AWSCloudStorageService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEGMENT_URL_EXPIRY = 4 * 3600  # long enough to watch a long clip after loading the playlist
+
+
+class VideoPreviewPlaylistView(View):
+    """
+    Serve a video's HLS preview playlist with presigned segment URLs.
+    MAPPED TO: /api/videos/<video_id>/preview/<playlist>
+    USED BY: hls.js / native HLS players on the video detail page and API clients (preview_url)
+
+    playlist is 'master.m3u8' or '<rendition>/index.m3u8'. Like the video detail
+    API, no login is required; the URLs handed out expire after PREVIEW_SEGMENT_URL_EXPIRY.
+    """
+
+    def get(self, request, video_id, playlist):
+        if not PLAYLIST_PATH.match(playlist):
+            raise Http404("Unknown playlist")
+        video = get_object_or_404(Video, pk=video_id, storage_status='stored')
+        prefix = manifest_prefix(video.preview_manifest_key or '')
+        if not prefix:
+            raise Http404("Video has no preview")
+
+        storage_service = AWSCloudStorageService()
+        if not storage_service.storage_enabled:
+            raise Http404("Storage is not available")
+        try:
+            text = storage_service.read_object(prefix + playlist).decode('utf-8')
+        except ClientError as e:
+            logger.error(f"Could not read preview playlist {prefix}{playlist} of video ID {video.id}: {str(e)}")
+            raise Http404("Playlist not found")
+
+        directory = posixpath.dirname(playlist)
+        expiry = getattr(settings, 'PREVIEW_SEGMENT_URL_EXPIRY', DEFAULT_SEGMENT_URL_EXPIRY)
+
+        def resolve(uri):
+            path = posixpath.normpath(posixpath.join(directory, uri))
+            if path.startswith('..'):
+                raise Http404("Invalid playlist entry")
+            if path.endswith('.m3u8'):
+                return reverse('api_video_preview_playlist', args=[video.id, path])
+            return storage_service.presign_url(prefix + path, expiry)
+
+        response = HttpResponse(rewrite_playlist(text, resolve), content_type=PLAYLIST_CONTENT_TYPE)
+        # Cached well inside the lifetime of the URLs it contains
+        response['Cache-Control'] = f'private, max-age={min(300, expiry // 4)}'
+        return response
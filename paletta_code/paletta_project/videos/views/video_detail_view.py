@@ -5,6 +5,7 @@ from django.shortcuts import get_object_or_404
 from django.http import Http404
 import logging
 from ..models import Video, VideoTag
+from ..delivery import granted_library
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +39,12 @@ class VideoDetailView(TemplateView):
             clip = get_object_or_404(Video, id=video_id)
             context['clip'] = clip
             
+            # Clips from other libraries are not covered by this session's delivery cookies
+            library = granted_library(self.request)
+            granted_library_id = library.id if library else None
+            context['streaming_url'] = clip.get_streaming_url(granted_library_id)
+            context['preview_url'] = clip.get_preview_url(granted_library_id)
+            
             # Increment view count
             clip.views_count += 1
             clip.save(update_fields=['views_count'])
@@ -108,6 +108,9 @@ document.addEventListener("DOMContentLoaded", function () {
     // Setup collection and cart buttons
     setupActionButtons();
 
+    // Scrub through clips on hover
+    setupScrubPreviews();
+
     // Close popups when clicking outside
     document.addEventListener("click", closePopups);
   }
@@ -261,6 +264,55 @@ document.addEventListener("DOMContentLoaded", function () {
     });
   }
 
+  /**
+   * Hover-scrub previews: cards with a sprite sheet (data-sprite-*) show the
+   * frame under the pointer, taken from one image loaded on first hover.
+   */
+  function setupScrubPreviews() {
+    document.querySelectorAll(".clip-thumbnail[data-sprite-url]").forEach((thumbnail) => {
+      const image = thumbnail.querySelector("img");
+      const columns = parseInt(thumbnail.dataset.spriteColumns, 10);
+      const count = parseInt(thumbnail.dataset.spriteCount, 10);
+      if (!image || !columns || !count) {
+        return;
+      }
+      const rows = Math.ceil(count / columns);
+      let overlay = null;
+
+      function showFrame(event) {
+        const bounds = image.getBoundingClientRect();
+        const position = Math.min(Math.max((event.clientX - bounds.left) / bounds.width, 0), 0.9999);
+        const index = Math.floor(position * count);
+        const column = index % columns;
+        const row = Math.floor(index / columns);
+        overlay.style.backgroundPosition = `${columns > 1 ? (column / (columns - 1)) * 100 : 0}% ${rows > 1 ? (row / (rows - 1)) * 100 : 0}%`;
+      }
+
+      thumbnail.addEventListener("mouseenter", (event) => {
+        if (!overlay) {
+          overlay = document.createElement("div");
+          overlay.className = "scrub-preview";
+          overlay.style.backgroundImage = `url("${thumbnail.dataset.spriteUrl}")`;
+          overlay.style.backgroundSize = `${columns * 100}% ${rows * 100}%`;
+          thumbnail.appendChild(overlay);
+        }
+        // Cover the thumbnail image exactly, wherever the card layout puts it
+        overlay.style.left = `${image.offsetLeft}px`;
+        overlay.style.top = `${image.offsetTop}px`;
+        overlay.style.width = `${image.offsetWidth}px`;
+        overlay.style.height = `${image.offsetHeight}px`;
+        overlay.hidden = false;
+        showFrame(event);
+      });
+      thumbnail.addEventListener("mousemove", (event) => {
+        if (overlay) showFrame(event);
+      });
+      thumbnail.addEventListener("mouseleave", () => {
+        if (overlay) overlay.hidden = true;
+      });
+    });
+  }
+
   /**
    * Close all popups
    */
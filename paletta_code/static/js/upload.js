@@ -37,8 +37,10 @@ document.addEventListener("DOMContentLoaded", function () {
   const uploadForm = document.getElementById("upload-form");
 
   const MAX_TAGS = 10;
-  // Define max file size (256GB in bytes)
-  const MAX_FILE_SIZE = 256 * 1024 * 1024 * 1024;
+  // Max file size in bytes, from the server (S3 allows objects up to 5TB)
+  const MAX_FILE_SIZE =
+    Number(uploadForm && uploadForm.dataset.maxFileSize) ||
+    5 * 1024 * 1024 * 1024 * 1024;
 
   let selectedTags = [];
   let selectedContentType = null; // Store the selected content type
@@ -126,12 +128,12 @@ document.addEventListener("DOMContentLoaded", function () {
     const file = e.target.files[0];
     if (!file) return;
 
-    // File size validation - 10GB limit
-    const maxFileSize = 10 * 1024 * 1024 * 1024; // 10GB in bytes
-    if (file.size > maxFileSize) {
+    // File size validation against the server's limit
+    if (file.size > MAX_FILE_SIZE) {
       const fileSizeGB = (file.size / (1024 * 1024 * 1024)).toFixed(2);
+      const maxSizeGB = (MAX_FILE_SIZE / (1024 * 1024 * 1024)).toFixed(0);
       alert(
-        `File size (${fileSizeGB}GB) exceeds the maximum allowed size of 10GB. Please select a smaller file.`
+        `File size (${fileSizeGB}GB) exceeds the maximum allowed size of ${maxSizeGB}GB. Please select a smaller file.`
       );
       fileInput.value = "";
       return;
@@ -431,9 +433,13 @@ document.addEventListener("DOMContentLoaded", function () {
           "API Gateway URL is not configured. Please contact support."
         );
       }
-      const response = await fetch(
-        `${apiGatewayUrl}?fileName=${file.name}&contentType=${file.type}`
-      );
+      // The key is issued under the target library
+      const params = new URLSearchParams({
+        fileName: file.name,
+        contentType: file.type,
+        libraryId: uploadForm.dataset.libraryId || "",
+      });
+      const response = await fetch(`${apiGatewayUrl}?${params}`);
 
       if (!response.ok) {
         throw new Error("Could not get a presigned URL. Please try again.");
@@ -448,9 +454,6 @@ document.addEventListener("DOMContentLoaded", function () {
       // Determine upload method and calculate chunks for multipart
       const uploadMethod =
         file.size > 5 * 1024 * 1024 ? "Multipart" : "Single-part";
-      const CHUNK_SIZE = 100 * 1024 * 1024; // 100MB chunks
-      const totalChunks =
-        file.size > 5 * 1024 * 1024 ? Math.ceil(file.size / CHUNK_SIZE) : 1;
 
       uploadButton.textContent = `Uploading... (0%) - ${fileSizeMB}MB (${uploadMethod})`;
 
@@ -519,7 +522,8 @@ document.addEventListener("DOMContentLoaded", function () {
 
       // 3. Notify the backend that the upload is complete
       uploadButton.textContent = "Finalizing...";
-      await notifyBackend(key);
+      // A resumed upload keeps the key of the session it resumed
+      await notifyBackend(s3UploadResponse.key || key);
 
       alert("Upload complete! Your video has been successfully submitted.");
       window.__uploadInProgress__ = false;
@@ -588,58 +592,204 @@ document.addEventListener("DOMContentLoaded", function () {
     });
   }
 
+  // Resumable uploads: the upload session for a file is remembered in
+  // localStorage so a reloaded tab re-sends only the parts S3 is missing.
+  function uploadSessionStorageKey(file) {
+    return `paletta-upload:${file.name}:${file.size}:${file.lastModified}`;
+  }
+
+  async function resumeUploadSession(file) {
+    const storageKey = uploadSessionStorageKey(file);
+    let saved = null;
+    try {
+      saved = JSON.parse(localStorage.getItem(storageKey));
+    } catch (e) {
+      saved = null;
+    }
+    if (!saved || !saved.upload_id) {
+      return null;
+    }
+
+    const response = await fetch(
+      `/api/s3/upload-sessions/${encodeURIComponent(saved.upload_id)}/`,
+      { headers: { "X-CSRFToken": getCookie("csrftoken") } }
+    );
+    const session = response.ok ? await response.json() : null;
+    if (
+      !session ||
+      session.status !== "active" ||
+      session.file_size !== file.size
+    ) {
+      localStorage.removeItem(storageKey);
+      return null;
+    }
+    return session;
+  }
+
   function uploadFileToS3Multipart(uploadURL, file, onProgress) {
-    const CHUNK_SIZE = 100 * 1024 * 1024;
-    const MAX_CONCURRENT_CHUNKS = 10;
+    // Part size and concurrency are recommended by the server per upload
+    const PART_URL_BATCH = 100;
+    const TELEMETRY_BATCH = 20;
 
     return (async function () {
-      const url = new URL(uploadURL);
-      const bucket = url.hostname.split(".")[0];
-      const key = url.pathname.substring(1);
-      const totalChunks = Math.ceil(file.size / CHUNK_SIZE);
-
-      // Track cumulative uploaded bytes for smooth progress
-      let totalUploadedBytes = 0;
+      const storageKey = uploadSessionStorageKey(file);
       const totalFileSize = file.size;
       const activeChunkProgress = {}; // chunkIndex → bytes uploaded
 
-      const createMultipartResponse = await fetch(
-        "/api/s3/create-multipart-upload/",
-        {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json",
-            "X-CSRFToken": getCookie("csrftoken"),
-          },
-          body: JSON.stringify({ bucket, key, content_type: file.type }),
+      let session = await resumeUploadSession(file);
+      if (!session) {
+        // The server issues the multipart upload its own key
+        const libraryInfo = document.querySelector(".library-info");
+
+        const createMultipartResponse = await fetch(
+          "/api/s3/create-multipart-upload/",
+          {
+            method: "POST",
+            headers: {
+              "Content-Type": "application/json",
+              "X-CSRFToken": getCookie("csrftoken"),
+            },
+            body: JSON.stringify({
+              content_type: file.type,
+              file_size: file.size,
+              file_name: file.name,
+              library_id: libraryInfo
+                ? libraryInfo.getAttribute("data-library-id")
+                : null,
+            }),
+          }
+        );
+        if (!createMultipartResponse.ok) {
+          throw new Error("Could not start the upload. Please try again.");
         }
-      );
 
-      const { upload_id } = await createMultipartResponse.json();
-      const parts = [];
+        session = await createMultipartResponse.json();
+        session.missing_parts = [];
+        for (let i = 1; i <= session.total_parts; i++) {
+          session.missing_parts.push(i);
+        }
+        localStorage.setItem(
+          storageKey,
+          JSON.stringify({ upload_id: session.upload_id, key: session.key })
+        );
+      }
 
-      const uploadChunk = async (chunkIndex) => {
-        const start = chunkIndex * CHUNK_SIZE;
-        const end = Math.min(start + CHUNK_SIZE, file.size);
-        const chunk = file.slice(start, end);
+      const { upload_id, key, part_size } = session;
+      const concurrency = Math.max(1, session.concurrency || 4);
+      const missingParts = session.missing_parts;
+
+      // Parts already confirmed by S3 count towards progress straight away
+      const missingSet = new Set(missingParts);
+      for (let i = 0; i < session.total_parts; i++) {
+        if (!missingSet.has(i + 1)) {
+          activeChunkProgress[i] = Math.min(part_size, file.size - i * part_size);
+        }
+      }
+
+      // Each part's SHA-256 is signed into its URL, so S3 rejects corrupted
+      // bytes. URL requests made while another is in flight are queued and
+      // sent together, so busy workers share one request per batch.
+      const checksumsRequired = Boolean(session.checksum_algorithm);
+      let queuedUrlRequests = [];
+      let urlRequestInFlight = false;
+
+      const sendQueuedUrlRequests = () => {
+        if (urlRequestInFlight || !queuedUrlRequests.length) {
+          return;
+        }
+        const batch = queuedUrlRequests.slice(0, PART_URL_BATCH);
+        queuedUrlRequests = queuedUrlRequests.slice(PART_URL_BATCH);
+        urlRequestInFlight = true;
+
+        const checksums = {};
+        batch.forEach(({ partNumber, checksum }) => {
+          if (checksum) {
+            checksums[partNumber] = checksum;
+          }
+        });
 
-        const partResponse = await fetch("/api/s3/get-upload-part-url/", {
+        fetch("/api/s3/get-upload-part-urls/", {
           method: "POST",
           headers: {
             "Content-Type": "application/json",
             "X-CSRFToken": getCookie("csrftoken"),
           },
           body: JSON.stringify({
-            bucket,
-            key,
             upload_id,
-            part_number: chunkIndex + 1,
+            part_numbers: batch.map(({ partNumber }) => partNumber),
+            checksums,
           }),
+        })
+          .then((response) => {
+            if (!response.ok) {
+              throw new Error("Could not get upload URLs. Please try again.");
+            }
+            return response.json();
+          })
+          .then(({ urls }) => {
+            batch.forEach(({ partNumber, resolve }) =>
+              resolve(urls[String(partNumber)])
+            );
+          })
+          .catch((error) => batch.forEach(({ reject }) => reject(error)))
+          .finally(() => {
+            urlRequestInFlight = false;
+            sendQueuedUrlRequests();
+          });
+      };
+
+      const getPartUrl = (partNumber, checksum) =>
+        new Promise((resolve, reject) => {
+          queuedUrlRequests.push({ partNumber, checksum, resolve, reject });
+          sendQueuedUrlRequests();
         });
 
-        const { presigned_url } = await partResponse.json();
+      const sha256Base64 = async (buffer) => {
+        const digest = new Uint8Array(
+          await crypto.subtle.digest("SHA-256", buffer)
+        );
+        let binary = "";
+        digest.forEach((byte) => {
+          binary += String.fromCharCode(byte);
+        });
+        return btoa(binary);
+      };
+
+      // Per-part timings are reported back so later uploads get a better plan
+      let telemetry = [];
+      const flushTelemetry = () => {
+        if (!telemetry.length) {
+          return Promise.resolve();
+        }
+        const samples = telemetry;
+        telemetry = [];
+        return fetch(
+          `/api/s3/upload-sessions/${encodeURIComponent(upload_id)}/telemetry/`,
+          {
+            method: "POST",
+            headers: {
+              "Content-Type": "application/json",
+              "X-CSRFToken": getCookie("csrftoken"),
+            },
+            body: JSON.stringify({ parts: samples }),
+          }
+        ).catch(() => {});
+      };
+
+      const uploadChunk = async (chunkIndex) => {
+        const start = chunkIndex * part_size;
+        const end = Math.min(start + part_size, file.size);
+        // Read the part once: the same buffer is hashed and uploaded
+        // (the server caps part_size at S3_CLIENT_MAX_PART_SIZE so it fits)
+        const chunk = checksumsRequired
+          ? await file.slice(start, end).arrayBuffer()
+          : file.slice(start, end);
+        const checksum = checksumsRequired ? await sha256Base64(chunk) : null;
+
+        const presigned_url = await getPartUrl(chunkIndex + 1, checksum);
 
         return new Promise((resolve, reject) => {
+          const startedAt = performance.now();
           const xhr = new XMLHttpRequest();
           xhr.open("PUT", presigned_url);
           xhr.setRequestHeader("Content-Type", file.type);
@@ -664,10 +814,17 @@ document.addEventListener("DOMContentLoaded", function () {
           xhr.onload = () => {
             if (xhr.status >= 200 && xhr.status < 300) {
               // Mark this chunk as fully uploaded
-              activeChunkProgress[chunkIndex] = chunk.size;
-
-              const etag = xhr.getResponseHeader("ETag");
-              resolve({ PartNumber: chunkIndex + 1, ETag: etag });
+              const partBytes = end - start;
+              activeChunkProgress[chunkIndex] = partBytes;
+              telemetry.push({
+                part_number: chunkIndex + 1,
+                bytes: partBytes,
+                seconds: (performance.now() - startedAt) / 1000,
+              });
+              if (telemetry.length >= TELEMETRY_BATCH) {
+                flushTelemetry();
+              }
+              resolve(chunkIndex + 1);
             } else {
               reject(new Error(`Failed to upload part ${chunkIndex + 1}`));
             }
@@ -681,31 +838,52 @@ document.addEventListener("DOMContentLoaded", function () {
         });
       };
 
-      for (let i = 0; i < totalChunks; i += MAX_CONCURRENT_CHUNKS) {
-        const chunkPromises = [];
-        for (let j = 0; j < MAX_CONCURRENT_CHUNKS && i + j < totalChunks; j++) {
-          chunkPromises.push(uploadChunk(i + j));
+      // Keep `concurrency` parts in flight; a worker picks the next part as soon as one finishes
+      let nextPart = 0;
+      const worker = async () => {
+        while (nextPart < missingParts.length) {
+          const partNumber = missingParts[nextPart++];
+          await uploadChunk(partNumber - 1);
         }
-        const chunkResults = await Promise.all(chunkPromises);
-        parts.push(...chunkResults);
-
-        // Update progress after each batch completes
-        const completed = parts.length;
-        const progress = (completed / totalChunks) * 100;
-        onProgress(progress);
+      };
+      const workers = [];
+      for (let i = 0; i < Math.min(concurrency, missingParts.length); i++) {
+        workers.push(worker());
+      }
+      try {
+        await Promise.all(workers);
+      } finally {
+        await flushTelemetry();
       }
 
-      await fetch("/api/s3/complete-multipart-upload/", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-          "X-CSRFToken": getCookie("csrftoken"),
-        },
-        body: JSON.stringify({ bucket, key, upload_id, parts }),
-      });
+      const uploaded = Object.values(activeChunkProgress).reduce(
+        (sum, bytes) => sum + bytes,
+        0
+      );
+      onProgress((uploaded / totalFileSize) * 100);
+
+      // The server builds the part list from S3, so only the upload id is sent
+      const completeResponse = await fetch(
+        "/api/s3/complete-multipart-upload/",
+        {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json",
+            "X-CSRFToken": getCookie("csrftoken"),
+          },
+          body: JSON.stringify({ upload_id }),
+        }
+      );
+      if (!completeResponse.ok) {
+        throw new Error(
+          "Some parts did not reach storage. Submit again to resume the upload."
+        );
+      }
+      localStorage.removeItem(storageKey);
 
       return {
         status: 200,
+        key,
         responseText: "Multipart upload completed successfully",
       };
     })();
@@ -4,6 +4,54 @@ document.addEventListener("DOMContentLoaded", function () {
     "addToCollectionButton"
   );
 
+  // Play the low-bitrate HLS preview when there is one: natively (Safari),
+  // through hls.js elsewhere, and the original file if neither works.
+  function setupPreviewPlayback() {
+    const player = document.getElementById("clipPlayer");
+    if (!player || !player.dataset.previewSrc) {
+      return;
+    }
+    const previewSrc = player.dataset.previewSrc;
+    const originalSrc = player.dataset.originalSrc;
+
+    if (player.canPlayType("application/vnd.apple.mpegurl")) {
+      player.src = previewSrc;
+      player.addEventListener(
+        "error",
+        () => {
+          if (originalSrc) player.src = originalSrc;
+        },
+        { once: true }
+      );
+      return;
+    }
+    if (window.Hls && window.Hls.isSupported()) {
+      // A cross-origin preview is served by the delivery CDN, which needs the signed cookies
+      const withCredentials =
+        new URL(previewSrc, window.location.href).origin !== window.location.origin;
+      const hls = new window.Hls({
+        xhrSetup: (xhr) => {
+          xhr.withCredentials = withCredentials;
+        },
+      });
+      hls.on(window.Hls.Events.ERROR, (event, data) => {
+        if (data.fatal) {
+          console.warn("Preview playback failed, using the original file", data);
+          hls.destroy();
+          if (originalSrc) player.src = originalSrc;
+        }
+      });
+      hls.loadSource(previewSrc);
+      hls.attachMedia(player);
+      return;
+    }
+    if (originalSrc) {
+      player.src = originalSrc;
+    }
+  }
+
+  setupPreviewPlayback();
+
   // Get current library context for localStorage keys
   function getCurrentLibrarySlug() {
     // Try to get from meta tag first (most reliable)
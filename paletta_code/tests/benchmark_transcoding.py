@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Transcoding benchmark for the parallel segmented engine (videos/transcoding.py).
+
+Encodes a sample clip into the HLS preview ladder (360p/720p H.264 + AAC)
+once with a single ffmpeg process, the way short videos are handled, and
+then with SegmentedTranscoder at increasing worker counts. Reports
+wall-clock time, speed-up over the single process and realtime factor,
+and checks that every joined rendition has exactly the source's frames.
+
+Without --input a synthetic 1080p30 clip with a 2s GOP is generated with
+ffmpeg's test sources. Needs ffmpeg/ffprobe on the PATH; no AWS access or
+database is needed.
+
+Results are written as JSON together with the git commit, like
+benchmark_storage.py.
+
+Usage:
+    python benchmark_transcoding.py [--input clip.mov] [--duration 120]
+                                    [--workers 1,2,4,8] [--output results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+
+# Add the project directory to the Python path
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+paletta_project_dir = os.path.join(project_dir, 'paletta_project')
+sys.path.insert(0, paletta_project_dir)
+
+import django
+from django.conf import settings
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+def configure_django(segment_seconds):
+    settings.configure(
+        INSTALLED_APPS=[],
+        USE_TZ=True,
+        FFMPEG_BINARY='ffmpeg',
+        FFPROBE_BINARY='ffprobe',
+        TRANSCODE_SEGMENT_SECONDS=segment_seconds,
+    )
+    django.setup()
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=project_dir, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_sample_clip(path, duration):
+    """A 1080p30 test pattern with a moving overlay and a tone, H.264 with a keyframe every 2s."""
+    subprocess.run([
+        'ffmpeg', '-hide_banner', '-loglevel', 'error', '-y',
+        '-f', 'lavfi', '-i', f'testsrc2=size=1920x1080:rate=30:duration={duration}',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:sample_rate=48000:duration={duration}',
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-g', '60', '-pix_fmt', 'yuv420p',
+        '-c:a', 'aac', '-shortest', path,
+    ], check=True)
+
+
+class TranscodingBenchmark:
+    """
+    Times the single-process encode against SegmentedTranscoder at several worker counts.
+    """
+
+    def __init__(self, source, worker_counts):
+        from videos.media import probe, read_metadata, has_audio
+        from videos.previews import plan_renditions
+
+        self.source = source
+        self.worker_counts = worker_counts
+        info = probe(source)
+        metadata = read_metadata(info, source)
+        width, height = (int(value) for value in metadata['resolution'].split('x'))
+        self.duration = float(info['format']['duration'])
+        self.start_time = float(info['format'].get('start_time') or 0)
+        self.audio = has_audio(info)
+        self.renditions = plan_renditions(width, height)
+        self.results = {'source': {'path': source, 'resolution': metadata['resolution'], 'duration': self.duration}}
+
+    def _frame_count(self, path):
+        from videos.transcoding import keyframe_index
+        return len(keyframe_index(path)[1])
+
+    def benchmark_single_process(self, work_dir):
+        """One ffmpeg process decoding once and encoding every rendition (the pre-existing approach)."""
+        import ffmpeg
+        from videos.media import run, video_options, audio_options
+
+        stream = ffmpeg.input(self.source)
+        split = stream.video.filter_multi_output('split', len(self.renditions))
+        outputs = []
+        for index, rendition in enumerate(self.renditions):
+            video = split[index].filter('scale', rendition['width'], rendition['height'])
+            streams = [video, stream.audio] if self.audio else [video]
+            options = video_options(rendition, 2)
+            if self.audio:
+                options.update(audio_options(rendition))
+            outputs.append(ffmpeg.output(*streams, os.path.join(work_dir, f"single_{rendition['name']}.mp4"), **options))
+
+        start = time.perf_counter()
+        run(ffmpeg.merge_outputs(*outputs))
+        elapsed = time.perf_counter() - start
+        self.results['single_process'] = {
+            'seconds': round(elapsed, 2),
+            'realtime_factor': round(self.duration / elapsed, 2),
+        }
+        print(f"  single process: {elapsed:.1f}s ({self.duration / elapsed:.1f}x realtime)")
+
+    def benchmark_segmented(self, work_dir):
+        from videos.transcoding import SegmentedTranscoder
+
+        source_frames = self._frame_count(self.source)
+        baseline = self.results.get('single_process', {}).get('seconds')
+        runs = []
+        for workers in self.worker_counts:
+            run_dir = os.path.join(work_dir, f'workers_{workers}')
+            os.makedirs(run_dir)
+            transcoder = SegmentedTranscoder(self.source, run_dir, workers=workers, keyframe_seconds=2, start_time=self.start_time)
+
+            start = time.perf_counter()
+            outputs = transcoder.transcode(self.renditions, self.audio)
+            elapsed = time.perf_counter() - start
+
+            frames = {name: self._frame_count(path) for name, path in outputs.items()}
+            run = {
+                'workers': workers,
+                'encoder_threads': transcoder.threads,
+                'segments': transcoder.stats.get('segments'),
+                'seconds': round(elapsed, 2),
+                'realtime_factor': round(self.duration / elapsed, 2),
+                'speedup_vs_single_process': round(baseline / elapsed, 2) if baseline else None,
+                'frames_match': all(count == source_frames for count in frames.values()),
+                'frames': frames,
+            }
+            runs.append(run)
+            print(
+                f"  {workers:>2} workers: {elapsed:.1f}s ({run['realtime_factor']}x realtime, "
+                f"{run['speedup_vs_single_process']}x single process, {run['segments']} segments, "
+                f"frames {'match' if run['frames_match'] else 'DIFFER'})"
+            )
+            for path in outputs.values():
+                os.remove(path)
+        self.results['source']['frames'] = source_frames
+        self.results['segmented'] = runs
+
+    def run(self):
+        print(f"Source: {self.source} ({self.duration:.0f}s, ladder {', '.join(r['name'] for r in self.renditions)})")
+        with tempfile.TemporaryDirectory() as work_dir:
+            self.benchmark_single_process(work_dir)
+            self.benchmark_segmented(work_dir)
+        return self.results
+
+
+def _int_list(value):
+    return [int(item) for item in value.split(',') if item.strip()]
+
+
+def default_worker_counts():
+    counts, workers = [], 1
+    while workers < (os.cpu_count() or 1):
+        counts.append(workers)
+        workers *= 2
+    return counts + [os.cpu_count() or 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parallel segmented transcoding against one ffmpeg process')
+    parser.add_argument('--input', help='Clip to transcode (default: a generated 1080p30 test clip)')
+    parser.add_argument('--duration', type=int, default=120, help='Length of the generated clip in seconds')
+    parser.add_argument('--workers', type=_int_list, default=default_worker_counts(),
+                        help='Worker counts to run (comma separated; default 1,2,4,... up to the core count)')
+    parser.add_argument('--segment-seconds', type=int, default=20, help='Target segment length')
+    parser.add_argument('--output', default='transcoding_benchmark.json', help='Where to write the JSON results')
+    args = parser.parse_args()
+
+    configure_django(args.segment_seconds)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = args.input
+        if not source:
+            source = os.path.join(tmp, 'sample.mp4')
+            print(f"Generating a {args.duration}s 1080p sample clip...")
+            make_sample_clip(source, args.duration)
+        results = TranscodingBenchmark(source, args.workers).run()
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'parameters': vars(args),
+        'results': results,
+    }
+    with open(args.output, 'w') as handle:
+        json.dump(report, handle, indent=2)
+    print(f"\nResults written to {args.output}")
+    ok = all(run['frames_match'] for run in results.get('segmented', []))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for the bucket / database reconciliation merge (videos/reconciliation.py).
+
+Feeds reconcile() key-ordered streams shaped like a ListObjectsV2 listing,
+the Video key cursor and the preview prefix cursor, and checks which objects
+are reported as orphans: a video's HLS preview playlists and segments
+(stored under storage_keys.preview_prefix of its key) must count as
+referenced, while unreferenced objects, including a preview whose video is
+gone, must not.
+
+No AWS access or database is needed.
+
+Usage:
+    python test_reconciliation.py
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+# Add the project directory to the Python path
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+paletta_project_dir = os.path.join(project_dir, 'paletta_project')
+sys.path.insert(0, paletta_project_dir)
+
+import django
+from django.conf import settings
+
+NOW = datetime(2026, 1, 15, 12, 0, tzinfo=timezone.utc)
+OLD = NOW - timedelta(days=7)
+RECENT = NOW - timedelta(hours=1)
+
+
+def configure_django():
+    settings.configure(INSTALLED_APPS=[], USE_TZ=True)
+    django.setup()
+
+
+class ReconciliationTest:
+    """Checks reconcile() reports against hand-built listings."""
+
+    def __init__(self):
+        self.passed = 0
+        self.failed = 0
+
+    def check(self, condition, message):
+        if condition:
+            self.passed += 1
+            print(f"  ok    {message}")
+        else:
+            self.failed += 1
+            print(f"  FAIL  {message}")
+
+    def _reconcile(self, objects, videos, preview_prefixes=()):
+        from videos.reconciliation import reconcile
+
+        orphans = []
+        report = reconcile(
+            iter(sorted(objects)), iter(sorted(videos)),
+            grace_hours=24, now=NOW,
+            on_orphan=lambda key, size, last_modified: orphans.append(key),
+            preview_prefixes=iter(sorted(preview_prefixes)),
+        )
+        return report, orphans
+
+    def test_preview_objects(self):
+        """Playlists and segments under a referenced preview prefix are not orphans."""
+        from videos.previews import manifest_prefix
+        from videos.storage_keys import preview_prefix
+
+        print("HLS preview objects")
+        key = 'library_1/ab/abcdef.mp4'
+        prefix = preview_prefix(key)
+        self.check(manifest_prefix(prefix + 'master.m3u8') == prefix, f"preview prefix {prefix}")
+
+        objects = [
+            (key, 1000, OLD),
+            (prefix + 'master.m3u8', 10, OLD),
+            (prefix + '360p/index.m3u8', 20, OLD),
+            (prefix + '360p/seg_00000.ts', 300, OLD),
+            (prefix + '720p/index.m3u8', 20, OLD),
+            (prefix + '720p/seg_00000.ts', 700, OLD),
+            # Neighbours in key order that the prefix must not swallow
+            ('library_1/ab/abcdef/other.bin', 5, OLD),
+            ('library_1/ab/abcdef0.mp4', 50, OLD),
+            # A preview left behind by a deleted video
+            ('library_1/cd/cdef01/hls/master.m3u8', 10, OLD),
+            ('library_1/cd/cdef01/hls/360p/seg_00000.ts', 400, OLD),
+        ]
+        videos = [(key, 1, 'stored', 1000)]
+        report, orphans = self._reconcile(objects, videos, [prefix])
+
+        self.check(report['matched'] == 1, f"{report['matched']} object matched by key")
+        self.check(
+            report['preview_objects'] == 5 and report['preview_bytes'] == 1050,
+            f"{report['preview_objects']} preview objects ({report['preview_bytes']} bytes) referenced",
+        )
+        self.check(
+            orphans == [
+                'library_1/ab/abcdef/other.bin',
+                'library_1/ab/abcdef0.mp4',
+                'library_1/cd/cdef01/hls/360p/seg_00000.ts',
+                'library_1/cd/cdef01/hls/master.m3u8',
+            ],
+            f"orphans: {orphans}",
+        )
+        self.check(report['orphan_bytes'] == 465, f"{report['orphan_bytes']} orphan bytes")
+
+        report, orphans = self._reconcile(objects, videos)
+        self.check(report['orphans'] == 9, f"without preview prefixes every preview object is an orphan ({report['orphans']})")
+
+    def test_several_previews(self):
+        """Prefixes are consumed in step with the listing across many videos."""
+        from videos.storage_keys import preview_prefix
+
+        print("Several videos")
+        keys = [f'library_2/{n:02x}/{n:02x}video.mov' for n in range(0, 40, 3)]
+        with_preview = keys[::2]
+        objects = [(key, 100, OLD) for key in keys]
+        for key in with_preview:
+            objects += [(preview_prefix(key) + name, 10, OLD) for name in ('master.m3u8', '360p/index.m3u8', '360p/seg_00000.ts')]
+        objects += [('library_2/zz/stray.mov', 1, OLD), ('library_2/zz/upload.mov', 1, RECENT)]
+        videos = [(key, index, 'stored', 100) for index, key in enumerate(keys)]
+        videos.append(('library_2/ff/missing.mov', 99, 'stored', 123))
+        report, orphans = self._reconcile(objects, videos, [preview_prefix(key) for key in with_preview])
+
+        self.check(report['matched'] == len(keys), f"{report['matched']} videos matched")
+        self.check(report['preview_objects'] == 3 * len(with_preview), f"{report['preview_objects']} preview objects")
+        self.check(orphans == ['library_2/zz/stray.mov'], f"orphans: {orphans}")
+        self.check(report['recent_unreferenced'] == 1, "recent unreferenced upload skipped")
+        self.check(report['missing'] == 1 and report['missing_bytes'] == 123, "missing object reported")
+
+    def test_unsorted_prefixes(self):
+        """Out-of-order preview prefixes raise instead of producing false orphans."""
+        from videos.reconciliation import reconcile, OrderingError
+
+        print("Ordering")
+        objects = [('a/hls/master.m3u8', 1, OLD), ('b/hls/master.m3u8', 1, OLD), ('c/x', 1, OLD)]
+        try:
+            reconcile(iter(objects), iter([]), now=NOW, preview_prefixes=iter(['b/hls/', 'a/hls/']))
+            raised = False
+        except OrderingError:
+            raised = True
+        self.check(raised, "unsorted preview prefixes raise OrderingError")
+
+    def run(self):
+        self.test_preview_objects()
+        self.test_several_previews()
+        self.test_unsorted_prefixes()
+        print(f"\n{self.passed} passed, {self.failed} failed")
+        return self.failed == 0
+
+
+def main():
+    configure_django()
+    ok = ReconciliationTest().run()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
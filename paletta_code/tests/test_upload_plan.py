@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the browser upload plan (videos/multipart.recommend_upload_plan).
+
+Builds plans for files from 1GB up to S3's 5TiB object limit, without
+telemetry, at a high measured throughput and with a part size asked for by
+the client, and checks that every plan fits S3's part limits, keeps each part
+under S3_CLIENT_MAX_PART_SIZE (the browser reads and hashes a part in one
+ArrayBuffer) and keeps part_size x concurrency within S3_CLIENT_INFLIGHT_BYTES.
+The only plan allowed past the budget is a single part in flight whose size
+the file itself forces.
+
+No AWS access or database is needed.
+
+Usage:
+    python test_upload_plan.py
+"""
+
+import os
+import sys
+
+# Add the project directory to the Python path
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+paletta_project_dir = os.path.join(project_dir, 'paletta_project')
+sys.path.insert(0, paletta_project_dir)
+
+import django
+from django.conf import settings
+
+MiB = 1024 * 1024
+GiB = 1024 * MiB
+TiB = 1024 * GiB
+
+INFLIGHT_BYTES = 1 * GiB
+MAX_PART_SIZE = 512 * MiB
+
+
+def configure_django():
+    settings.configure(
+        INSTALLED_APPS=[],
+        USE_TZ=True,
+        S3_MULTIPART_CHUNK_SIZE=100 * MiB,
+        S3_CLIENT_MAX_CONCURRENCY=10,
+        S3_CLIENT_MIN_CONCURRENCY=2,
+        S3_CLIENT_INFLIGHT_BYTES=INFLIGHT_BYTES,
+        S3_CLIENT_MAX_PART_SIZE=MAX_PART_SIZE,
+    )
+    django.setup()
+
+
+class UploadPlanTest:
+    """Checks recommend_upload_plan() against S3's limits and the browser's budget."""
+
+    def __init__(self):
+        self.passed = 0
+        self.failed = 0
+
+    def check(self, condition, message):
+        if condition:
+            self.passed += 1
+            print(f"  ok    {message}")
+        else:
+            self.failed += 1
+            print(f"  FAIL  {message}")
+
+    def _check_plan(self, file_size, **kwargs):
+        from videos.multipart import (
+            recommend_upload_plan, clamp_part_size, format_size, S3_MAX_PARTS,
+        )
+
+        plan = recommend_upload_plan(file_size, **kwargs)
+        part_size, concurrency = plan['part_size'], plan['concurrency']
+        label = f"{format_size(file_size)} {kwargs or 'no telemetry'}: {format_size(part_size)} x {concurrency}"
+        # Smallest whole-MiB part that fits the file into 10,000 parts
+        floor = clamp_part_size(0, file_size)
+
+        self.check(plan['total_parts'] <= S3_MAX_PARTS and part_size >= floor, f"{label} fits S3's part limits")
+        self.check(part_size <= max(MAX_PART_SIZE, floor), f"{label} keeps parts within the browser cap")
+        self.check(
+            part_size * concurrency <= INFLIGHT_BYTES or (concurrency == 1 and part_size == floor),
+            f"{label} keeps {format_size(part_size * concurrency)} in flight",
+        )
+        return plan
+
+    def test_without_telemetry(self):
+        print("No telemetry")
+        for file_size in (1 * GiB, 50 * GiB, 1 * TiB, 5 * TiB):
+            self._check_plan(file_size)
+
+        plan = self._check_plan(10 * GiB)
+        self.check(plan['part_size'] == 100 * MiB and plan['concurrency'] == 10, "default parts for a 10GB file")
+
+    def test_high_throughput(self):
+        print("High throughput")
+        for file_size in (50 * GiB, 1 * TiB, 5 * TiB):
+            self._check_plan(file_size, throughput=200 * 1000 * 1000)
+        plan = self._check_plan(50 * GiB, throughput=200 * 1000 * 1000)
+        self.check(plan['part_size'] == MAX_PART_SIZE and plan['concurrency'] == 2, "fast links get capped parts, two at a time")
+
+    def test_requested_part_size(self):
+        print("Client part size")
+        for file_size in (1 * GiB, 1 * TiB, 5 * TiB):
+            self._check_plan(file_size, part_size=5 * GiB)
+        plan = self._check_plan(10 * GiB, part_size=8 * MiB)
+        self.check(plan['part_size'] == 8 * MiB and plan['concurrency'] == 10, "a small requested part size is kept")
+
+    def run(self):
+        self.test_without_telemetry()
+        self.test_high_throughput()
+        self.test_requested_part_size()
+        print(f"\n{self.passed} passed, {self.failed} failed")
+        return self.failed == 0
+
+
+def main():
+    configure_django()
+    ok = UploadPlanTest().run()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()